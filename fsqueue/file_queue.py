@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import time
+from collections.abc import Callable, Collection, Iterable
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from fsqueue.notify import DirWatcher, WatchdogDirWatcher, create_dir_watcher
+
 
 class QueueEmpty(Exception):
     pass
@@ -36,27 +40,81 @@ class FileQueue:
     (or <job_id>.<suffix>.json in no-overwrite move collisions).
     """
 
-    def __init__(self, root: Path):
+    def __init__(self, root: Path, *, clock: Callable[[], float] = time.time):
         self.root = root
+        # Wall clock compared against file mtimes; injectable so tests need not backdate files.
+        self._clock = clock
         self.pending = root / "pending"
         self.running = root / "running"
         self.done = root / "done"
         self.failed = root / "failed"
         self.awaiting_approval = root / "awaiting_approval"
-        for p in [self.pending, self.running, self.done, self.failed, self.awaiting_approval]:
-            p.mkdir(parents=True, exist_ok=True)
+        # str forms for per-file os.* calls, so hot loops skip building a Path per name.
+        self.pending_str = os.fspath(self.pending)
+        self.running_str = os.fspath(self.running)
+        self._ensure_dirs()
+        self._pending_watcher: DirWatcher | WatchdogDirWatcher | None = None
+        self._pending_watch_checked = False
+
+    def _ensure_dirs(self) -> None:
+        # One directory listing instead of a mkdir+stat per state dir when the queue already exists.
+        try:
+            with os.scandir(self.root) as it:
+                existing = {e.name for e in it if e.is_dir()}
+        except FileNotFoundError:
+            self.root.mkdir(parents=True, exist_ok=True)
+            existing = set()
+        for p in (self.pending, self.running, self.done, self.failed, self.awaiting_approval):
+            if p.name not in existing:
+                p.mkdir(exist_ok=True)
+
+    def watch_pending(self) -> bool:
+        """Start watching pending/ for new jobs. Returns False if only polling is available."""
+        if not self._pending_watch_checked:
+            self._pending_watch_checked = True
+            self._pending_watcher = create_dir_watcher(self.pending)
+        return self._pending_watcher is not None
+
+    async def wait_for_job(self, timeout: float) -> bool:
+        """Wait until a job may have landed in pending/, or timeout elapses.
+
+        Returns True when woken by a filesystem event; without a watcher this just sleeps.
+        """
+        if not self.watch_pending():
+            await asyncio.sleep(timeout)
+            return False
+        assert self._pending_watcher is not None
+        return await self._pending_watcher.wait(timeout)
+
+    def close(self) -> None:
+        if self._pending_watcher is not None:
+            self._pending_watcher.close()
+            self._pending_watcher = None
 
     def _find_job_files(self, folder: Path, job_id: str) -> list[Path]:
-        files: list[Path] = []
-        exact = folder / f"{job_id}.json"
-        if exact.exists():
-            files.append(exact)
-        files.extend(folder.glob(f"{job_id}.*.json"))
-        return sorted(files, key=lambda p: p.stat().st_mtime)
+        # Exact name plus collision-suffixed copies (`<job_id>.<ns>.json`); plain string
+        # checks, so ids sharing a prefix ("job-1" vs "job-12") never match each other.
+        exact_name = f"{job_id}.json"
+        prefix = f"{job_id}."
+        try:
+            with os.scandir(folder) as it:
+                entries = [
+                    e for e in it if e.name == exact_name or (e.name.startswith(prefix) and e.name.endswith(".json"))
+                ]
+        except FileNotFoundError:
+            return []
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        return [Path(e.path) for e in entries]
+
+    def _has_job_file(self, folder: Path, job_id: str) -> bool:
+        # Single stat for the common case; only fall back to a directory scan for suffixed copies.
+        if (folder / f"{job_id}.json").exists():
+            return True
+        return bool(self._find_job_files(folder, job_id))
 
     def _job_exists_anywhere(self, job_id: str) -> bool:
         for folder in [self.pending, self.running, self.done, self.failed, self.awaiting_approval]:
-            if self._find_job_files(folder, job_id):
+            if self._has_job_file(folder, job_id):
                 return True
         return False
 
@@ -101,24 +159,89 @@ class FileQueue:
             raise DuplicateJobError(f"Job with job_id='{job_id}' already exists")
 
         target_dir = self._resolve_enqueue_dir(state)
-        tmp = target_dir / f".{job_id}.{int(time.time()*1000)}.tmp"
-        final = target_dir / f"{job_id}.json"
-        tmp.write_text(json.dumps(job_obj, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-        os.replace(tmp, final)
+        self._write_job(target_dir, job_id, job_obj, int(time.time() * 1000))
         return job_id
 
-    def claim(self) -> ClaimedJob:
-        files = sorted(self.pending.glob("*.json"), key=lambda p: p.stat().st_mtime)
-        for f in files:
-            target = self.running / f.name
+    def enqueue_many(self, job_objs: Iterable[dict[str, Any]], *, state: str = "pending") -> list[str]:
+        """Enqueue several jobs; all ids are checked up front, so a bad batch writes nothing."""
+        target_dir = self._resolve_enqueue_dir(state)
+        jobs: list[tuple[str, dict[str, Any]]] = []
+        seen: set[str] = set()
+        for job_obj in job_objs:
+            job_id = str(job_obj.get("job_id") or job_obj.get("id") or "")
+            if not job_id:
+                raise ValueError("Job object missing job_id")
+            if job_id in seen:
+                raise DuplicateJobError(f"Job with job_id='{job_id}' appears twice in the batch")
+            seen.add(job_id)
+            jobs.append((job_id, job_obj))
+
+        # One listing per state dir instead of a stat (plus scan on miss) per job and dir.
+        existing = self._existing_job_id_prefixes()
+        for job_id, _ in jobs:
+            if job_id in existing:
+                raise DuplicateJobError(f"Job with job_id='{job_id}' already exists")
+
+        stamp = int(time.time() * 1000)
+        for job_id, job_obj in jobs:
+            self._write_job(target_dir, job_id, job_obj, stamp)
+        return [job_id for job_id, _ in jobs]
+
+    def _write_job(self, target_dir: Path, job_id: str, job_obj: dict[str, Any], stamp: int) -> None:
+        tmp = target_dir / f".{job_id}.{stamp}.tmp"
+        tmp.write_text(json.dumps(job_obj, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp, target_dir / f"{job_id}.json")
+
+    def _existing_job_id_prefixes(self) -> set[str]:
+        # Every dot-prefix of every queued file stem, i.e. each job_id that
+        # _find_job_files would match for some file in some state dir.
+        prefixes: set[str] = set()
+        for folder in (self.pending, self.running, self.done, self.failed, self.awaiting_approval):
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    stem = entry.name[: -len(".json")]
+                    dot = stem.find(".")
+                    while dot != -1:
+                        prefixes.add(stem[:dot])
+                        dot = stem.find(".", dot + 1)
+                    prefixes.add(stem)
+        return prefixes
+
+    def claim_many(self, max_n: int) -> list[ClaimedJob]:
+        """Claim up to max_n pending jobs, oldest first, in one directory pass."""
+        if max_n <= 0:
+            return []
+        candidates: list[tuple[float, str]] = []
+        with os.scandir(self.pending_str) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    candidates.append((entry.stat().st_mtime, entry.name))
+                except FileNotFoundError:
+                    continue
+        candidates.sort()
+
+        claimed: list[ClaimedJob] = []
+        for _, name in candidates:
+            if len(claimed) >= max_n:
+                break
+            target = os.path.join(self.running_str, name)
             try:
-                os.replace(f, target)  # atomic on same filesystem
-                return ClaimedJob(job_id=self._job_id_from_path(target), path=target)
-            except FileNotFoundError:
-                continue
-            except PermissionError:
+                os.replace(os.path.join(self.pending_str, name), target)  # atomic on same filesystem
+            except (FileNotFoundError, PermissionError):
                 continue
-        raise QueueEmpty()
+            target_path = Path(target)
+            claimed.append(ClaimedJob(job_id=self._job_id_from_path(target_path), path=target_path))
+        return claimed
+
+    def claim(self) -> ClaimedJob:
+        claimed = self.claim_many(1)
+        if not claimed:
+            raise QueueEmpty()
+        return claimed[0]
 
     def read_claimed(self, claimed: ClaimedJob) -> dict[str, Any]:
         return json.loads(claimed.path.read_text(encoding="utf-8"))
@@ -135,11 +258,14 @@ class FileQueue:
     def requeue(self, claimed: ClaimedJob) -> None:
         self._move_to_dir_no_overwrite(claimed.path, self.pending)
 
-    def reclaim_stale_running(self, stale_after_sec: int) -> int:
-        now = time.time()
+    def reclaim_stale_running(self, stale_after_sec: int, *, skip_names: Collection[str] = ()) -> int:
+        """Move running/ files older than stale_after_sec back to pending/, except skip_names (our own jobs)."""
+        now = self._clock()
         reclaimed = 0
         files = sorted(self.running.glob("*.json"), key=lambda p: p.stat().st_mtime)
         for f in files:
+            if f.name in skip_names:
+                continue
             try:
                 age = now - f.stat().st_mtime
             except FileNotFoundError:
@@ -180,6 +306,6 @@ class FileQueue:
             ("awaiting_approval", self.awaiting_approval),
         ]
         for state, folder in states:
-            if self._find_job_file(folder, job_id) is not None:
+            if self._has_job_file(folder, job_id):
                 return state
         return None
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+from pathlib import Path
+
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ModuleNotFoundError:  # optional; only used where inotify is unavailable (macOS FSEvents, Windows)
+    FileSystemEventHandler = None  # type: ignore[assignment,misc]
+    Observer = None  # type: ignore[assignment,misc]
+
+
+log = logging.getLogger("fsqueue")
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1") or not hasattr(libc, "inotify_add_watch"):
+        return None
+    return libc
+
+
+class DirWatcher:
+    """Wake asyncio waiters when a file is written in (or moved into) a directory.
+
+    Linux-only (inotify through libc); `create()` returns None elsewhere so callers
+    can fall back to polling.
+    """
+
+    def __init__(self, fd: int):
+        self._fd = fd
+        self._event = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @classmethod
+    def create(cls, directory: Path) -> "DirWatcher | None":
+        libc = _load_libc()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            log.warning("inotify_init1 failed: %s", os.strerror(ctypes.get_errno()))
+            return None
+        # IN_CLOSE_WRITE rather than IN_CREATE: never wake on a half-written file.
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), _IN_CLOSE_WRITE | _IN_MOVED_TO)
+        if wd < 0:
+            log.warning("inotify_add_watch(%s) failed: %s", directory, os.strerror(ctypes.get_errno()))
+            os.close(fd)
+            return None
+        return cls(fd)
+
+    def _on_readable(self) -> None:
+        # Event payloads are irrelevant: any change means "try to claim again".
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        self._event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until the directory changes or timeout elapses. Returns True on change."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._loop is not None:
+                self._loop.remove_reader(self._fd)
+            loop.add_reader(self._fd, self._on_readable)
+            self._loop = loop
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+
+    def close(self) -> None:
+        if self._fd < 0:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._fd)
+        self._loop = None
+        os.close(self._fd)
+        self._fd = -1
+
+
+class WatchdogDirWatcher:
+    """Same interface as DirWatcher, backed by the optional `watchdog` package."""
+
+    def __init__(self, directory: Path):
+        self._event = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):  # type: ignore[misc,valid-type]
+            def on_closed(self, event) -> None:  # noqa: ANN001
+                watcher._notify()
+
+            def on_moved(self, event) -> None:  # noqa: ANN001
+                watcher._notify()
+
+            def on_created(self, event) -> None:  # noqa: ANN001
+                # Backends without close events (FSEvents, ReadDirectoryChangesW) only report creation.
+                watcher._notify()
+
+        self._observer = Observer()
+        self._observer.schedule(_Handler(), str(directory), recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+
+    def _notify(self) -> None:
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self, timeout: float) -> bool:
+        self._loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+
+    def close(self) -> None:
+        self._loop = None
+        self._observer.stop()
+        self._observer.join(timeout=1)
+
+
+def create_dir_watcher(directory: Path) -> DirWatcher | WatchdogDirWatcher | None:
+    """Best available change watcher for directory, or None when only polling is possible."""
+    watcher = DirWatcher.create(directory)
+    if watcher is not None:
+        return watcher
+    if Observer is None:
+        return None
+    try:
+        return WatchdogDirWatcher(directory)
+    except Exception as e:
+        log.warning("watchdog observer for %s failed to start: %s", directory, e)
+        return None
@@ -100,20 +100,40 @@ def _read_json_if_exists(path: Path) -> dict[str, Any] | None:
     return obj if isinstance(obj, dict) else None
 
 
-@app.on_event("startup")
-def _startup() -> None:
+async def _read_body_limited(request: Request, max_bytes: int) -> bytes:
+    """Request body, or 413 as soon as Content-Length or the bytes received exceed max_bytes."""
+    too_large = HTTPException(status_code=413, detail=f"Payload too large (>{max_bytes} bytes)")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+def configure(cfg: Settings) -> None:
+    """(Re)bind the app's settings, queue and rate limiter without a restart."""
     global settings, queue, rate_limiter
-    load_dotenv()
-    settings = Settings.load()
-    setup_logging(settings.log_level, json_output=settings.log_json)
-    queue = FileQueue(settings.queue_root)
-    if settings.webhook_rate_limit_max_requests > 0:
+    settings = cfg
+    queue = FileQueue(cfg.queue_root)
+    if cfg.webhook_rate_limit_max_requests > 0:
         rate_limiter = InMemoryRateLimiter(
-            window_sec=settings.webhook_rate_limit_window_sec,
-            max_requests=settings.webhook_rate_limit_max_requests,
+            window_sec=cfg.webhook_rate_limit_window_sec,
+            max_requests=cfg.webhook_rate_limit_max_requests,
         )
     else:
         rate_limiter = None
+
+
+@app.on_event("startup")
+def _startup() -> None:
+    load_dotenv()
+    cfg = Settings.load()
+    setup_logging(cfg.log_level, json_output=cfg.log_json)
+    configure(cfg)
     log.info("Webhook server started")
 
 
@@ -152,9 +172,7 @@ async def webhook(request: Request, authorization: Optional[str] = Header(defaul
                 headers={"Retry-After": str(decision.retry_after_sec)},
             )
 
-    body = await request.body()
-    if len(body) > settings.max_webhook_body_bytes:
-        raise HTTPException(status_code=413, detail=f"Payload too large (>{settings.max_webhook_body_bytes} bytes)")
+    body = await _read_body_limited(request, settings.max_webhook_body_bytes)
 
     try:
         payload = json.loads(body.decode("utf-8"))
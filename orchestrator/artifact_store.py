@@ -1,10 +1,39 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import os
 import tempfile
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Sequence
+
+from orchestrator.json_utils import dumps_bytes
+
+
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+
+def _writev_all(fd: int, parts: Sequence[bytes]) -> None:
+    """Write all parts to fd with as few vectored writes as possible (handles short writes)."""
+    pending = [memoryview(p) for p in parts if p]
+    if not hasattr(os, "writev"):  # Windows
+        for buf in pending:
+            while buf:
+                buf = buf[os.write(fd, buf):]
+        return
+    i = 0
+    while i < len(pending):
+        n = os.writev(fd, pending[i : i + _IOV_MAX])
+        while i < len(pending) and n >= len(pending[i]):
+            n -= len(pending[i])
+            i += 1
+        if n:
+            pending[i] = pending[i][n:]
 
 
 class ArtifactStore:
@@ -39,8 +68,9 @@ class ArtifactStore:
         return p
 
     def step_dir(self, job_id: str, step_id: str) -> Path:
-        p = (self.job_dir(job_id) / "steps" / step_id).resolve()
-        if self.job_dir(job_id) not in p.parents:
+        jd = self.job_dir(job_id)
+        p = (jd / "steps" / step_id).resolve()
+        if jd not in p.parents:
             raise ValueError("Invalid step_id caused path traversal")
         return p
 
@@ -52,21 +82,43 @@ class ArtifactStore:
         sd = self.step_dir(job_id, step_id)
         sd.mkdir(parents=True, exist_ok=True)
 
-    def _atomic_write_text(self, path: Path, text: str) -> None:
+    def _atomic_write_bytes(self, path: Path, data: bytes, *, fsync: bool = False) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
-        with tempfile.NamedTemporaryFile("w", delete=False, dir=str(path.parent), encoding="utf-8") as tf:
-            tf.write(text)
+        with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(path.parent)) as tf:
+            tf.write(data)
+            if fsync:
+                tf.flush()
+                os.fsync(tf.fileno())
             tmp = tf.name
         os.replace(tmp, path)
 
+    def _atomic_writev(self, path: Path, parts: Sequence[bytes]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent))
+        try:
+            _writev_all(fd, parts)
+        except BaseException:
+            os.close(fd)
+            os.unlink(tmp)
+            raise
+        os.close(fd)
+        os.replace(tmp, path)
+
+    def _atomic_write_text(self, path: Path, text: str) -> None:
+        self._atomic_write_bytes(path, text.encode("utf-8"))
+
     def _atomic_write_json(self, path: Path, obj: Any) -> None:
-        self._atomic_write_text(path, json.dumps(obj, ensure_ascii=False, indent=2) + "\n")
+        self._atomic_write_bytes(path, dumps_bytes(obj, indent=True) + b"\n")
 
     def write_job_spec(self, job_id: str, job_obj: dict[str, Any]) -> None:
         self._atomic_write_json(self.job_dir(job_id) / "job.json", job_obj)
 
     def write_state(self, job_id: str, state_obj: dict[str, Any]) -> None:
-        self._atomic_write_json(self.job_dir(job_id) / "state.json", state_obj)
+        self.write_state_bytes(job_id, dumps_bytes(state_obj, indent=True) + b"\n")
+
+    def write_state_bytes(self, job_id: str, data: bytes, *, fsync: bool = False) -> None:
+        """Write a pre-encoded state.json payload."""
+        self._atomic_write_bytes(self.job_dir(job_id) / "state.json", data, fsync=fsync)
 
     def write_context(self, job_id: str, context_obj: dict[str, Any]) -> None:
         self._atomic_write_json(self.job_dir(job_id) / "context.json", context_obj)
@@ -78,6 +130,22 @@ class ArtifactStore:
         self._atomic_write_text(jd / "logs.txt", logs_txt)
         self._atomic_write_json(jd / "result.json", result_obj)
 
+    def write_job_artifacts_iovec(
+        self,
+        job_id: str,
+        *,
+        report_parts: Sequence[bytes],
+        patch_parts: Sequence[bytes],
+        logs_parts: Sequence[bytes],
+        result_obj: dict[str, Any],
+    ) -> None:
+        """Like write_job_artifacts, but each text artifact is written from its parts without joining them."""
+        jd = self.job_dir(job_id)
+        self._atomic_writev(jd / "report.md", report_parts)
+        self._atomic_writev(jd / "patch.diff", patch_parts)
+        self._atomic_writev(jd / "logs.txt", logs_parts)
+        self._atomic_write_json(jd / "result.json", result_obj)
+
     def write_step_artifacts(
         self,
         job_id: str,
@@ -100,7 +168,89 @@ class ArtifactStore:
         if raw_stderr:
             self._atomic_write_text(sd / "raw_stderr.txt", raw_stderr)
 
+    def persist_step_artifacts_in_place(
+        self,
+        job_id: str,
+        step_id: str,
+        *,
+        logs_txt: str,
+        result_obj: dict[str, Any],
+    ) -> None:
+        """Keep report.md/patch.diff as the worker wrote them into the step dir; write logs/result.
+
+        Missing worker files are created empty so every step has the fixed artifact set.
+        """
+        sd = self.step_dir(job_id, step_id)
+        for name in ("report.md", "patch.diff"):
+            dst = sd / name
+            if not dst.exists():
+                self._atomic_write_bytes(dst, b"")
+        self._atomic_write_text(sd / "logs.txt", logs_txt)
+        self._atomic_write_json(sd / "result.json", result_obj)
+
     def relpath(self, path: Path, job_id: str) -> str:
         """Return path relative to artifacts/<job_id>/"""
         jd = self.job_dir(job_id)
         return str(path.resolve().relative_to(jd))
+
+
+class StateWriter:
+    """Coalesce state.json rewrites for one job.
+
+    Updates arriving within `min_interval_sec` of the previous write are deferred
+    to a single trailing write on the running event loop (latest state wins).
+    `flush()` writes immediately; `maybe_flush(force=True)` also fsyncs.
+    """
+
+    def __init__(
+        self,
+        store: ArtifactStore,
+        job_id: str,
+        *,
+        min_interval_sec: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._store = store
+        self._job_id = job_id
+        self._min_interval_sec = min_interval_sec
+        self._clock = clock
+        self._state: dict[str, Any] | None = None
+        self._dirty = False
+        self._last_write: float | None = None
+        self._timer: asyncio.TimerHandle | None = None
+
+    def mark_dirty(self, state: dict[str, Any]) -> None:
+        self._state = state
+        self._dirty = True
+
+    def maybe_flush(self, *, force: bool = False) -> None:
+        if not self._dirty:
+            return
+        now = self._clock()
+        if force or self._last_write is None or now - self._last_write >= self._min_interval_sec:
+            self.flush(fsync=force)
+            return
+        if self._timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        delay = self._min_interval_sec - (now - self._last_write)
+        self._timer = loop.call_later(delay, self._flush_deferred)
+
+    def _flush_deferred(self) -> None:
+        self._timer = None
+        if self._dirty:
+            self.flush()
+
+    def flush(self, *, fsync: bool = False) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._state is None:
+            return
+        self._store.write_state_bytes(self._job_id, dumps_bytes(self._state, indent=True) + b"\n", fsync=fsync)
+        self._dirty = False
+        self._last_write = self._clock()
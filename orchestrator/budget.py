@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import sqlite3
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Protocol
 
 
 class BudgetLimitExceeded(RuntimeError):
@@ -17,20 +19,28 @@ class BudgetSnapshot:
     cost_usd: float
 
 
-class BudgetTracker:
-    def __init__(self, db_path: Path, max_daily_api_calls: int, max_daily_cost_usd: float):
-        self.db_path = db_path
-        self.max_daily_api_calls = max(0, int(max_daily_api_calls))
-        self.max_daily_cost_usd = max(0.0, float(max_daily_cost_usd))
-        self._init_db()
+class BudgetBackend(Protocol):
+    """Storage for per-(date, worker) usage counters."""
 
-    @property
-    def enabled(self) -> bool:
-        return self.max_daily_api_calls > 0 or self.max_daily_cost_usd > 0
+    def totals(self, date: str) -> tuple[int, float]:
+        """Summed (api_calls, cost_usd) over all workers for date."""
+        ...
+
+    def add_many(self, rows: list[tuple[str, str, int, float]]) -> None:
+        """Add (date, worker, api_calls, cost_usd) rows to the running totals, atomically."""
+        ...
+
+    def close(self) -> None: ...
 
-    def _init_db(self) -> None:
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        with sqlite3.connect(self.db_path) as conn:
+
+class SqliteBudgetBackend:
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        if str(db_path) != ":memory:":
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection for the backend's lifetime: opening state.db per call costs more than the query.
+        self._conn: sqlite3.Connection | None = sqlite3.connect(db_path)
+        with self._conn as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS budget_log (
@@ -42,20 +52,69 @@ class BudgetTracker:
                 )
                 """
             )
-            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+        return self._conn
+
+    def totals(self, date: str) -> tuple[int, float]:
+        row = self._connection().execute(
+            "SELECT COALESCE(SUM(api_calls), 0), COALESCE(SUM(cost_usd), 0) FROM budget_log WHERE date = ?",
+            (date,),
+        ).fetchone()
+        return int(row[0] if row else 0), float(row[1] if row else 0.0)
+
+    def add_many(self, rows: list[tuple[str, str, int, float]]) -> None:
+        with self._connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO budget_log (date, worker, api_calls, cost_usd)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(date, worker) DO UPDATE SET
+                    api_calls = api_calls + excluded.api_calls,
+                    cost_usd = cost_usd + excluded.cost_usd
+                """,
+                rows,
+            )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class BudgetTracker:
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        max_daily_api_calls: int = 0,
+        max_daily_cost_usd: float = 0.0,
+        *,
+        backend: BudgetBackend | None = None,
+    ):
+        if backend is None:
+            if db_path is None:
+                raise ValueError("BudgetTracker needs either db_path or backend")
+            backend = SqliteBudgetBackend(db_path)
+        self.db_path = db_path
+        self.backend = backend
+        self.max_daily_api_calls = max(0, int(max_daily_api_calls))
+        self.max_daily_cost_usd = max(0.0, float(max_daily_cost_usd))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_daily_api_calls > 0 or self.max_daily_cost_usd > 0
+
+    def close(self) -> None:
+        self.backend.close()
 
     def _utc_date(self) -> str:
         return datetime.now(timezone.utc).date().isoformat()
 
     def _today_snapshot(self) -> BudgetSnapshot:
         date_value = self._utc_date()
-        with sqlite3.connect(self.db_path) as conn:
-            row = conn.execute(
-                "SELECT COALESCE(SUM(api_calls), 0), COALESCE(SUM(cost_usd), 0) FROM budget_log WHERE date = ?",
-                (date_value,),
-            ).fetchone()
-        api_calls = int(row[0] if row else 0)
-        cost_usd = float(row[1] if row else 0.0)
+        api_calls, cost_usd = self.backend.totals(date_value)
         return BudgetSnapshot(date=date_value, api_calls=api_calls, cost_usd=cost_usd)
 
     def check_budget(self) -> BudgetSnapshot:
@@ -77,23 +136,15 @@ class BudgetTracker:
         return snapshot
 
     def log_budget(self, worker: str, *, api_calls: int = 1, cost_usd: float = 0.0) -> None:
-        if api_calls < 0:
-            api_calls = 0
-        if cost_usd < 0:
-            cost_usd = 0.0
+        self.log_budget_many([(worker, api_calls, cost_usd)])
 
+    def log_budget_many(self, entries: Iterable[tuple[str, int, float]]) -> None:
+        """Record (worker, api_calls, cost_usd) entries in a single transaction."""
         date_value = self._utc_date()
-        worker_value = worker.strip() or "unknown"
-
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                INSERT INTO budget_log (date, worker, api_calls, cost_usd)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(date, worker) DO UPDATE SET
-                    api_calls = api_calls + excluded.api_calls,
-                    cost_usd = cost_usd + excluded.cost_usd
-                """,
-                (date_value, worker_value, int(api_calls), float(cost_usd)),
-            )
-            conn.commit()
+        rows = [
+            (date_value, worker.strip() or "unknown", max(0, int(api_calls)), max(0.0, float(cost_usd)))
+            for worker, api_calls, cost_usd in entries
+        ]
+        if not rows:
+            return
+        self.backend.add_many(rows)
@@ -121,8 +121,13 @@ class Settings:
     default_artifact_handoff: str
 
     runner_poll_interval_sec: int
+    runner_poll_max_sec: int
     runner_max_idle_sec: int
     runner_reclaim_after_sec: int
+    runner_use_inotify: bool
+    runner_claim_batch_size: int
+    runner_max_parallel_jobs: int
+    runner_max_parallel_steps: int
 
     enable_real_cli: bool
 
@@ -167,8 +172,13 @@ class Settings:
         default_artifact_handoff = _normalize_artifact_handoff(_env_str("DEFAULT_ARTIFACT_HANDOFF", "manual"))
 
         runner_poll_interval_sec = _env_int("RUNNER_POLL_INTERVAL_SEC", 1)
+        runner_poll_max_sec = max(runner_poll_interval_sec, _env_int("RUNNER_POLL_MAX_SEC", 5))
         runner_max_idle_sec = _env_int("RUNNER_MAX_IDLE_SEC", 120)
         runner_reclaim_after_sec = _env_int("RUNNER_RECLAIM_AFTER_SEC", 600)
+        runner_use_inotify = _env_bool("RUNNER_USE_INOTIFY", False)
+        runner_claim_batch_size = max(1, _env_int("RUNNER_CLAIM_BATCH_SIZE", 1))
+        runner_max_parallel_jobs = max(1, _env_int("RUNNER_MAX_PARALLEL_JOBS", 1))
+        runner_max_parallel_steps = max(1, _env_int("RUNNER_MAX_PARALLEL_STEPS", 1))
 
         enable_real_cli = _env_bool("ENABLE_REAL_CLI", False)
 
@@ -225,8 +235,13 @@ class Settings:
             webhook_rate_limit_max_requests=webhook_rate_limit_max_requests,
             default_artifact_handoff=default_artifact_handoff,
             runner_poll_interval_sec=runner_poll_interval_sec,
+            runner_poll_max_sec=runner_poll_max_sec,
             runner_max_idle_sec=runner_max_idle_sec,
             runner_reclaim_after_sec=runner_reclaim_after_sec,
+            runner_use_inotify=runner_use_inotify,
+            runner_claim_batch_size=runner_claim_batch_size,
+            runner_max_parallel_jobs=runner_max_parallel_jobs,
+            runner_max_parallel_steps=runner_max_parallel_steps,
             enable_real_cli=enable_real_cli,
             sandbox=sandbox,
             sandbox_wrapper=sandbox_wrapper,
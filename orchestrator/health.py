@@ -124,7 +124,7 @@ def run_doctor_checks(settings: Settings) -> list[CheckResult]:
                 db_path=settings.state_db_path,
                 max_daily_api_calls=settings.max_daily_api_calls,
                 max_daily_cost_usd=settings.max_daily_cost_usd,
-            )
+            ).close()
             with sqlite3.connect(settings.state_db_path) as conn:
                 conn.execute("SELECT 1").fetchone()
             out.append(CheckResult("OK", "Budget DB", str(settings.state_db_path)))
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ModuleNotFoundError:  # optional accelerator; stdlib json is the fallback
+    orjson = None
+
+
+def dumps_bytes(obj: Any, *, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import os
 import re
+from functools import lru_cache
 from typing import Iterable
 
 
-_ANTHROPIC_KEY_RE = re.compile(r"sk-ant-[a-zA-Z0-9\-_]{20,}")
-_OPENAI_KEY_RE = re.compile(r"sk-[a-zA-Z0-9]{20,}")
+_ANTHROPIC_KEY_PATTERN = r"sk-ant-[a-zA-Z0-9\-_]{20,}"
+_OPENAI_KEY_PATTERN = r"sk-[a-zA-Z0-9]{20,}"
+_KEYS_RE = re.compile(f"(?P<anthropic_key>{_ANTHROPIC_KEY_PATTERN})|(?P<openai_key>{_OPENAI_KEY_PATTERN})")
 
 
 def _env_var_names(explicit_vars: Iterable[str] | None) -> list[str]:
@@ -16,17 +18,32 @@ def _env_var_names(explicit_vars: Iterable[str] | None) -> list[str]:
     return [v.strip() for v in raw.split(",") if v.strip()]
 
 
+@lru_cache(maxsize=64)
+def _redaction_re(secrets: tuple[tuple[str, str], ...]) -> tuple[re.Pattern[str], dict[str, str]]:
+    if not secrets:
+        return _KEYS_RE, {}
+    # Key patterns first so a key that is also an env value keeps its key label;
+    # longest env value first so a secret that contains another is replaced whole.
+    ordered = sorted(secrets, key=lambda item: -len(item[1]))
+    labels = {value: f"[REDACTED:env:{name}]" for name, value in reversed(ordered)}
+    env_alternation = "|".join(re.escape(value) for _name, value in ordered)
+    return re.compile(f"{_KEYS_RE.pattern}|(?P<env>{env_alternation})"), labels
+
+
 def redact(text: str, *, sensitive_env_vars: Iterable[str] | None = None) -> str:
     if not text:
         return text
 
-    redacted = _ANTHROPIC_KEY_RE.sub("[REDACTED:anthropic_key]", text)
-    redacted = _OPENAI_KEY_RE.sub("[REDACTED:openai_key]", redacted)
+    secrets = tuple(
+        sorted((env_var, env_val) for env_var in _env_var_names(sensitive_env_vars) if (env_val := os.getenv(env_var)))
+    )
+    # One alternation, one scan of the text, whatever the number of patterns.
+    pattern, labels = _redaction_re(secrets)
 
-    for env_var in _env_var_names(sensitive_env_vars):
-        env_val = os.getenv(env_var)
-        if not env_val:
-            continue
-        redacted = redacted.replace(env_val, f"[REDACTED:env:{env_var}]")
+    def _replacement(match: re.Match[str]) -> str:
+        kind = match.lastgroup
+        if kind == "env":
+            return labels[match.group(0)]
+        return f"[REDACTED:{kind}]"
 
-    return redacted
+    return pattern.sub(_replacement, text)
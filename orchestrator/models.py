@@ -37,6 +37,13 @@ class StepSpec(BaseModel):
     input_artifacts: list[str] = Field(default_factory=list, description="Relative paths inside artifacts/<job_id>/")
     apply_patches_from: list[str] = Field(default_factory=list, description="Relative patch paths to apply before the step")
     allowed_tools: list[str] | None = Field(default=None, description="Tool allowlist override for compatible agents")
+    depends_on: list[str] | None = Field(
+        default=None,
+        description=(
+            "Step ids that must finish before this step starts. Unset means the previous step; "
+            "when any step sets it the job runs as a dependency graph"
+        ),
+    )
     on_failure: str = Field(
         default="stop",
         description=(
@@ -30,9 +30,11 @@ class ExecutionPolicy:
             raise PolicyError(f"Unsupported network policy: '{requested_network}'")
         network_policy = "deny" if "deny" in {self.network_policy, requested_network} else "allow"
 
-        allowed_binaries = set(self.allowed_binaries)
         if job_allowed_binaries:
-            allowed_binaries &= {b.strip() for b in job_allowed_binaries if b.strip()}
+            # Intersect from the (usually tiny) job list instead of copying the whole allowlist first.
+            allowed_binaries = {name for b in job_allowed_binaries if (name := b.strip())} & self.allowed_binaries
+        else:
+            allowed_binaries = set(self.allowed_binaries)
         # Sandbox wrapper must stay in allowlist even after intersection.
         if sandbox and self.sandbox_wrapper:
             allowed_binaries.add(self.sandbox_wrapper)
@@ -1,37 +1,54 @@
 from __future__ import annotations
 
 import asyncio
-import json as _json
+import fnmatch
 import logging
+import multiprocessing
+import os
+import random
+import signal
 import subprocess
+import threading
 import time
+from collections.abc import Collection
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Literal
 from urllib.parse import urlparse
 
 from dotenv import load_dotenv
 
-from orchestrator.artifact_store import ArtifactStore
+from orchestrator.artifact_store import ArtifactStore, StateWriter
 from orchestrator.budget import BudgetLimitExceeded, BudgetTracker
 from orchestrator.config import Settings
+from orchestrator.json_utils import dumps_bytes
 from orchestrator.logging_utils import setup_logging
 from orchestrator.models import JobSpec, JobResult, StepResult, StepSpec, ArtifactPaths, ErrorInfo, utc_now_iso
-from orchestrator.policy import build_policy_from_env, PolicyError, assert_startup_policy_safe
+from orchestrator.policy import ExecutionPolicy, build_policy_from_env, PolicyError, assert_startup_policy_safe
 from orchestrator.preflight import assert_real_cli_ready, PreflightError
 from orchestrator.retention import run_retention
 from orchestrator.step_requirements import required_binaries_for_job
+from orchestrator.subprocess_utils import install_pidfd_child_watcher
 from orchestrator.validation import validate_result_contract
-from orchestrator.validator import validate_json, SchemaValidationError
+from orchestrator.validator import get_validator, validate_json, SchemaValidationError
 from orchestrator.workspace import WorkspaceManager, WorkspaceError
-from fsqueue.file_queue import FileQueue, QueueEmpty
+from fsqueue.file_queue import ClaimedJob, FileQueue
 
-from workers.base import StepContext
+from workers.base import BaseWorker, StepContext
 from workers import ensure_workers_registered, get_worker
 
 
 log = logging.getLogger("runner")
 _CONTEXT_SLIDING_MAX_MESSAGES = 12
 _CONTEXT_SUMMARY_MAX_CHARS = 4000
+_cpu_pool: ProcessPoolExecutor | None = None
+_JOB_ARTIFACTS = ArtifactPaths(
+    report_md="report.md",
+    patch_diff="patch.diff",
+    logs_txt="logs.txt",
+    result_json="result.json",
+)
 
 
 def _repo_root() -> Path:
@@ -46,10 +63,38 @@ def _verify_script() -> Path:
     return _repo_root() / "scripts" / "verify_artifacts.sh"
 
 
-def _read_text(p: Path) -> str:
-    if not p.exists():
-        return ""
-    return p.read_text(encoding="utf-8")
+def _read_bytes(p: Path) -> bytes:
+    try:
+        with open(p, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return b""
+
+
+async def _read_text_async(p: Path) -> str:
+    data = await asyncio.to_thread(_read_bytes, p)
+    return data.decode("utf-8", errors="replace")
+
+
+def _add_part(parts: list[bytes], *chunks: bytes) -> None:
+    # One logical part made of chunks, newline-separated from the previous part like "\n".join().
+    if parts:
+        parts.append(b"\n")
+    parts.extend(chunks)
+
+
+def _strip_parts(parts: list[bytes]) -> list[bytes]:
+    """Parts of b"".join(parts).strip(), without joining them."""
+    start, end = 0, len(parts)
+    while start < end and not parts[start].lstrip():
+        start += 1
+    while end > start and not parts[end - 1].rstrip():
+        end -= 1
+    out = parts[start:end]
+    if out:
+        out[0] = out[0].lstrip()
+        out[-1] = out[-1].rstrip()
+    return out
 
 
 async def _sleep_backoff(base_sec: int, attempt: int) -> None:
@@ -58,8 +103,54 @@ async def _sleep_backoff(base_sec: int, attempt: int) -> None:
     await asyncio.sleep(delay)
 
 
-def reclaim_stale_running_jobs(queue: FileQueue, stale_after_sec: int) -> int:
-    return queue.reclaim_stale_running(stale_after_sec)
+def _idle_poll_delay(base_sec: float, empty_streak: int, max_sec: float) -> float:
+    # Back off on consecutive empty polls; jitter keeps runners sharing a queue from waking in lockstep.
+    delay = min(base_sec * (2 ** min(max(0, empty_streak - 1), 4)), max_sec)
+    return delay * random.uniform(0.75, 1.25)
+
+
+def reclaim_stale_running_jobs(queue: FileQueue, stale_after_sec: int, *, skip_names: Collection[str] = ()) -> int:
+    return queue.reclaim_stale_running(stale_after_sec, skip_names=skip_names)
+
+
+def _artifact_files(step_dir: Path) -> list[str]:
+    """Regular files under step_dir, sorted like `find | sort`.
+
+    Symlinks are followed like `grep -R` does: a link to a file contributes the resolved
+    file, a link to a directory is walked (each real directory once).
+    """
+    files: set[str] = set()
+    seen_dirs: set[str] = set()
+    stack = [str(step_dir)]
+    while stack:
+        current = stack.pop()
+        real_dir = os.path.realpath(current)
+        if real_dir in seen_dirs:
+            continue
+        seen_dirs.add(real_dir)
+        try:
+            entries = list(os.scandir(current))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        for entry in entries:
+            if not entry.is_symlink():
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files.add(entry.path)
+            elif entry.is_dir():
+                stack.append(entry.path)
+            elif entry.is_file():  # False for dangling links
+                files.add(os.path.realpath(entry.path))
+    return sorted(files)
+
+
+# Same globs as the filename check in scripts/verify_artifacts.sh.
+_SUSPICIOUS_ARTIFACT_NAMES = (".env", ".env.*", "*.key", "*credentials*", "*secret*")
+
+
+def _is_suspicious_artifact_name(name: str) -> bool:
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in _SUSPICIOUS_ARTIFACT_NAMES)
 
 
 def _run_secrets_check(step_dir: Path) -> tuple[bool, str]:
@@ -67,8 +158,18 @@ def _run_secrets_check(step_dir: Path) -> tuple[bool, str]:
     if not script.exists():
         return True, "verify_artifacts.sh not found; check skipped"
 
+    files = _artifact_files(step_dir)
+    if not any(os.path.getsize(f) > 0 for f in files):
+        # Nothing for the content scan; empty files can still carry a forbidden name.
+        suspicious = [f for f in files if _is_suspicious_artifact_name(os.path.basename(f))]
+        if suspicious:
+            return False, "\n".join(["suspicious file name detected in artifacts", *(f" - {f}" for f in suspicious)])
+        return True, "no artifacts; check skipped"
+
+    # NUL-separated on stdin: a large artifact tree must not hit the argv limit (E2BIG).
     proc = subprocess.run(
-        ["bash", str(script), str(step_dir)],
+        ["bash", str(script), str(step_dir), "--files0-from=-"],
+        input="".join(f"{f}\0" for f in files),
         check=False,
         capture_output=True,
         text=True,
@@ -79,7 +180,29 @@ def _run_secrets_check(step_dir: Path) -> tuple[bool, str]:
     return proc.returncode == 0, msg
 
 
-def _resolve_on_failure(on_failure: str, steps: list, current_idx: int) -> int | Literal["ask_human"] | None:
+def _step_paths(step_id: str) -> ArtifactPaths:
+    # Logical artifact ids relative to artifacts/<job_id>/ (always "/"-separated), not OS paths.
+    return ArtifactPaths(
+        report_md=f"steps/{step_id}/report.md",
+        patch_diff=f"steps/{step_id}/patch.diff",
+        logs_txt=f"steps/{step_id}/logs.txt",
+        result_json=f"steps/{step_id}/result.json",
+    )
+
+
+def _step_index_by_id(steps: list) -> dict[str, int]:
+    index: dict[str, int] = {}
+    for idx, s in enumerate(steps):
+        index.setdefault(s.step_id, idx)
+    return index
+
+
+def _resolve_on_failure(
+    on_failure: str,
+    steps: list,
+    current_idx: int,
+    step_index_by_id: dict[str, int] | None = None,
+) -> int | Literal["ask_human"] | None:
     """Resolve on_failure directive to next step index.
 
     Returns:
@@ -96,15 +219,59 @@ def _resolve_on_failure(on_failure: str, steps: list, current_idx: int) -> int |
         return "ask_human"
     if on_failure.startswith("goto:"):
         target_id = on_failure[5:]
-        for idx, s in enumerate(steps):
-            if s.step_id == target_id:
-                return idx
+        if step_index_by_id is None:
+            step_index_by_id = _step_index_by_id(steps)
+        idx = step_index_by_id.get(target_id)
+        if idx is not None:
+            return idx
         log.warning("on_failure goto target '%s' not found; stopping pipeline", target_id)
         return None
     log.warning("Unknown on_failure value '%s'; stopping pipeline", on_failure)
     return None
 
 
+def _step_dependencies(steps: list[StepSpec]) -> dict[str, list[str]]:
+    """Dependencies per step id (unset depends_on means the previous step).
+
+    Raises ValueError on duplicate ids, unknown references, cycles or goto: on_failure
+    (jumps have no meaning in a dependency graph).
+    """
+    deps: dict[str, list[str]] = {}
+    prev: str | None = None
+    for s in steps:
+        if s.step_id in deps:
+            raise ValueError(f"Duplicate step_id '{s.step_id}'")
+        if s.on_failure.startswith("goto:"):
+            raise ValueError(f"Step '{s.step_id}': on_failure={s.on_failure} is not supported with depends_on")
+        if s.depends_on is not None:
+            deps[s.step_id] = list(dict.fromkeys(s.depends_on))
+        else:
+            deps[s.step_id] = [prev] if prev is not None else []
+        prev = s.step_id
+
+    for step_id, step_deps in deps.items():
+        for dep in step_deps:
+            if dep not in deps:
+                raise ValueError(f"Step '{step_id}' depends on unknown step '{dep}'")
+
+    remaining = {step_id: len(step_deps) for step_id, step_deps in deps.items()}
+    ready = [step_id for step_id, n in remaining.items() if n == 0]
+    dependents: dict[str, list[str]] = {step_id: [] for step_id in deps}
+    for step_id, step_deps in deps.items():
+        for dep in step_deps:
+            dependents[dep].append(step_id)
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for step_id in dependents[done]:
+            remaining[step_id] -= 1
+            if remaining[step_id] == 0:
+                ready.append(step_id)
+    if remaining:
+        raise ValueError(f"Dependency cycle among steps: {', '.join(sorted(remaining))}")
+    return deps
+
+
 def _normalize_context_window(raw: list[Any]) -> list[dict[str, str]]:
     out: list[dict[str, str]] = []
     for item in raw:
@@ -176,6 +343,61 @@ def _resolve_effective_step(
     return step
 
 
+def _get_cpu_pool() -> ProcessPoolExecutor:
+    global _cpu_pool
+    if _cpu_pool is None:
+        # spawn: the runner process has an event loop and executor threads, unsafe to fork.
+        _cpu_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _cpu_pool
+
+
+def _shutdown_cpu_pool() -> None:
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
+
+
+def _raise_step_timeout(signum: int, frame: Any) -> None:
+    raise TimeoutError("step timeout in worker process")
+
+
+def _run_worker_in_process(agent: str, ctx: StepContext, timeout_sec: float) -> StepResult:
+    """Pool-process entry point; enforces the step timeout itself.
+
+    The parent's wait_for only abandons the future, so the deadline has to fire here to stop
+    the work. SIGALRM interrupts Python code, awaiting or spinning; a call stuck in C code
+    that never returns to the interpreter still outlives the parent's timeout.
+    """
+    ensure_workers_registered()
+    worker = get_worker(agent)
+    if worker is None:
+        raise RuntimeError(f"Unknown agent '{agent}' in worker process")
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        # No interval timers (Windows) or no signal handlers off the main thread: cancel at an await.
+        return asyncio.run(asyncio.wait_for(worker.run(ctx), timeout=timeout_sec))
+    previous = signal.signal(signal.SIGALRM, _raise_step_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout_sec)
+    try:
+        return asyncio.run(worker.run(ctx))
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+async def _run_worker(worker: BaseWorker, ctx: StepContext) -> StepResult:
+    if worker.EXECUTION_KIND == "cpu":
+        loop = asyncio.get_running_loop()
+        # The child's deadline (timeout_sec) fires before the parent's wait_for (timeout_sec + 5).
+        return await loop.run_in_executor(
+            _get_cpu_pool(), _run_worker_in_process, ctx.step.agent, ctx, ctx.step.timeout_sec
+        )
+    return await worker.run(ctx)
+
+
 async def _fire_callback(callback_url: str, result_obj: dict) -> None:
     """POST job result to callback_url. Best-effort, never raises."""
     parsed = urlparse(callback_url)
@@ -185,7 +407,7 @@ async def _fire_callback(callback_url: str, result_obj: dict) -> None:
     try:
         import urllib.request
 
-        body = _json.dumps(result_obj, ensure_ascii=False).encode("utf-8")
+        body = dumps_bytes(result_obj)
         req = urllib.request.Request(
             callback_url,
             data=body,
@@ -200,109 +422,304 @@ async def _fire_callback(callback_url: str, result_obj: dict) -> None:
         log.warning("Callback to %s failed: %s", callback_url, e)
 
 
-async def run_forever_async() -> None:
-    load_dotenv()
-    settings = Settings.load()
-    setup_logging(settings.log_level, json_output=settings.log_json)
-    ensure_workers_registered()
+@dataclass(frozen=True)
+class _Runtime:
+    settings: Settings
+    queue: FileQueue
+    store: ArtifactStore
+    workspace_manager: WorkspaceManager
+    budget: BudgetTracker
+    policy: ExecutionPolicy
+    job_schema: Path
+    result_schema: Path
+
+
+async def _process_job(rt: _Runtime, claimed: ClaimedJob) -> None:
+    settings = rt.settings
+    q = rt.queue
+    store = rt.store
+    workspace_manager = rt.workspace_manager
+    budget = rt.budget
+    policy = rt.policy
+    job_schema = rt.job_schema
+    result_schema = rt.result_schema
 
-    q = FileQueue(settings.queue_root)
-    store = ArtifactStore(settings.artifacts_root)
-    workspace_manager = WorkspaceManager(settings.workspaces_root, settings.project_aliases)
-    budget = BudgetTracker(
-        db_path=settings.state_db_path,
-        max_daily_api_calls=settings.max_daily_api_calls,
-        max_daily_cost_usd=settings.max_daily_cost_usd,
-    )
-
-    job_schema = _contracts_dir() / "job.schema.json"
-    result_schema = _contracts_dir() / "result.schema.json"
-
-    policy = build_policy_from_env(
-        allowed_binaries=settings.allowed_binaries,
-        sandbox=settings.sandbox,
-        sandbox_wrapper=settings.sandbox_wrapper,
-        sandbox_wrapper_args=settings.sandbox_wrapper_args,
-        network_policy=settings.network_policy,
-    )
     try:
-        assert_startup_policy_safe(enable_real_cli=settings.enable_real_cli, policy=policy)
-    except PolicyError:
-        log.error("Runner startup policy check failed for real CLI mode")
-        raise
-
-    log.info("Runner started. enable_real_cli=%s sandbox=%s", settings.enable_real_cli, settings.sandbox)
-    if policy.network_policy == "deny" and (not policy.sandbox or not policy.sandbox_wrapper):
-        log.warning(
-            "NETWORK_POLICY=deny is configured without enforceable sandbox wrapper. "
-            "Real CLI jobs requesting network deny will be rejected."
+        job_obj = q.read_claimed(claimed)
+
+        # Validate contract early (fail fast)
+        validate_json(job_obj, job_schema)
+
+        job = JobSpec.model_validate(job_obj)
+        if job.project_id:
+            source_hint: Path | None = workspace_manager.resolve_project_alias(job.project_id)
+        elif job.source.type == "webhook":
+            source_hint = None
+        else:
+            source_hint = Path(job.workdir).expanduser()
+        layout = workspace_manager.prepare_workspace(job_id=job.job_id, source_hint=source_hint)
+        job = job.model_copy(update={"workdir": str(layout.workdir)})
+        step_index_by_id = _step_index_by_id(job.steps)
+
+        store.ensure_job_layout(job.job_id)
+        store.write_job_spec(job.job_id, job.model_dump())
+
+        job_dir = store.job_dir(job.job_id)
+        step_dirs: dict[str, Path] = {}
+        started_at = utc_now_iso()
+
+        # Operational state: intermediate transitions are coalesced, terminal ones written through
+        state_writer = StateWriter(store, job.job_id)
+        state = {
+            "job_id": job.job_id,
+            "status": "running",
+            "started_at": started_at,
+            "finished_at": None,
+            "current_step": None,
+            "steps": {},
+        }
+        state_writer.mark_dirty(state)
+        state_writer.flush()
+        context_strategy = job.context_strategy
+        context_window = _apply_context_strategy(
+            _normalize_context_window(job.context_window),
+            context_strategy,
         )
-    next_retention_at = 0.0
+        artifact_handoff = job.artifact_handoff
+        store.write_context(
+            job.job_id,
+            {
+                "strategy": context_strategy,
+                "messages": context_window,
+                "updated_at": utc_now_iso(),
+            },
+        )
+
+        step_results: list[StepResult] = []
 
-    while True:
-        reclaimed = reclaim_stale_running_jobs(q, settings.runner_reclaim_after_sec)
-        if reclaimed:
-            log.warning("Reclaimed %s stale running job(s) back to pending", reclaimed)
-        if settings.retention_interval_sec > 0 and time.time() >= next_retention_at:
-            stats = run_retention(
-                queue_root=settings.queue_root,
-                artifacts_root=settings.artifacts_root,
-                workspaces_root=settings.workspaces_root,
-                artifacts_ttl_sec=settings.artifacts_ttl_sec,
-                workspaces_ttl_sec=settings.workspaces_ttl_sec,
+        overall_status = "success"
+        overall_error: ErrorInfo | None = None
+        job_policy = policy.for_job(
+            job_sandbox=job.policy.sandbox,
+            job_network_policy=job.policy.network,
+            job_allowed_binaries=job.policy.allowed_binaries,
+        )
+        if settings.enable_real_cli:
+            try:
+                job_policy.assert_real_cli_safe()
+            except PolicyError as e:
+                overall_status = "failed"
+                overall_error = ErrorInfo(code="policy", message=str(e))
+        if settings.enable_real_cli and overall_error is None:
+            try:
+                versions = assert_real_cli_ready(
+                    allowed_binaries=job_policy.allowed_binaries,
+                    min_binary_versions=settings.min_binary_versions,
+                    required_binaries=sorted(required_binaries_for_job(job)),
+                )
+                if versions:
+                    log.info("Real CLI preflight versions for job %s: %s", job.job_id, versions)
+            except PreflightError as e:
+                overall_status = "failed"
+                overall_error = ErrorInfo(code="preflight", message=str(e))
+
+        def _ensure_step_dir(step_id: str) -> Path:
+            step_dir = step_dirs.get(step_id)
+            if step_dir is None:
+                store.ensure_step_layout(job.job_id, step_id)
+                step_dir = step_dirs[step_id] = store.step_dir(job.job_id, step_id)
+            return step_dir
+
+        async def _run_step(
+            step: StepSpec,
+            effective_step: StepSpec,
+            worker: BaseWorker,
+            step_dir: Path,
+        ) -> StepResult | None:
+            """Attempt loop with retries/backoff; sets overall_error on policy violations."""
+            nonlocal overall_status, overall_error
+            step_id = step.step_id
+            step_paths = _step_paths(step_id)
+            timeout = step.timeout_sec + 5
+            # Every field is invariant across retries of the same step.
+            ctx = StepContext(
+                job=job,
+                step=effective_step,
+                job_dir=job_dir,
+                step_dir=step_dir,
+                enable_real_cli=settings.enable_real_cli,
+                policy=job_policy,
+                env_allowlist=settings.env_allowlist,
+                sensitive_env_vars=settings.sensitive_env_vars,
+                sandbox_clear_env=settings.sandbox_clear_env,
+                max_input_artifacts_files=settings.max_input_artifacts_files,
+                max_input_artifact_chars=settings.max_input_artifact_chars,
+                max_input_artifacts_chars=settings.max_input_artifacts_chars,
+                max_subprocess_output_chars=settings.max_subprocess_output_chars,
+                idle_watchdog_sec=settings.runner_max_idle_sec,
+                non_git_workdir_status=settings.non_git_workdir_status,
+                context_window=list(context_window),
+                context_strategy=context_strategy,
             )
-            if stats.removed_artifacts or stats.removed_workspaces:
-                log.info(
-                    "Retention cleanup removed artifacts=%s workspaces=%s",
-                    stats.removed_artifacts,
-                    stats.removed_workspaces,
+            attempt = 0
+            last_result: StepResult | None = None
+
+            while attempt <= step.max_retries:
+                attempt += 1
+
+                state["steps"][step_id].update({
+                    "status": "running",
+                    "attempt": attempt,
+                    "agent": step.agent,
+                    "role": step.role,
+                    "started_at": utc_now_iso(),
+                })
+                state_writer.mark_dirty(state)
+                state_writer.maybe_flush()
+
+                api_call_consumed = False
+
+                try:
+                    if budget.enabled:
+                        budget.check_budget()
+
+                    # Hard timeout enforced here too (worker may also enforce)
+                    res: StepResult = await asyncio.wait_for(_run_worker(worker, ctx), timeout=timeout)
+                    api_call_consumed = True
+                    # Overwrite attempts to reflect retries
+                    res.attempts = attempt
+                    last_result = res
+                except BudgetLimitExceeded as e:
+                    last_result = StepResult(
+                        job_id=job.job_id,
+                        step_id=step_id,
+                        agent=step.agent,
+                        role=step.role,
+                        status="failed",
+                        attempts=attempt,
+                        started_at=state["steps"][step_id]["started_at"],
+                        finished_at=utc_now_iso(),
+                        summary="Budget limit exceeded",
+                        artifacts=step_paths,
+                        error=ErrorInfo(code="budget_exceeded", message=str(e)),
+                    )
+                except PolicyError as e:
+                    overall_status = "failed"
+                    overall_error = ErrorInfo(code="policy", message=str(e))
+                    last_result = None
+                    break
+                except asyncio.TimeoutError:
+                    api_call_consumed = True
+                    last_result = StepResult(
+                        job_id=job.job_id,
+                        step_id=step_id,
+                        agent=step.agent,
+                        role=step.role,
+                        status="timeout",
+                        attempts=attempt,
+                        started_at=state["steps"][step_id]["started_at"],
+                        finished_at=utc_now_iso(),
+                        summary=f"Step timeout after {step.timeout_sec}s",
+                        artifacts=step_paths,
+                    )
+                except Exception as e:
+                    api_call_consumed = True
+                    last_result = StepResult(
+                        job_id=job.job_id,
+                        step_id=step_id,
+                        agent=step.agent,
+                        role=step.role,
+                        status="failed",
+                        attempts=attempt,
+                        started_at=state["steps"][step_id]["started_at"],
+                        finished_at=utc_now_iso(),
+                        summary="Unhandled exception",
+                        artifacts=step_paths,
+                        error=ErrorInfo(code="exception", message=str(e)),
+                    )
+
+                # Validate artifacts for secret leaks and enforce result contract.
+                logs_txt, (secrets_ok, secrets_msg) = await asyncio.gather(
+                    _read_text_async(step_dir / "logs.txt"),
+                    asyncio.to_thread(_run_secrets_check, step_dir),
                 )
-            next_retention_at = time.time() + settings.retention_interval_sec
+                logs_txt = (logs_txt.rstrip() + "\n\n" if logs_txt.strip() else "") + f"[secrets_check] {secrets_msg}\n"
+
+                if secrets_ok:
+                    last_result = last_result.model_copy(update={"secrets_check": "passed"})
+                else:
+                    last_result = last_result.model_copy(
+                        update={
+                            "status": "failed",
+                            "finished_at": utc_now_iso(),
+                            "summary": "Secrets check failed",
+                            "secrets_check": "failed",
+                            "error": ErrorInfo(
+                                code="secrets_check_failed",
+                                message="Potential secrets detected in step artifacts",
+                            ),
+                        }
+                    )
 
-        try:
-            claimed = q.claim()
-        except QueueEmpty:
-            await asyncio.sleep(settings.runner_poll_interval_sec)
-            continue
+                # The verdict decides the step status, so it stays awaited; the thread keeps
+                # jsonschema off the event loop while other steps/jobs are running.
+                result_obj = last_result.model_dump()
+                try:
+                    await asyncio.to_thread(validate_result_contract, result_obj, result_schema)
+                except SchemaValidationError as e:
+                    last_result = last_result.model_copy(
+                        update={
+                            "status": "failed",
+                            "finished_at": utc_now_iso(),
+                            "summary": "Result schema validation failed",
+                            "error": ErrorInfo(code="result_schema_validation_failed", message=str(e)),
+                        }
+                    )
+                    result_obj = last_result.model_dump()
 
-        try:
-            job_obj = q.read_claimed(claimed)
+                # report.md/patch.diff are persisted as the worker left them (no read-back round trip).
+                store.persist_step_artifacts_in_place(
+                    job.job_id,
+                    step_id,
+                    logs_txt=logs_txt,
+                    result_obj=result_obj,
+                )
 
-            # Validate contract early (fail fast)
-            validate_json(job_obj, job_schema)
+                if budget.enabled and api_call_consumed:
+                    budget.log_budget(
+                        step.agent,
+                        api_calls=1,
+                        cost_usd=float(last_result.metrics.cost_usd or 0.0),
+                    )
 
-            job = JobSpec.model_validate(job_obj)
-            if job.project_id:
-                source_hint: Path | None = workspace_manager.resolve_project_alias(job.project_id)
-            elif job.source.type == "webhook":
-                source_hint = None
-            else:
-                source_hint = Path(job.workdir).expanduser()
-            layout = workspace_manager.prepare_workspace(job_id=job.job_id, source_hint=source_hint)
-            job = job.model_copy(update={"workdir": str(layout.workdir)})
-
-            store.ensure_job_layout(job.job_id)
-            store.write_job_spec(job.job_id, job.model_dump())
-
-            job_dir = store.job_dir(job.job_id)
-            started_at = utc_now_iso()
-
-            # Operational state (written after each step)
-            state = {
-                "job_id": job.job_id,
-                "status": "running",
-                "started_at": started_at,
-                "finished_at": None,
-                "current_step": None,
-                "steps": {},
-            }
-            store.write_state(job.job_id, state)
-            context_strategy = job.context_strategy
-            context_window = _apply_context_strategy(
-                _normalize_context_window(job.context_window),
-                context_strategy,
+                state["steps"][step_id].update({
+                    "status": last_result.status,
+                    "finished_at": last_result.finished_at,
+                    "summary": last_result.summary,
+                })
+                state_writer.mark_dirty(state)
+                state_writer.flush()
+
+                if last_result.status == "success":
+                    break
+
+                if attempt <= step.max_retries:
+                    state["steps"][step_id]["status"] = "retrying"
+                    state_writer.mark_dirty(state)
+                    state_writer.maybe_flush()
+                    await _sleep_backoff(step.retry_backoff_sec, attempt)
+
+            return last_result
+
+        def _record_step(step: StepSpec, last_result: StepResult) -> None:
+            nonlocal context_window
+            step_results.append(last_result)
+            context_window = _append_step_to_context(
+                context_window,
+                step_prompt=step.prompt,
+                step_result=last_result,
             )
-            artifact_handoff = job.artifact_handoff
+            context_window = _apply_context_strategy(context_window, context_strategy)
             store.write_context(
                 job.job_id,
                 {
@@ -312,34 +729,110 @@ async def run_forever_async() -> None:
                 },
             )
 
-            step_results: list[StepResult] = []
+        def _start_step(step: StepSpec) -> tuple[BaseWorker | None, Path]:
+            step_dir = _ensure_step_dir(step.step_id)
+            state["current_step"] = step.step_id
+            state["steps"].setdefault(step.step_id, {})
+            state_writer.mark_dirty(state)
+            state_writer.maybe_flush()
 
-            overall_status = "success"
-            overall_error: ErrorInfo | None = None
-            job_policy = policy.for_job(
-                job_sandbox=job.policy.sandbox,
-                job_network_policy=job.policy.network,
-                job_allowed_binaries=job.policy.allowed_binaries,
-            )
-            if settings.enable_real_cli:
-                try:
-                    job_policy.assert_real_cli_safe()
-                except PolicyError as e:
-                    overall_status = "failed"
-                    overall_error = ErrorInfo(code="policy", message=str(e))
-            if settings.enable_real_cli and overall_error is None:
-                try:
-                    versions = assert_real_cli_ready(
-                        allowed_binaries=job_policy.allowed_binaries,
-                        min_binary_versions=settings.min_binary_versions,
-                        required_binaries=sorted(required_binaries_for_job(job)),
+            if artifact_handoff != "manual" and (step.input_artifacts or step.apply_patches_from):
+                log.info(
+                    "Step %s manual artifact fields ignored by artifact_handoff=%s",
+                    step.step_id,
+                    artifact_handoff,
+                )
+            return get_worker(step.agent), step_dir
+
+        async def _run_step_graph(step_deps: dict[str, list[str]]) -> None:
+            # Steps start as soon as their dependencies finish. state/context mutations need no
+            # lock: they never span an await, so concurrent steps cannot interleave inside them.
+            spec_by_id = {s.step_id: s for s in job.steps}
+            waiting = {sid: set(deps) for sid, deps in step_deps.items()}
+            dependents: dict[str, list[str]] = {sid: [] for sid in step_deps}
+            for sid, deps in step_deps.items():
+                for dep in deps:
+                    dependents[dep].append(sid)
+            slots = asyncio.Semaphore(settings.runner_max_parallel_steps)
+
+            def _halt(status: str, error: ErrorInfo) -> None:
+                # First failure wins; steps already running are allowed to finish.
+                nonlocal overall_status, overall_error
+                if overall_error is None:
+                    overall_status = status
+                    overall_error = error
+
+            async def _run_node(step: StepSpec, tg: asyncio.TaskGroup) -> None:
+                step_id = step.step_id
+                async with slots:
+                    if overall_error is not None:
+                        return
+                    worker, step_dir = _start_step(step)
+                    if not worker:
+                        _halt("failed", ErrorInfo(code="unknown_agent", message=f"Unknown agent '{step.agent}'"))
+                        return
+                    effective_step = _resolve_effective_step(
+                        step,
+                        artifact_handoff=artifact_handoff,
+                        previous_success_step_id=_latest_successful_step_id(
+                            [sr for sr in step_results if sr.step_id in step_deps[step_id]]
+                        ),
                     )
-                    if versions:
-                        log.info("Real CLI preflight versions for job %s: %s", job.job_id, versions)
-                except PreflightError as e:
-                    overall_status = "failed"
-                    overall_error = ErrorInfo(code="preflight", message=str(e))
-
+                    last_result = await _run_step(step, effective_step, worker, step_dir)
+                    if last_result is None:
+                        # No-op when _run_step already recorded a policy error.
+                        _halt("failed", ErrorInfo(code="no_result", message=f"No result for step {step_id}"))
+                        return
+                    # A step that was already running when another failed still lands in the results.
+                    _record_step(step, last_result)
+                    if overall_error is not None:
+                        return
+
+                    if last_result.status != "success":
+                        on_failure = step.on_failure or "stop"
+                        if last_result.status == "needs_human":
+                            on_failure = "ask_human"
+                        if on_failure == "ask_human":
+                            _halt(
+                                "needs_human",
+                                ErrorInfo(
+                                    code="awaiting_human",
+                                    message=f"Step {step_id} requested human intervention",
+                                    details={"step_id": step_id, "status": last_result.status},
+                                ),
+                            )
+                            return
+                        if on_failure != "continue":
+                            _halt(
+                                "failed",
+                                ErrorInfo(
+                                    code="step_failed",
+                                    message=f"Step {step_id} failed with status={last_result.status}",
+                                ),
+                            )
+                            return
+
+                for sid in dependents[step_id]:
+                    waiting[sid].discard(step_id)
+                    if not waiting[sid]:
+                        tg.create_task(_run_node(spec_by_id[sid], tg))
+
+            async with asyncio.TaskGroup() as tg:
+                for sid, deps in waiting.items():
+                    if not deps:
+                        tg.create_task(_run_node(spec_by_id[sid], tg))
+            # Completion order is nondeterministic; aggregate in declaration order.
+            step_results.sort(key=lambda sr: step_index_by_id[sr.step_id])
+
+        if overall_error is None and any(step.depends_on is not None for step in job.steps):
+            try:
+                step_deps = _step_dependencies(job.steps)
+            except ValueError as e:
+                overall_status = "failed"
+                overall_error = ErrorInfo(code="invalid_dependencies", message=str(e))
+            else:
+                await _run_step_graph(step_deps)
+        else:
             step_idx = 0
             while step_idx < len(job.steps):
                 step = job.steps[step_idx]
@@ -351,202 +844,13 @@ async def run_forever_async() -> None:
                 if overall_error is not None:
                     break
                 step_id = step.step_id
-                store.ensure_step_layout(job.job_id, step_id)
-                step_dir = store.step_dir(job.job_id, step_id)
-
-                state["current_step"] = step_id
-                state["steps"].setdefault(step_id, {})
-                store.write_state(job.job_id, state)
-
-                worker = get_worker(step.agent)
+                worker, step_dir = _start_step(step)
                 if not worker:
                     overall_status = "failed"
                     overall_error = ErrorInfo(code="unknown_agent", message=f"Unknown agent '{step.agent}'")
                     break
 
-                attempt = 0
-                last_result: StepResult | None = None
-
-                if artifact_handoff != "manual" and (step.input_artifacts or step.apply_patches_from):
-                    log.info(
-                        "Step %s manual artifact fields ignored by artifact_handoff=%s",
-                        step.step_id,
-                        artifact_handoff,
-                    )
-
-                while attempt <= step.max_retries:
-                    attempt += 1
-
-                    state["steps"][step_id].update({
-                        "status": "running",
-                        "attempt": attempt,
-                        "agent": step.agent,
-                        "role": step.role,
-                        "started_at": utc_now_iso(),
-                    })
-                    store.write_state(job.job_id, state)
-
-                    ctx = StepContext(
-                        job=job,
-                        step=effective_step,
-                        job_dir=job_dir,
-                        step_dir=step_dir,
-                        enable_real_cli=settings.enable_real_cli,
-                        policy=job_policy,
-                        env_allowlist=settings.env_allowlist,
-                        sensitive_env_vars=settings.sensitive_env_vars,
-                        sandbox_clear_env=settings.sandbox_clear_env,
-                        max_input_artifacts_files=settings.max_input_artifacts_files,
-                        max_input_artifact_chars=settings.max_input_artifact_chars,
-                        max_input_artifacts_chars=settings.max_input_artifacts_chars,
-                        max_subprocess_output_chars=settings.max_subprocess_output_chars,
-                        idle_watchdog_sec=settings.runner_max_idle_sec,
-                        non_git_workdir_status=settings.non_git_workdir_status,
-                        context_window=list(context_window),
-                        context_strategy=context_strategy,
-                    )
-                    api_call_consumed = False
-
-                    try:
-                        if budget.enabled:
-                            budget.check_budget()
-
-                        # Hard timeout enforced here too (worker may also enforce)
-                        res: StepResult = await asyncio.wait_for(worker.run(ctx), timeout=step.timeout_sec + 5)
-                        api_call_consumed = True
-                        # Overwrite attempts to reflect retries
-                        res.attempts = attempt
-                        last_result = res
-                    except BudgetLimitExceeded as e:
-                        last_result = StepResult(
-                            job_id=job.job_id,
-                            step_id=step_id,
-                            agent=step.agent,
-                            role=step.role,
-                            status="failed",
-                            attempts=attempt,
-                            started_at=state["steps"][step_id]["started_at"],
-                            finished_at=utc_now_iso(),
-                            summary="Budget limit exceeded",
-                            artifacts=ArtifactPaths(
-                                report_md=str(Path("steps") / step_id / "report.md"),
-                                patch_diff=str(Path("steps") / step_id / "patch.diff"),
-                                logs_txt=str(Path("steps") / step_id / "logs.txt"),
-                                result_json=str(Path("steps") / step_id / "result.json"),
-                            ),
-                            error=ErrorInfo(code="budget_exceeded", message=str(e)),
-                        )
-                    except PolicyError as e:
-                        overall_status = "failed"
-                        overall_error = ErrorInfo(code="policy", message=str(e))
-                        last_result = None
-                        break
-                    except asyncio.TimeoutError:
-                        api_call_consumed = True
-                        last_result = StepResult(
-                            job_id=job.job_id,
-                            step_id=step_id,
-                            agent=step.agent,
-                            role=step.role,
-                            status="timeout",
-                            attempts=attempt,
-                            started_at=state["steps"][step_id]["started_at"],
-                            finished_at=utc_now_iso(),
-                            summary=f"Step timeout after {step.timeout_sec}s",
-                            artifacts=ArtifactPaths(
-                                report_md=str(Path("steps") / step_id / "report.md"),
-                                patch_diff=str(Path("steps") / step_id / "patch.diff"),
-                                logs_txt=str(Path("steps") / step_id / "logs.txt"),
-                                result_json=str(Path("steps") / step_id / "result.json"),
-                            ),
-                        )
-                    except Exception as e:
-                        api_call_consumed = True
-                        last_result = StepResult(
-                            job_id=job.job_id,
-                            step_id=step_id,
-                            agent=step.agent,
-                            role=step.role,
-                            status="failed",
-                            attempts=attempt,
-                            started_at=state["steps"][step_id]["started_at"],
-                            finished_at=utc_now_iso(),
-                            summary="Unhandled exception",
-                            artifacts=ArtifactPaths(
-                                report_md=str(Path("steps") / step_id / "report.md"),
-                                patch_diff=str(Path("steps") / step_id / "patch.diff"),
-                                logs_txt=str(Path("steps") / step_id / "logs.txt"),
-                                result_json=str(Path("steps") / step_id / "result.json"),
-                            ),
-                            error=ErrorInfo(code="exception", message=str(e)),
-                        )
-
-                    # Validate artifacts for secret leaks and enforce result contract.
-                    report_md = _read_text(step_dir / "report.md")
-                    patch_diff = _read_text(step_dir / "patch.diff")
-                    logs_txt = _read_text(step_dir / "logs.txt")
-                    secrets_ok, secrets_msg = _run_secrets_check(step_dir)
-                    logs_txt = (logs_txt.rstrip() + "\n\n" if logs_txt.strip() else "") + f"[secrets_check] {secrets_msg}\n"
-
-                    if secrets_ok:
-                        last_result = last_result.model_copy(update={"secrets_check": "passed"})
-                    else:
-                        last_result = last_result.model_copy(
-                            update={
-                                "status": "failed",
-                                "finished_at": utc_now_iso(),
-                                "summary": "Secrets check failed",
-                                "secrets_check": "failed",
-                                "error": ErrorInfo(
-                                    code="secrets_check_failed",
-                                    message="Potential secrets detected in step artifacts",
-                                ),
-                            }
-                        )
-
-                    try:
-                        validate_result_contract(last_result.model_dump(), result_schema)
-                    except SchemaValidationError as e:
-                        last_result = last_result.model_copy(
-                            update={
-                                "status": "failed",
-                                "finished_at": utc_now_iso(),
-                                "summary": "Result schema validation failed",
-                                "error": ErrorInfo(code="result_schema_validation_failed", message=str(e)),
-                            }
-                        )
-
-                    store.write_step_artifacts(
-                        job.job_id,
-                        step_id,
-                        report_md=report_md,
-                        patch_diff=patch_diff,
-                        logs_txt=logs_txt,
-                        result_obj=last_result.model_dump(),
-                    )
-
-                    if budget.enabled and api_call_consumed:
-                        budget.log_budget(
-                            step.agent,
-                            api_calls=1,
-                            cost_usd=float(last_result.metrics.cost_usd or 0.0),
-                        )
-
-                    state["steps"][step_id].update({
-                        "status": last_result.status,
-                        "finished_at": last_result.finished_at,
-                        "summary": last_result.summary,
-                    })
-                    store.write_state(job.job_id, state)
-
-                    if last_result.status == "success":
-                        break
-
-                    if attempt <= step.max_retries:
-                        state["steps"][step_id]["status"] = "retrying"
-                        store.write_state(job.job_id, state)
-                        await _sleep_backoff(step.retry_backoff_sec, attempt)
-
+                last_result = await _run_step(step, effective_step, worker, step_dir)
                 if overall_error is not None:
                     break
 
@@ -555,27 +859,13 @@ async def run_forever_async() -> None:
                     overall_error = ErrorInfo(code="no_result", message=f"No result for step {step_id}")
                     break
 
-                step_results.append(last_result)
-                context_window = _append_step_to_context(
-                    context_window,
-                    step_prompt=step.prompt,
-                    step_result=last_result,
-                )
-                context_window = _apply_context_strategy(context_window, context_strategy)
-                store.write_context(
-                    job.job_id,
-                    {
-                        "strategy": context_strategy,
-                        "messages": context_window,
-                        "updated_at": utc_now_iso(),
-                    },
-                )
+                _record_step(step, last_result)
 
                 if last_result.status != "success":
                     on_failure = getattr(step, "on_failure", "stop") or "stop"
                     if last_result.status == "needs_human":
                         on_failure = "ask_human"
-                    next_idx = _resolve_on_failure(on_failure, job.steps, step_idx)
+                    next_idx = _resolve_on_failure(on_failure, job.steps, step_idx, step_index_by_id)
                     if next_idx == "ask_human":
                         overall_status = "needs_human"
                         overall_error = ErrorInfo(
@@ -597,94 +887,223 @@ async def run_forever_async() -> None:
 
                 step_idx += 1
 
-            finished_at = utc_now_iso()
+        finished_at = utc_now_iso()
+
+        # Build aggregated artifacts for the job (raw bytes, written with one writev per file)
+        agg_report: list[bytes] = []
+        agg_patch: list[bytes] = []
+        agg_logs: list[bytes] = []
+        _add_part(agg_report, f"# Job {job.job_id}\n".encode())
+        _add_part(agg_report, f"## Goal\n\n{job.goal}\n".encode())
+
+        step_bytes = await asyncio.gather(
+            *(
+                asyncio.gather(
+                    asyncio.to_thread(_read_bytes, step_dirs[sr.step_id] / "report.md"),
+                    asyncio.to_thread(_read_bytes, step_dirs[sr.step_id] / "patch.diff"),
+                    asyncio.to_thread(_read_bytes, step_dirs[sr.step_id] / "logs.txt"),
+                )
+                for sr in step_results
+            )
+        )
+        for sr, (report, patch, logs) in zip(step_results, step_bytes):
+            label = f"{sr.step_id} ({sr.agent}:{sr.role})".encode()
+            _add_part(agg_report, b"\n---\n\n## Step ", label, b"\n\n")
+            _add_part(agg_report, report)
+
+            patch = patch.strip()
+            if patch:
+                _add_part(agg_patch, b"\n\n# --- step ", label, b" ---\n\n", patch, b"\n")
+
+            logs = logs.strip()
+            if logs:
+                _add_part(agg_logs, b"\n\n# --- step ", label, b" ---\n\n", logs, b"\n")
+
+        job_report_parts = _strip_parts(agg_report) + [b"\n"]
+        job_patch_parts = _strip_parts(agg_patch) + [b"\n"]
+        job_logs_parts = _strip_parts(agg_logs) + [b"\n"]
+
+        job_result = JobResult(
+            job_id=job.job_id,
+            status=overall_status,
+            started_at=started_at,
+            finished_at=finished_at,
+            summary=f"Completed with status={overall_status}. steps={len(step_results)}",
+            artifacts=_JOB_ARTIFACTS,
+            secrets_check=(
+                "passed"
+                if step_results and all(sr.secrets_check == "passed" for sr in step_results)
+                else "failed"
+            ),
+            steps=step_results,
+            error=overall_error,
+        )
+
+        job_result_obj = job_result.model_dump()
+        await asyncio.to_thread(validate_result_contract, job_result_obj, result_schema)
 
-            # Build aggregated artifacts for the job
-            agg_report_parts = [f"# Job {job.job_id}\n", f"## Goal\n\n{job.goal}\n"]
-            agg_patch_parts = []
-            agg_logs_parts = []
+        store.write_job_artifacts_iovec(
+            job.job_id,
+            report_parts=job_report_parts,
+            patch_parts=job_patch_parts,
+            logs_parts=job_logs_parts,
+            result_obj=job_result_obj,
+        )
 
-            for sr in step_results:
-                sd = store.step_dir(job.job_id, sr.step_id)
-                agg_report_parts.append(f"\n---\n\n## Step {sr.step_id} ({sr.agent}:{sr.role})\n\n")
-                agg_report_parts.append(_read_text(sd / "report.md"))
+        state["status"] = overall_status
+        state["finished_at"] = finished_at
+        state_writer.mark_dirty(state)
+        state_writer.maybe_flush(force=True)
 
-                patch = _read_text(sd / "patch.diff").strip()
-                if patch:
-                    agg_patch_parts.append(f"\n\n# --- step {sr.step_id} ({sr.agent}:{sr.role}) ---\n\n{patch}\n")
+        # Fire callback if configured (event-driven notification)
+        if job.callback_url:
+            await _fire_callback(job.callback_url, job_result_obj)
 
-                logs = _read_text(sd / "logs.txt").strip()
-                if logs:
-                    agg_logs_parts.append(f"\n\n# --- step {sr.step_id} ({sr.agent}:{sr.role}) ---\n\n{logs}\n")
+        if overall_status == "success":
+            q.ack(claimed)
+        elif overall_status == "needs_human":
+            q.await_approval(claimed)
+        else:
+            q.fail(claimed)
 
-            job_report_md = "\n".join(agg_report_parts).strip() + "\n"
-            job_patch_diff = "\n".join(agg_patch_parts).strip() + "\n"
-            job_logs_txt = "\n".join(agg_logs_parts).strip() + "\n"
+        log.info("Job %s finished: %s", job.job_id, overall_status)
 
-            job_artifacts = ArtifactPaths(
-                report_md="report.md",
-                patch_diff="patch.diff",
-                logs_txt="logs.txt",
-                result_json="result.json",
-            )
+    except Exception as e:
+        if isinstance(e, WorkspaceError):
+            log.error("Workspace preparation failed: %s", e)
+        if isinstance(e, PreflightError):
+            log.error("Preflight failed: %s", e)
+        log.exception("Job failed unexpectedly: %s", e)
+        try:
+            q.fail(claimed)
+        except Exception:
+            pass
 
-            job_result = JobResult(
-                job_id=job.job_id,
-                status=overall_status,
-                started_at=started_at,
-                finished_at=finished_at,
-                summary=f"Completed with status={overall_status}. steps={len(step_results)}",
-                artifacts=job_artifacts,
-                secrets_check=(
-                    "passed"
-                    if step_results and all(sr.secrets_check == "passed" for sr in step_results)
-                    else "failed"
-                ),
-                steps=step_results,
-                error=overall_error,
-            )
 
-            validate_result_contract(job_result.model_dump(), result_schema)
+async def run_forever_async() -> None:
+    load_dotenv()
+    settings = Settings.load()
+    setup_logging(settings.log_level, json_output=settings.log_json)
+    ensure_workers_registered()
+    if install_pidfd_child_watcher():
+        log.debug("Using pidfd child watcher for subprocesses")
 
-            store.write_job_artifacts(
-                job.job_id,
-                report_md=job_report_md,
-                patch_diff=job_patch_diff,
-                logs_txt=job_logs_txt,
-                result_obj=job_result.model_dump(),
-            )
+    q = FileQueue(settings.queue_root)
+    store = ArtifactStore(settings.artifacts_root)
+    workspace_manager = WorkspaceManager(settings.workspaces_root, settings.project_aliases)
+    budget = BudgetTracker(
+        db_path=settings.state_db_path,
+        max_daily_api_calls=settings.max_daily_api_calls,
+        max_daily_cost_usd=settings.max_daily_cost_usd,
+    )
+
+    job_schema = _contracts_dir() / "job.schema.json"
+    result_schema = _contracts_dir() / "result.schema.json"
+    # Compile both contracts up front so the first job doesn't pay for it.
+    get_validator(job_schema)
+    get_validator(result_schema)
+
+    policy = build_policy_from_env(
+        allowed_binaries=settings.allowed_binaries,
+        sandbox=settings.sandbox,
+        sandbox_wrapper=settings.sandbox_wrapper,
+        sandbox_wrapper_args=settings.sandbox_wrapper_args,
+        network_policy=settings.network_policy,
+    )
+    try:
+        assert_startup_policy_safe(enable_real_cli=settings.enable_real_cli, policy=policy)
+    except PolicyError:
+        log.error("Runner startup policy check failed for real CLI mode")
+        raise
 
-            state["status"] = overall_status
-            state["finished_at"] = finished_at
-            store.write_state(job.job_id, state)
+    log.info("Runner started. enable_real_cli=%s sandbox=%s", settings.enable_real_cli, settings.sandbox)
+    if policy.network_policy == "deny" and (not policy.sandbox or not policy.sandbox_wrapper):
+        log.warning(
+            "NETWORK_POLICY=deny is configured without enforceable sandbox wrapper. "
+            "Real CLI jobs requesting network deny will be rejected."
+        )
+    if settings.runner_use_inotify and not q.watch_pending():
+        log.warning("RUNNER_USE_INOTIFY=1 but no filesystem watcher is available; falling back to polling")
+    rt = _Runtime(
+        settings=settings,
+        queue=q,
+        store=store,
+        workspace_manager=workspace_manager,
+        budget=budget,
+        policy=policy,
+        job_schema=job_schema,
+        result_schema=result_schema,
+    )
+    await _serve(rt)
 
-            # Fire callback if configured (event-driven notification)
-            if job.callback_url:
-                await _fire_callback(job.callback_url, job_result.model_dump())
 
-            if overall_status == "success":
-                q.ack(claimed)
-            elif overall_status == "needs_human":
-                q.await_approval(claimed)
-            else:
-                q.fail(claimed)
+async def _serve(rt: _Runtime) -> None:
+    """Claim/dispatch loop: up to RUNNER_MAX_PARALLEL_JOBS jobs in flight, reclaim and retention between polls."""
+    settings = rt.settings
+    q = rt.queue
+    # Task -> running/ file name of the job it processes.
+    in_flight: dict[asyncio.Task[None], str] = {}
+    next_retention_at = 0.0
+    empty_streak = 0
 
-            log.info("Job %s finished: %s", job.job_id, overall_status)
+    try:
+        while True:
+            # Our own in-flight jobs sit in running/ too; a long one must not look orphaned.
+            reclaimed = reclaim_stale_running_jobs(
+                q, settings.runner_reclaim_after_sec, skip_names=frozenset(in_flight.values())
+            )
+            if reclaimed:
+                log.warning("Reclaimed %s stale running job(s) back to pending", reclaimed)
+            if settings.retention_interval_sec > 0 and time.time() >= next_retention_at:
+                stats = run_retention(
+                    queue_root=settings.queue_root,
+                    artifacts_root=settings.artifacts_root,
+                    workspaces_root=settings.workspaces_root,
+                    artifacts_ttl_sec=settings.artifacts_ttl_sec,
+                    workspaces_ttl_sec=settings.workspaces_ttl_sec,
+                )
+                if stats.removed_artifacts or stats.removed_workspaces:
+                    log.info(
+                        "Retention cleanup removed artifacts=%s workspaces=%s",
+                        stats.removed_artifacts,
+                        stats.removed_workspaces,
+                    )
+                next_retention_at = time.time() + settings.retention_interval_sec
 
-        except Exception as e:
-            if isinstance(e, WorkspaceError):
-                log.error("Workspace preparation failed: %s", e)
-            if isinstance(e, PreflightError):
-                log.error("Preflight failed: %s", e)
-            log.exception("Job failed unexpectedly: %s", e)
-            try:
-                q.fail(claimed)
-            except Exception:
-                pass
+            free_slots = settings.runner_max_parallel_jobs - len(in_flight)
+            if free_slots <= 0:
+                # Bounded wait so reclaim/retention keep ticking while every slot is busy.
+                await asyncio.wait(
+                    in_flight, timeout=settings.runner_poll_max_sec, return_when=asyncio.FIRST_COMPLETED
+                )
+                continue
+
+            claimed_batch = q.claim_many(min(settings.runner_claim_batch_size, free_slots))
+            if not claimed_batch:
+                empty_streak += 1
+                delay = _idle_poll_delay(settings.runner_poll_interval_sec, empty_streak, settings.runner_poll_max_sec)
+                if settings.runner_use_inotify:
+                    # The timeout keeps reclaim/retention ticking while the queue is idle.
+                    await q.wait_for_job(timeout=delay)
+                else:
+                    await asyncio.sleep(delay)
+                continue
+            empty_streak = 0
+
+            for claimed in claimed_batch:
+                task = asyncio.create_task(_process_job(rt, claimed))
+                in_flight[task] = claimed.path.name
+                task.add_done_callback(in_flight.pop)
+    finally:
+        # Releases the inotify fd / watchdog observer thread that wait_for_job() may have started.
+        q.close()
 
 
 def run_forever() -> None:
-    asyncio.run(run_forever_async())
+    try:
+        asyncio.run(run_forever_async())
+    finally:
+        _shutdown_cpu_pool()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-import json
+import heapq
 import logging
+import os
 import time
 from datetime import datetime, timezone
 from pathlib import Path
@@ -11,6 +12,7 @@ from croniter import croniter
 from dotenv import load_dotenv
 
 from orchestrator.config import Settings
+from orchestrator.json_utils import loads as json_loads
 from orchestrator.logging_utils import setup_logging
 from orchestrator.models import JobSpec, default_pipeline, JobSource, StepSpec, PolicySpec
 from fsqueue.file_queue import DuplicateJobError, FileQueue
@@ -28,7 +30,7 @@ def _schedules_dir() -> Path:
 
 
 def _load_json(path: Path) -> dict[str, Any]:
-    return json.loads(path.read_text(encoding="utf-8"))
+    return json_loads(path.read_bytes())
 
 
 def _now() -> datetime:
@@ -44,69 +46,119 @@ class CronScheduler:
         self.queue = queue
         self.schedules_dir = schedules_dir
         self.next_runs: dict[str, datetime] = {}
+        # (next_run, sched_id); entries whose time no longer matches next_runs are stale and skipped.
+        self._due: list[tuple[datetime, str]] = []
+        # path -> (st_mtime_ns, parsed schedule or None when unreadable)
+        self._files: dict[str, tuple[int, dict[str, Any] | None]] = {}
+        self._crons: dict[str, croniter] = {}
 
     def _compute_next(self, expr: str, base: datetime) -> datetime:
-        it = croniter(expr, base)
+        it = self._crons.get(expr)
+        if it is None:
+            it = self._crons[expr] = croniter(expr, base)
+        else:
+            it.set_current(base, force=True)
         return it.get_next(datetime)
 
-    def tick(self) -> None:
-        self.schedules_dir.mkdir(parents=True, exist_ok=True)
-        files = sorted(self.schedules_dir.glob("*.json"))
+    def _schedule_next(self, sched_id: str, expr: str, base: datetime) -> None:
+        next_run = self._compute_next(expr, base)
+        self.next_runs[sched_id] = next_run
+        heapq.heappush(self._due, (next_run, sched_id))
+        log.info("Schedule %s next run at %s", sched_id, _utc_iso(next_run))
 
-        now = _now()
-
-        for f in files:
+    def _load_schedules(self) -> dict[str, tuple[dict[str, Any], Path]]:
+        """Enabled schedules by id; a file is re-parsed only when its mtime changes."""
+        self.schedules_dir.mkdir(parents=True, exist_ok=True)
+        seen: set[str] = set()
+        active: dict[str, tuple[dict[str, Any], Path]] = {}
+        for f in sorted(self.schedules_dir.glob("*.json")):
+            key = str(f)
             try:
-                sched = _load_json(f)
-            except Exception as e:
-                log.error("Failed to read schedule %s: %s", f, e)
+                mtime_ns = os.stat(key).st_mtime_ns
+            except FileNotFoundError:
                 continue
-
-            if not sched.get("enabled", True):
+            seen.add(key)
+            cached = self._files.get(key)
+            fresh = cached is None or cached[0] != mtime_ns
+            if fresh:
+                try:
+                    sched: dict[str, Any] | None = _load_json(f)
+                except Exception as e:
+                    log.error("Failed to read schedule %s: %s", f, e)
+                    sched = None
+                self._files[key] = (mtime_ns, sched)
+            else:
+                sched = cached[1]
+            if sched is None or not sched.get("enabled", True):
                 continue
 
             sched_id = str(sched.get("id") or f.stem)
-            expr = str(sched.get("schedule") or "").strip()
-            payload = sched.get("payload") or {}
-
-            if not expr:
-                log.warning("Schedule %s has no cron expression", sched_id)
+            if not str(sched.get("schedule") or "").strip():
+                if fresh:
+                    log.warning("Schedule %s has no cron expression", sched_id)
                 continue
+            active.setdefault(sched_id, (sched, f))
+        for key in self._files.keys() - seen:
+            del self._files[key]
+        return active
+
+    def seconds_until_next(self, now: datetime | None = None) -> float | None:
+        """Seconds until the earliest known firing, or None when nothing is scheduled."""
+        if not self._due:
+            return None
+        now = now or _now()
+        return max(0.0, (self._due[0][0] - now).total_seconds())
 
+    def tick(self) -> None:
+        active = self._load_schedules()
+
+        now = _now()
+
+        for sched_id, (sched, _) in active.items():
             if sched_id not in self.next_runs:
-                self.next_runs[sched_id] = self._compute_next(expr, now)
-                log.info("Schedule %s next run at %s", sched_id, _utc_iso(self.next_runs[sched_id]))
-
-            if now >= self.next_runs[sched_id]:
-                # Fire
-                goal = str(payload.get("goal") or f"Scheduled job {sched_id}")
-                steps_payload = payload.get("steps")
-
-                if steps_payload:
-                    steps = [StepSpec.model_validate(s) for s in steps_payload]
-                else:
-                    steps = default_pipeline(goal)
-
-                job = JobSpec(
-                    goal=goal,
-                    source=JobSource(type="cron", meta={"schedule_id": sched_id, "file": str(f)}),
-                    steps=steps,
-                    policy=PolicySpec(**(payload.get("policy") or {})),
-                    project_id=(str(payload.get("project_id")).strip() if payload.get("project_id") is not None else None),
-                    workdir=str(payload.get("workdir") or "."),
-                    tags=list(payload.get("tags") or []),
-                    metadata=dict(payload.get("metadata") or {}),
-                )
-                try:
-                    enqueue_state = "awaiting_approval" if job.policy.requires_approval else "pending"
-                    self.queue.enqueue(job.model_dump(), state=enqueue_state)
-                    log.info("Enqueued scheduled job %s (job_id=%s)", sched_id, job.job_id)
-                except DuplicateJobError:
-                    log.warning("Skipping duplicate scheduled job %s (job_id=%s)", sched_id, job.job_id)
+                self._schedule_next(sched_id, str(sched["schedule"]).strip(), now)
 
-                # Compute next run
-                self.next_runs[sched_id] = self._compute_next(expr, now)
-                log.info("Schedule %s next run at %s", sched_id, _utc_iso(self.next_runs[sched_id]))
+        while self._due and self._due[0][0] <= now:
+            due_at, sched_id = heapq.heappop(self._due)
+            if self.next_runs.get(sched_id) != due_at:
+                continue
+            entry = active.get(sched_id)
+            if entry is None:
+                # Removed or disabled: forget it; it is rescheduled from scratch if it comes back.
+                del self.next_runs[sched_id]
+                continue
+            sched, f = entry
+            try:
+                self._fire(sched_id, sched, f)
+            finally:
+                self._schedule_next(sched_id, str(sched["schedule"]).strip(), now)
+
+    def _fire(self, sched_id: str, sched: dict[str, Any], f: Path) -> None:
+        payload = sched.get("payload") or {}
+        goal = str(payload.get("goal") or f"Scheduled job {sched_id}")
+        steps_payload = payload.get("steps")
+
+        if steps_payload:
+            steps = [StepSpec.model_validate(s) for s in steps_payload]
+        else:
+            steps = default_pipeline(goal)
+
+        job = JobSpec(
+            goal=goal,
+            source=JobSource(type="cron", meta={"schedule_id": sched_id, "file": str(f)}),
+            steps=steps,
+            policy=PolicySpec(**(payload.get("policy") or {})),
+            project_id=(str(payload.get("project_id")).strip() if payload.get("project_id") is not None else None),
+            workdir=str(payload.get("workdir") or "."),
+            tags=list(payload.get("tags") or []),
+            metadata=dict(payload.get("metadata") or {}),
+        )
+        try:
+            enqueue_state = "awaiting_approval" if job.policy.requires_approval else "pending"
+            self.queue.enqueue(job.model_dump(), state=enqueue_state)
+            log.info("Enqueued scheduled job %s (job_id=%s)", sched_id, job.job_id)
+        except DuplicateJobError:
+            log.warning("Skipping duplicate scheduled job %s (job_id=%s)", sched_id, job.job_id)
 
 
 def main() -> None:
@@ -125,7 +177,9 @@ def main() -> None:
             scheduler.tick()
         except Exception as e:
             log.exception("Scheduler tick error: %s", e)
-        time.sleep(1)
+        # Sleep until the next firing, but wake at least every second to pick up schedule edits.
+        wait = scheduler.seconds_until_next()
+        time.sleep(1.0 if wait is None else min(1.0, wait))
 
 
 if __name__ == "__main__":
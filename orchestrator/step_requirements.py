@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from orchestrator.models import JobSpec
+from orchestrator.models import JobSpec, StepSpec
 from workers import get_worker
 
 
 def required_binaries_for_job(job: JobSpec) -> set[str]:
-    required: set[str] = set()
+    # One worker lookup per distinct agent, not per step.
+    steps_by_agent: dict[str, list[StepSpec]] = {}
     for step in job.steps:
-        worker = get_worker(step.agent)
+        steps_by_agent.setdefault(step.agent, []).append(step)
+
+    required: set[str] = set()
+    for agent, steps in steps_by_agent.items():
+        worker = get_worker(agent)
         if not worker:
             continue
-        required.update(worker.required_binaries(step))
+        required.update(worker.required_binaries_for_steps(steps))
     return required
@@ -1,20 +1,99 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
 import contextlib
+import functools
 import logging
 import os
 import signal
+import sys
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Mapping, Sequence
+from typing import BinaryIO, Mapping, Sequence
 
 
 log = logging.getLogger("subprocess")
 _missing_allowlist_warnings: set[str] = set()
 _safe_base_env_keys_default = ("PATH", "HOME", "TMPDIR")
 _safe_base_env_keys_clear = ("PATH",)
+_READ_CHUNK_BYTES = 65536
+# A log line longer than this is written in pieces rather than buffered without bound.
+_LOG_LINE_MAX_BYTES = 1 << 20
+# Lazily captured on first use (after load_dotenv), reused by every run_command call.
+_env_snapshot: dict[str, str] | None = None
+
+
+def _process_env() -> dict[str, str]:
+    global _env_snapshot
+    if _env_snapshot is None:
+        _env_snapshot = dict(os.environ)
+    return _env_snapshot
+
+
+def refresh_env_cache() -> None:
+    """Re-read os.environ on the next run_command (call after mutating the process env)."""
+    global _env_snapshot
+    _env_snapshot = None
+    _project_env.cache_clear()
+    _base_env.cache_clear()
+
+
+@functools.lru_cache(maxsize=16)
+def _project_env(keys: tuple[str, ...], *, warn_missing: bool = True) -> Mapping[str, str]:
+    environ = _process_env()
+    projected: dict[str, str] = {}
+    for key in keys:
+        val = environ.get(key)
+        if val is None:
+            if warn_missing and key not in _missing_allowlist_warnings:
+                log.warning("ENV allowlist variable is missing in process env: %s", key)
+                _missing_allowlist_warnings.add(key)
+            continue
+        projected[key] = val
+    return projected
+
+
+@functools.lru_cache(maxsize=32)
+def _base_env(allowlist: tuple[str, ...], clear_env: bool) -> Mapping[str, str]:
+    # Safe base keys plus allowlisted process vars, merged once per (allowlist, clear_env).
+    base_keys = _safe_base_env_keys_clear if clear_env else _safe_base_env_keys_default
+    return {**_project_env(base_keys, warn_missing=False), **_project_env(allowlist)}
+
+
+def build_child_env(
+    env: Mapping[str, str] | None, env_allowlist: Sequence[str] | None, *, clear_env: bool = False
+) -> dict[str, str]:
+    """Environment run_command hands to the child: safe base keys, allowlisted
+    process vars, then allowlisted overrides from `env` (others are dropped)."""
+    allowlist = tuple(k for k in (env_allowlist or []) if k)
+    safe_env = dict(_base_env(allowlist, clear_env))
+
+    for key, val in (env or {}).items():
+        if key not in allowlist:
+            log.warning("Ignoring non-allowlisted env override: %s", key)
+            continue
+        safe_env[key] = val
+    return safe_env
+
+
+def install_pidfd_child_watcher() -> bool:
+    """Reap subprocesses via pidfds on the running loop (Python < 3.12, Linux 5.3+).
+
+    3.11 defaults to ThreadedChildWatcher, one waiter thread per child; 3.12+
+    already picks pidfds when available. Returns True when installed.
+    """
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return False
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return False
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(asyncio.get_running_loop())
+    asyncio.get_event_loop_policy().set_child_watcher(watcher)
+    return True
 
 
 @dataclass
@@ -32,22 +111,32 @@ async def _read_stream(
     stream: asyncio.StreamReader,
     sink: list[str],
     *,
-    on_line=None,
+    on_chunk=None,
     max_chars: int | None = None,
 ) -> bool:
     used_chars = 0
     truncated = False
+    # Incremental decoder: a multi-byte UTF-8 sequence may straddle two chunks.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
 
     while True:
-        line = await stream.readline()
-        if not line:
-            break
-        text = line.decode(errors="replace")
+        chunk = await stream.read(_READ_CHUNK_BYTES)
+        final = not chunk
+        if truncated:
+            # Past the cap: keep draining the pipe (and feeding on_chunk), but skip decoding.
+            if final:
+                break
+            if on_chunk:
+                on_chunk(chunk)
+            continue
+        text = decoder.decode(chunk, final=final)
 
-        if max_chars is None:
+        if not text:
+            pass
+        elif max_chars is None:
             sink.append(text)
         elif max_chars == 0:
-            truncated = truncated or bool(text)
+            truncated = True
         elif used_chars < max_chars:
             remaining = max_chars - used_chars
             if len(text) <= remaining:
@@ -60,8 +149,10 @@ async def _read_stream(
         else:
             truncated = True
 
-        if on_line:
-            on_line(text)
+        if final:
+            break
+        if on_chunk:
+            on_chunk(chunk)
 
     if truncated and max_chars is not None:
         sink.append(f"\n[truncated: output exceeded {max_chars} chars]\n")
@@ -69,6 +160,34 @@ async def _read_stream(
     return truncated
 
 
+class _LineLog:
+    """Line-buffered writer for one stream into a log file shared with the other stream.
+
+    Only whole lines are written, so stdout and stderr never split each other's lines.
+    """
+
+    def __init__(self, fh: BinaryIO) -> None:
+        self._fh = fh
+        self._pending = b""
+
+    def write(self, chunk: bytes) -> None:
+        data = self._pending + chunk
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            if len(data) < _LOG_LINE_MAX_BYTES:
+                self._pending = data
+                return
+            cut = len(data)
+        self._fh.write(data[:cut])
+        self._pending = data[cut:]
+
+    def flush(self) -> None:
+        """Write the unterminated tail once the stream has ended."""
+        if self._pending:
+            self._fh.write(self._pending)
+            self._pending = b""
+
+
 async def _terminate_process_group(proc: asyncio.subprocess.Process, *, grace_sec: int = 2) -> None:
     if proc.returncode is not None:
         return
@@ -114,31 +233,13 @@ async def run_command(
     start = time.time()
     killed_by_watchdog = False
 
-    allowlist = [k for k in (env_allowlist or []) if k]
-    base_keys = _safe_base_env_keys_clear if clear_env else _safe_base_env_keys_default
-    safe_env: dict[str, str] = {}
-    for key in base_keys:
-        val = os.environ.get(key)
-        if val is not None:
-            safe_env[key] = val
-
-    for key in allowlist:
-        val = os.environ.get(key)
-        if val is None:
-            if key not in _missing_allowlist_warnings:
-                log.warning("ENV allowlist variable is missing in process env: %s", key)
-                _missing_allowlist_warnings.add(key)
-            continue
-        safe_env[key] = val
-
-    for key, val in (env or {}).items():
-        if key not in allowlist:
-            log.warning("Ignoring non-allowlisted env override: %s", key)
-            continue
-        safe_env[key] = val
+    safe_env = build_child_env(env, env_allowlist, clear_env=clear_env)
 
-    log.info("Passing env vars to subprocess: %s", ",".join(sorted(safe_env.keys())))
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Passing env vars to subprocess: %s", ",".join(sorted(safe_env.keys())))
 
+    # No preexec_fn/user/group: CPython then forks with vfork(), so spawn cost does not
+    # grow with our RSS. (posix_spawn is out: it excludes cwd= and start_new_session=.)
     proc = await asyncio.create_subprocess_exec(
         *cmd,
         cwd=str(cwd),
@@ -152,26 +253,32 @@ async def run_command(
     stderr_lines: list[str] = []
     last_output = time.time()
 
-    def _touch(_line: str):
-        nonlocal last_output
-        last_output = time.time()
-        if log_file:
-            log_file.parent.mkdir(parents=True, exist_ok=True)
-            with log_file.open("a", encoding="utf-8") as f:
-                f.write(_line)
+    log_fh = None
+    stream_logs: tuple[_LineLog | None, _LineLog | None] = (None, None)
+    if log_file:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        log_fh = log_file.open("ab")
+        stream_logs = (_LineLog(log_fh), _LineLog(log_fh))
+
+    def _touch_for(stream_log: _LineLog | None):
+        def _touch(chunk: bytes):
+            nonlocal last_output
+            last_output = time.time()
+            if stream_log is not None:
+                stream_log.write(chunk)
+
+        return _touch
 
     normalized_output_limit = None if max_output_chars is None else max(0, max_output_chars)
     t_out = asyncio.create_task(  # type: ignore[arg-type]
-        _read_stream(proc.stdout, stdout_lines, on_line=_touch, max_chars=normalized_output_limit)
+        _read_stream(proc.stdout, stdout_lines, on_chunk=_touch_for(stream_logs[0]), max_chars=normalized_output_limit)
     )
     t_err = asyncio.create_task(  # type: ignore[arg-type]
-        _read_stream(proc.stderr, stderr_lines, on_line=_touch, max_chars=normalized_output_limit)
+        _read_stream(proc.stderr, stderr_lines, on_chunk=_touch_for(stream_logs[1]), max_chars=normalized_output_limit)
     )
 
     async def _watchdog():
         nonlocal killed_by_watchdog
-        if idle_timeout_sec is None:
-            return
         while proc.returncode is None:
             await asyncio.sleep(1)
             if time.time() - last_output > idle_timeout_sec:
@@ -179,16 +286,23 @@ async def run_command(
                 await _terminate_process_group(proc, grace_sec=2)
                 break
 
-    wd = asyncio.create_task(_watchdog())
+    wd = asyncio.create_task(_watchdog()) if idle_timeout_sec is not None else None
 
     try:
-        await asyncio.wait_for(proc.wait(), timeout=timeout_sec)
-    except asyncio.TimeoutError:
-        await _terminate_process_group(proc, grace_sec=2)
-
-    stdout_truncated = await t_out
-    stderr_truncated = await t_err
-    wd.cancel()
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=timeout_sec)
+        except asyncio.TimeoutError:
+            await _terminate_process_group(proc, grace_sec=2)
+
+        stdout_truncated = await t_out
+        stderr_truncated = await t_err
+    finally:
+        if wd is not None:
+            wd.cancel()
+        if log_fh is not None:
+            for stream_log in stream_logs:
+                stream_log.flush()
+            log_fh.close()
 
     duration_ms = int((time.time() - start) * 1000)
     exit_code = proc.returncode if proc.returncode is not None else -1
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-import json
+import heapq
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 from jsonschema import Draft202012Validator
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
+
+from orchestrator.json_utils import loads as json_loads
 
 
 class SchemaValidationError(ValueError):
@@ -12,16 +17,32 @@ class SchemaValidationError(ValueError):
 
 
 def _load_schema(path: Path) -> dict[str, Any]:
-    return json.loads(path.read_text(encoding="utf-8"))
+    return json_loads(path.read_bytes())
 
 
-def validate_json(instance: dict[str, Any], schema_path: Path) -> None:
+@lru_cache(maxsize=32)
+def _compile_validator(schema_path: Path, mtime_ns: int) -> Validator:
     schema = _load_schema(schema_path)
-    v = Draft202012Validator(schema)
-    errors = sorted(v.iter_errors(instance), key=lambda e: e.path)
+    cls = validator_for(schema, default=Draft202012Validator)
+    # A broken contract fails here, once per schema version, not as a confusing per-instance error.
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+def get_validator(schema_path: Path) -> Validator:
+    """Return a compiled validator, rebuilt only when the schema file changes."""
+    return _compile_validator(schema_path, schema_path.stat().st_mtime_ns)
+
+
+def validate_json(instance: dict[str, Any], schema_path: Path) -> None:
+    v = get_validator(schema_path)
+    # is_valid stops at the first violation; only invalid instances pay for error collection.
+    if v.is_valid(instance):
+        return
+    errors = heapq.nsmallest(10, v.iter_errors(instance), key=lambda e: e.path)
     if errors:
         msg_lines = [f"Schema validation failed for {schema_path}:"]
-        for e in errors[:10]:
+        for e in errors:
             loc = "/".join([str(p) for p in e.path]) or "<root>"
             msg_lines.append(f"- {loc}: {e.message}")
         raise SchemaValidationError("\n".join(msg_lines))
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import errno
 import os
 import shutil
+import stat
 import subprocess
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    import fcntl
+except ModuleNotFoundError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
 
 class WorkspaceError(RuntimeError):
     pass
@@ -16,17 +24,25 @@ def _is_within(base: Path, target: Path) -> bool:
 
 
 def _assert_no_symlink_components(base: Path, target: Path) -> None:
-    base_resolved = base.resolve()
+    _assert_no_symlinks_below(base.resolve(), target)
+
+
+def _assert_no_symlinks_below(base_resolved: Path, target: Path) -> None:
     candidate = target if target.is_absolute() else (base_resolved / target)
     try:
         relative = candidate.relative_to(base_resolved)
     except ValueError as exc:
         raise WorkspaceError(f"Path escapes WORKSPACES_ROOT: {target}") from exc
 
-    cursor = base_resolved
+    # One lstat per component answers both "exists" and "is symlink" (dangling links included).
+    cursor = str(base_resolved)
     for part in relative.parts:
-        cursor = cursor / part
-        if cursor.exists() and cursor.is_symlink():
+        cursor = os.path.join(cursor, part)
+        try:
+            st = os.lstat(cursor)
+        except FileNotFoundError:
+            return  # nothing below a missing component exists either
+        if stat.S_ISLNK(st.st_mode):
             raise WorkspaceError(f"Refusing symlink path component: {cursor}")
 
 
@@ -41,17 +57,98 @@ def _mkdir_secure(path: Path, mode: int = 0o750) -> None:
 
 def _check_no_symlink_escape(base: Path, target: Path) -> None:
     base_resolved = base.resolve()
-    _assert_no_symlink_components(base_resolved, target)
-
-    candidate = target
-    if candidate.exists() and candidate.is_symlink():
-        raise WorkspaceError(f"Refusing symlink path: {candidate}")
-    parent = candidate.parent
-    if parent.exists() and parent.is_symlink():
-        raise WorkspaceError(f"Refusing symlink parent: {parent}")
-    resolved_parent = parent.resolve()
-    if not _is_within(base_resolved, resolved_parent):
-        raise WorkspaceError(f"Path escapes WORKSPACES_ROOT: {candidate}")
+    # Covers target and its parent: both are components of the walked path.
+    _assert_no_symlinks_below(base_resolved, target)
+
+    # Lexical ".." segments are not caught by the walk; the resolved parent is.
+    resolved_parent = target.parent.resolve()
+    if os.path.commonpath([base_resolved, resolved_parent]) != str(base_resolved):
+        raise WorkspaceError(f"Path escapes WORKSPACES_ROOT: {target}")
+
+
+_FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+# errnos meaning "this fast path is not available here", not "the copy failed"
+_UNSUPPORTED_COPY_ERRNOS = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY, errno.EBADF}
+
+
+class _FileCopier:
+    """Per-file copy that prefers reflink (btrfs/XFS CoW clone), then copy_file_range.
+
+    A fast path that fails as unsupported is not retried for the rest of the tree.
+    """
+
+    def __init__(self) -> None:
+        self.reflink = fcntl is not None and sys.platform.startswith("linux")
+        self.copy_range = hasattr(os, "copy_file_range")
+
+    def _try_reflink(self, src_fd: int, dst_fd: int) -> bool:
+        try:
+            fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+            return True
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_COPY_ERRNOS:
+                raise
+            self.reflink = False
+            return False
+
+    def _try_copy_range(self, src_fd: int, dst_fd: int, size: int) -> bool:
+        try:
+            while size > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, size)
+                if copied == 0:
+                    break
+                size -= copied
+            return True
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_COPY_ERRNOS:
+                raise
+            self.copy_range = False
+            return False
+
+    def copy(self, src: str, dst: str) -> None:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+            if not (self.reflink and self._try_reflink(src_fd, dst_fd)):
+                size = os.fstat(src_fd).st_size
+                if not (self.copy_range and self._try_copy_range(src_fd, dst_fd, size)):
+                    # copy_file_range advances both offsets, so this resumes after any partial copy.
+                    shutil.copyfileobj(fsrc, fdst)
+        shutil.copystat(src, dst)
+
+
+def _fast_copytree(src: Path, dst: Path) -> None:
+    """Copy src to a new dst like shutil.copytree, refusing symlink and special-file entries.
+
+    One traversal: each entry is checked and copied as it is listed; on refusal or
+    error the partial dst is removed.
+    """
+    copier = _FileCopier()
+    dirs: list[tuple[str, str]] = []
+    stack = [(str(src), str(dst))]
+    os.makedirs(dst)
+    try:
+        while stack:
+            src_dir, dst_dir = stack.pop()
+            dirs.append((src_dir, dst_dir))
+            with os.scandir(src_dir) as it:
+                for entry in it:
+                    if entry.is_symlink():
+                        raise WorkspaceError(f"Refusing source with symlink entry: {entry.path}")
+                    target = os.path.join(dst_dir, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        os.mkdir(target)
+                        stack.append((entry.path, target))
+                    elif entry.is_file(follow_symlinks=False):
+                        copier.copy(entry.path, target)
+                    else:
+                        # FIFOs would block open(), sockets/devices are not content (copytree's SpecialFileError).
+                        raise WorkspaceError(f"Refusing source with special file: {entry.path}")
+        # Directory metadata last: copying files into a dir would otherwise bump its mtime.
+        for src_dir, dst_dir in reversed(dirs):
+            shutil.copystat(src_dir, dst_dir)
+    except BaseException:
+        shutil.rmtree(dst, ignore_errors=True)
+        raise
 
 
 def _is_git_repo(path: Path) -> bool:
@@ -68,14 +165,20 @@ class WorkspaceManager:
     def __init__(self, workspaces_root: Path, project_aliases: dict[str, Path]):
         self.workspaces_root = workspaces_root.resolve()
         self.project_aliases = dict(project_aliases)
+        # Validated alias paths; prepare_workspace re-checks the source on every job anyway.
+        self._resolved_aliases: dict[str, Path] = {}
         _mkdir_secure(self.workspaces_root)
 
     def resolve_project_alias(self, project_id: str) -> Path:
+        cached = self._resolved_aliases.get(project_id)
+        if cached is not None:
+            return cached
         if project_id not in self.project_aliases:
             raise WorkspaceError(f"Unknown project_id '{project_id}'")
         path = self.project_aliases[project_id].resolve()
-        if not path.exists() or not path.is_dir():
+        if not path.is_dir():
             raise WorkspaceError(f"Configured project path does not exist: {path}")
+        self._resolved_aliases[project_id] = path
         return path
 
     def prepare_workspace(self, *, job_id: str, source_hint: str | Path | None) -> WorkspaceLayout:
@@ -93,7 +196,7 @@ class WorkspaceManager:
             _mkdir_secure(workdir)
         else:
             src = Path(source_hint).expanduser().resolve()
-            if not src.exists() or not src.is_dir():
+            if not src.is_dir():
                 raise WorkspaceError(f"Source workdir does not exist: {src}")
             if workdir.exists():
                 if not workdir.is_dir() or any(workdir.iterdir()):
@@ -119,15 +222,4 @@ class WorkspaceManager:
                 return
             raise WorkspaceError(f"Failed to clone git source: {proc.stderr.strip() or proc.stdout.strip()}")
 
-        for dirpath, dirnames, filenames in os.walk(src, followlinks=False):
-            base = Path(dirpath)
-            for dirname in dirnames:
-                candidate = base / dirname
-                if candidate.is_symlink():
-                    raise WorkspaceError(f"Refusing source with symlink entry: {candidate}")
-            for filename in filenames:
-                candidate = base / filename
-                if candidate.is_symlink():
-                    raise WorkspaceError(f"Refusing source with symlink entry: {candidate}")
-
-        shutil.copytree(src, workdir, symlinks=False)
+        _fast_copytree(src, workdir)
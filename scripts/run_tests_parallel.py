@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Run the unittest suite sharded by module across several interpreters.
+
+Modules are independent (each test builds its own temp dirs), so sharding by
+file is safe and overlaps the time tests spend waiting on child processes.
+Each shard is one interpreter running a group of modules, so import cost is
+paid once per shard rather than once per module. With --per-test the units are
+individual test methods instead, so one large module can span several shards
+(class fixtures then run once per shard that gets a piece of the class).
+
+    python3 scripts/run_tests_parallel.py [--jobs N] [--per-test] [tests.test_x ...]
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _default_jobs() -> int:
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+def _discover_modules() -> list[str]:
+    return sorted(f"tests.{p.stem}" for p in (ROOT / "tests").glob("test_*.py"))
+
+
+def _module_path(module: str) -> Path:
+    return ROOT.joinpath(*module.split(".")).with_suffix(".py")
+
+
+def _module_units(modules: list[str]) -> list[tuple[str, int]]:
+    return [(m, p.stat().st_size if (p := _module_path(m)).exists() else 0) for m in modules]
+
+
+def _test_units(modules: list[str]) -> list[tuple[str, int]]:
+    # Read test ids straight from the source: importing every module here would
+    # pay the import cost the shards are meant to split.
+    units: list[tuple[str, int]] = []
+    for module in modules:
+        tree = ast.parse(_module_path(module).read_text(encoding="utf-8"))
+        for cls in tree.body:
+            if not isinstance(cls, ast.ClassDef):
+                continue
+            for fn in cls.body:
+                if isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef)) and fn.name.startswith("test"):
+                    units.append((f"{module}.{cls.name}.{fn.name}", (fn.end_lineno or fn.lineno) - fn.lineno + 1))
+    return units
+
+
+def _shard(units: list[tuple[str, int]], jobs: int) -> list[list[str]]:
+    # Greedy by size, largest first: a cheap proxy for runtime.
+    shards: list[list[str]] = [[] for _ in range(max(1, min(jobs, len(units))))]
+    loads = [0] * len(shards)
+    for name, size in sorted(units, key=lambda u: -u[1]):
+        i = loads.index(min(loads))
+        shards[i].append(name)
+        loads[i] += size
+    # Keep each shard in source order so tests of one class stay adjacent.
+    order = {name: i for i, (name, _size) in enumerate(units)}
+    return [sorted(shard, key=order.__getitem__) for shard in shards]
+
+
+def _run_shard(test_ids: list[str]) -> tuple[list[str], int, str, float]:
+    started = time.monotonic()
+    proc = subprocess.run(
+        [sys.executable, "-m", "unittest", *test_ids],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        check=False,
+    )
+    return test_ids, proc.returncode, proc.stdout, time.monotonic() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", "-j", type=int, default=_default_jobs(), help="parallel workers (default: cores-2)")
+    parser.add_argument("--per-test", action="store_true", help="shard individual test methods instead of modules")
+    parser.add_argument("modules", nargs="*", help="test modules (default: all tests/test_*.py)")
+    args = parser.parse_args(argv)
+
+    modules = args.modules or _discover_modules()
+    units = _test_units(modules) if args.per_test else _module_units(modules)
+    shards = _shard(units, args.jobs)
+    failed = 0
+    started = time.monotonic()
+    # Threads only wait on child interpreters, so a thread pool is enough.
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        for test_ids, code, output, elapsed in pool.map(_run_shard, shards):
+            status = "ok" if code == 0 else "FAIL"
+            if args.per_test:
+                print(f"{status:4} {len(test_ids)} tests ({elapsed:.2f}s)")
+            else:
+                print(f"{status:4} {len(test_ids)} modules ({elapsed:.2f}s): {' '.join(test_ids)}")
+            if code != 0:
+                failed += 1
+                print(output, end="" if output.endswith("\n") else "\n")
+
+    print(f"\n{len(shards) - failed}/{len(shards)} shards passed in {time.monotonic() - started:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
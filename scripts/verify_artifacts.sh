@@ -1,21 +1,43 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-if [ "$#" -ne 1 ]; then
-  echo "usage: $0 <step_dir>" >&2
+if [ "$#" -lt 1 ]; then
+  echo "usage: $0 <step_dir> [--files0-from=- | file...]" >&2
   exit 2
 fi
 
 STEP_DIR="$1"
+shift
 if [ ! -d "$STEP_DIR" ]; then
   echo "step_dir does not exist: $STEP_DIR" >&2
   exit 2
 fi
 
+# Callers may pass the already-enumerated artifact files to skip the directory walk,
+# NUL-separated on stdin for lists too long for argv.
+if [ "${1:-}" = "--files0-from=-" ]; then
+  mapfile -d '' -t SCAN_FILES
+elif [ "$#" -gt 0 ]; then
+  SCAN_FILES=("$@")
+else
+  # -L: secrets behind symlinks count, as with grep -R.
+  mapfile -t SCAN_FILES < <(find -L "$STEP_DIR" -type f 2>/dev/null | sort)
+fi
+if [ "${#SCAN_FILES[@]}" -eq 0 ]; then
+  echo "no artifact files to scan"
+  exit 0
+fi
+
 # Potentially dangerous filenames should never appear in published artifacts.
-if find "$STEP_DIR" -type f \( -name '.env' -o -name '.env.*' -o -name '*.key' -o -name '*credentials*' -o -name '*secret*' \) | grep -q .; then
+SUSPICIOUS=()
+for f in "${SCAN_FILES[@]}"; do
+  case "${f##*/}" in
+    .env | .env.* | *.key | *credentials* | *secret*) SUSPICIOUS+=("$f") ;;
+  esac
+done
+if [ "${#SUSPICIOUS[@]}" -gt 0 ]; then
   echo "suspicious file name detected in artifacts"
-  find "$STEP_DIR" -type f \( -name '.env' -o -name '.env.*' -o -name '*.key' -o -name '*credentials*' -o -name '*secret*' \) | sed 's/^/ - /'
+  printf ' - %s\n' "${SUSPICIOUS[@]}"
   exit 1
 fi
 
@@ -57,17 +79,14 @@ PATTERNS=(
   '(api[_-]?key|secret|password|token|passwd|credential)[[:space:]]*[:=][[:space:]]*['\''\""]?[A-Za-z0-9_\-/.+]{8,}'
 )
 
-SCAN_FILES=$(find "$STEP_DIR" -type f | sort)
-if [ -z "$SCAN_FILES" ]; then
-  echo "no artifact files to scan"
-  exit 0
-fi
-
 TMP_HITS="$(mktemp)"
 trap 'rm -f "$TMP_HITS"' EXIT
 
 for pattern in "${PATTERNS[@]}"; do
-  if grep -R -n -I -E -- "$pattern" "$STEP_DIR" >"$TMP_HITS" 2>/dev/null; then
+  # xargs batches the list under the argv limit; hits are judged by output, since its
+  # exit status merges the per-batch grep results.
+  printf '%s\0' "${SCAN_FILES[@]}" | xargs -0 grep -H -n -I -E -- "$pattern" >"$TMP_HITS" 2>/dev/null || true
+  if [ -s "$TMP_HITS" ]; then
     echo "possible secret found (pattern: $pattern)"
     sed 's/^/ - /' "$TMP_HITS" | head -n 20
     exit 1
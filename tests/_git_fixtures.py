@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+
+# One shell per repo: every extra git spawn costs a fork/exec.
+_COMMIT_TRACKED = (
+    "git init -q"
+    " && git add tracked.txt"
+    " && git -c user.name='Test User' -c user.email=test@example.com commit -q -m init"
+)
+
+
+def make_repo_with_commit(repo: Path) -> None:
+    """`tracked.txt` containing "before\\n", committed as the only file."""
+    repo.mkdir(parents=True, exist_ok=True)
+    (repo / "tracked.txt").write_text("before\n", encoding="utf-8")
+    subprocess.run(["/bin/sh", "-c", _COMMIT_TRACKED], cwd=repo, check=True, capture_output=True)
+
+
+def fake_git_init(repo: Path) -> None:
+    """Lay out what `git init` writes, minus hooks/description; enough for rev-parse and diff."""
+    git_dir = repo / ".git"
+    for sub in ("objects", "refs/heads", "refs/tags"):
+        (git_dir / sub).mkdir(parents=True, exist_ok=True)
+    (git_dir / "HEAD").write_text("ref: refs/heads/main\n", encoding="utf-8")
+    (git_dir / "config").write_text(
+        "[core]\n\trepositoryformatversion = 0\n\tfilemode = true\n\tbare = false\n", encoding="utf-8"
+    )
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+# orchestrator.runner pulls in every worker and optional dependency; resolve it once
+# here so the runner test modules share one attempt (and one None fallback).
+try:
+    from orchestrator.runner import (
+        _idle_poll_delay,
+        _latest_successful_step_id,
+        _resolve_effective_step,
+        _resolve_on_failure,
+        _run_secrets_check,
+        _step_dependencies,
+        _step_index_by_id,
+    )
+except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
+    _idle_poll_delay = None  # type: ignore[assignment]
+    _latest_successful_step_id = None  # type: ignore[assignment]
+    _resolve_effective_step = None  # type: ignore[assignment]
+    _resolve_on_failure = None  # type: ignore[assignment]
+    _run_secrets_check = None  # type: ignore[assignment]
+    _step_dependencies = None  # type: ignore[assignment]
+    _step_index_by_id = None  # type: ignore[assignment]
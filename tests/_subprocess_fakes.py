@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import os
+
+
+class StaticReader:
+    """Already-at-EOF byte source with StreamReader.read() semantics; run_command only ever calls read(n)."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self._pos = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        end = len(self._data) if n < 0 else self._pos + n
+        chunk = self._data[self._pos:end]
+        self._pos += len(chunk)
+        return chunk
+
+
+class FakeProc:
+    """Stand-in for asyncio.subprocess.Process with canned output; nothing is spawned."""
+
+    def __init__(self, *, stdout_data: bytes = b"", stderr_data: bytes = b"", returncode: int | None = 0) -> None:
+        self.returncode = returncode
+        self.pid = os.getpid()
+        self.stdout = StaticReader(stdout_data)
+        self.stderr = StaticReader(stderr_data)
+
+    async def wait(self) -> int:
+        return 0 if self.returncode is None else self.returncode
+
+    def send_signal(self, _sig: int) -> None:
+        return None
+
+    def kill(self) -> None:
+        return None
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import dataclasses
+import inspect
+import os
+import shutil
+import tempfile
+import unittest
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from orchestrator.models import JobSpec, StepSpec
+from orchestrator.policy import ExecutionPolicy
+from workers.base import StepContext
+
+
+@lru_cache(maxsize=None)
+def _scratch_root() -> Path:
+    # TEST_TMP_ROOT wins; otherwise tmpfs when available, so test files never touch the disk.
+    parent = os.environ.get("TEST_TMP_ROOT") or None
+    if parent is None and os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        parent = "/dev/shm"
+    root = Path(tempfile.mkdtemp(prefix="orch-tests-", dir=parent))
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    return root
+
+
+def scratch_dir(test: unittest.TestCase | type[unittest.TestCase]) -> Path:
+    """Fresh per-test (or per-class) directory under one process-wide root, removed at interpreter exit."""
+    name = test.__name__ if isinstance(test, type) else test.id().rsplit(".", 1)[-1]
+    return Path(tempfile.mkdtemp(prefix=f"{name}-", dir=_scratch_root()))
+
+
+def write_small(path: str | Path, data: bytes) -> None:
+    """Write a tiny fixture file with one os.write: no buffered file object, no fsync."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+    try:
+        # Regular files take a sub-page write in one call.
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=None)
+def _proto_step_context() -> StepContext:
+    step = StepSpec(step_id="proto", agent="proto", role="proto", prompt="proto")
+    return StepContext(
+        job=JobSpec(job_id="job-proto", goal="proto", workdir=".", steps=[step]),
+        step=step,
+        job_dir=Path("."),
+        step_dir=Path("."),
+        enable_real_cli=True,
+        policy=ExecutionPolicy(
+            allowed_binaries=frozenset(), sandbox=False, sandbox_wrapper=None, sandbox_wrapper_args=[], network_policy="deny"
+        ),
+        env_allowlist=frozenset(),
+        sensitive_env_vars=frozenset(),
+        sandbox_clear_env=False,
+        max_input_artifacts_files=10,
+        max_input_artifact_chars=12000,
+        max_input_artifacts_chars=40000,
+    )
+
+
+def step_context(job: JobSpec, step: StepSpec, job_dir: Path, **overrides: Any) -> StepContext:
+    """Worker-test StepContext (real CLI on, empty env lists, default input limits); pass `policy` and any overrides."""
+    return dataclasses.replace(
+        _proto_step_context(), job=job, step=step, job_dir=job_dir, step_dir=job_dir / "steps" / step.step_id, **overrides
+    )
+
+
+class InMemoryBudgetBackend:
+    """BudgetBackend on plain dicts: process-local counters, nothing survives the tracker."""
+
+    def __init__(self) -> None:
+        self._rows: dict[tuple[str, str], tuple[int, float]] = {}
+
+    def totals(self, date: str) -> tuple[int, float]:
+        api_calls, cost_usd = 0, 0.0
+        for (row_date, _worker), (calls, cost) in self._rows.items():
+            if row_date == date:
+                api_calls += calls
+                cost_usd += cost
+        return api_calls, cost_usd
+
+    def add_many(self, rows: list[tuple[str, str, int, float]]) -> None:
+        for date, worker, api_calls, cost_usd in rows:
+            calls, cost = self._rows.get((date, worker), (0, 0.0))
+            self._rows[(date, worker)] = (calls + api_calls, cost + cost_usd)
+
+    def close(self) -> None:
+        pass
+
+
+class SharedLoopAsyncTestCase(unittest.TestCase):
+    """IsolatedAsyncioTestCase, minus the fresh event loop per test: one loop serves the whole class.
+
+    Only for tests that leave no tasks behind. Supports async test methods plus
+    asyncSetUp/asyncTearDown; subclasses overriding setUpClass must call super().
+    """
+
+    _runner: asyncio.Runner
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._runner = asyncio.Runner()
+        cls.addClassCleanup(cls._runner.close)
+
+    async def asyncSetUp(self) -> None:
+        pass
+
+    async def asyncTearDown(self) -> None:
+        pass
+
+    def _callSetUp(self) -> None:
+        self.setUp()
+        self._runner.run(self.asyncSetUp())
+
+    def _callTestMethod(self, method) -> None:  # noqa: ANN001
+        result = method()
+        if inspect.iscoroutine(result):
+            self._runner.run(result)
+
+    def _callTearDown(self) -> None:
+        self._runner.run(self.asyncTearDown())
+        self.tearDown()
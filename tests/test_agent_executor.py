@@ -1,52 +1,54 @@
 from __future__ import annotations
 
-import subprocess
-import tempfile
+import dataclasses
+import shutil
 import unittest
+from collections.abc import Callable
 from pathlib import Path
 from unittest.mock import patch
 
 from orchestrator.models import JobSpec, PolicySpec, StepSpec
 from orchestrator.policy import ExecutionPolicy
 from orchestrator.subprocess_utils import CommandResult
-from workers.codex_worker import CodexWorker
+from tests._git_fixtures import fake_git_init, make_repo_with_commit
+from tests._support import SharedLoopAsyncTestCase, scratch_dir, step_context
 from workers.agent_executor import AgentExecutor
 from workers.base import StepContext
 
 
-def _policy() -> ExecutionPolicy:
-    return ExecutionPolicy(
-        allowed_binaries={"codex", "git"},
-        sandbox=False,
-        sandbox_wrapper=None,
-        sandbox_wrapper_args=[],
-        network_policy="deny",
-    )
-
-
-class AgentExecutorTests(unittest.IsolatedAsyncioTestCase):
-    @staticmethod
-    def _init_git_repo_with_commit(repo: Path) -> None:
-        repo.mkdir(parents=True, exist_ok=True)
-        subprocess.run(["git", "init"], cwd=repo, check=False, capture_output=True, text=True)
-        (repo / "tracked.txt").write_text("before\n", encoding="utf-8")
-        subprocess.run(["git", "add", "tracked.txt"], cwd=repo, check=True, capture_output=True, text=True)
-        subprocess.run(
-            [
-                "git",
-                "-c",
-                "user.name=Test User",
-                "-c",
-                "user.email=test@example.com",
-                "commit",
-                "-m",
-                "init",
-            ],
-            cwd=repo,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
+# Module-level and frozen: every test shares these, so none may mutate them.
+_POLICY = ExecutionPolicy(
+    allowed_binaries=frozenset({"codex", "git"}),
+    sandbox=False,
+    sandbox_wrapper=None,
+    sandbox_wrapper_args=[],
+    network_policy="deny",
+)
+_DUMMY_POLICY = dataclasses.replace(_POLICY, allowed_binaries=frozenset({"dummy", "git"}))
+_JOB_POLICY = PolicySpec()
+
+
+class AgentExecutorTests(SharedLoopAsyncTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # Tests only overwrite tracked.txt, so one committed repo is copied into each of them.
+        cls._template_repo = scratch_dir(cls) / "repo"
+        make_repo_with_commit(cls._template_repo)
+
+    def setUp(self) -> None:
+        # No test may reach a real CLI; the changed-workdir test hooks in through on_run_command.
+        self.on_run_command: Callable[[], object] = lambda: None
+        patcher = patch("workers.agent_executor.run_command", new=self._fake_run_command)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _fake_run_command(self, *args, **kwargs) -> CommandResult:
+        self.on_run_command()
+        return CommandResult(exit_code=0, stdout="ok", stderr="", duration_ms=10)
+
+    def _init_git_repo_with_commit(self, repo: Path) -> None:
+        shutil.copytree(self._template_repo, repo, symlinks=False)
 
     @staticmethod
     def _dummy_ctx(*, root: Path, repo: Path) -> StepContext:
@@ -56,104 +58,59 @@ class AgentExecutorTests(unittest.IsolatedAsyncioTestCase):
             goal="test",
             workdir=str(repo),
             steps=[step],
-            policy=PolicySpec(),
-        )
-        return StepContext(
-            job=job,
-            step=step,
-            job_dir=root / "job",
-            step_dir=root / "job" / "steps" / step.step_id,
-            enable_real_cli=True,
-            policy=ExecutionPolicy(
-                allowed_binaries={"dummy", "git"},
-                sandbox=False,
-                sandbox_wrapper=None,
-                sandbox_wrapper_args=[],
-                network_policy="deny",
-            ),
-            env_allowlist=set(),
-            sensitive_env_vars=set(),
-            sandbox_clear_env=False,
-            max_input_artifacts_files=10,
-            max_input_artifact_chars=12000,
-            max_input_artifacts_chars=40000,
+            policy=_JOB_POLICY,
         )
+        return step_context(job, step, root / "job", policy=_DUMMY_POLICY)
 
     async def test_non_git_workdir_returns_needs_human(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            root = Path(td)
-            step = StepSpec(step_id="step01", agent="codex", role="implementer", prompt="implement")
-            job = JobSpec(
-                job_id="job-test-ae-0001",
-                goal="test",
-                workdir=str(root),
-                steps=[step],
-                policy=PolicySpec(),
-            )
-            ctx = StepContext(
-                job=job,
-                step=step,
-                job_dir=root / "job",
-                step_dir=root / "job" / "steps" / step.step_id,
-                enable_real_cli=True,
-                policy=_policy(),
-                env_allowlist=set(),
-                sensitive_env_vars=set(),
-                sandbox_clear_env=False,
-                max_input_artifacts_files=10,
-                max_input_artifact_chars=12000,
-                max_input_artifacts_chars=40000,
-                non_git_workdir_status="needs_human",
-            )
-
-            result = await CodexWorker().run(ctx)
-            self.assertEqual(result.status, "needs_human")
-            self.assertIsNotNone(result.error)
-            assert result.error is not None
-            self.assertEqual(result.error.code, "non_git_workdir")
+        from workers.codex_worker import CodexWorker
+
+        root = scratch_dir(self)
+        step = StepSpec(step_id="step01", agent="codex", role="implementer", prompt="implement")
+        job = JobSpec(
+            job_id="job-test-ae-0001",
+            goal="test",
+            workdir=str(root),
+            steps=[step],
+            policy=_JOB_POLICY,
+        )
+        ctx = step_context(job, step, root / "job", policy=_POLICY, non_git_workdir_status="needs_human")
+
+        result = await CodexWorker().run(ctx)
+        self.assertEqual(result.status, "needs_human")
+        self.assertIsNotNone(result.error)
+        assert result.error is not None
+        self.assertEqual(result.error.code, "non_git_workdir")
 
     async def test_missing_patch_fails_before_cli_run(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            root = Path(td)
-            repo = root / "repo"
-            repo.mkdir(parents=True, exist_ok=True)
-            subprocess.run(["git", "init"], cwd=repo, check=False, capture_output=True, text=True)
-
-            step = StepSpec(
-                step_id="step01",
-                agent="codex",
-                role="implementer",
-                prompt="implement",
-                apply_patches_from=["steps/01_plan/patch.diff"],
-            )
-            job_dir = root / "job"
-            job = JobSpec(
-                job_id="job-test-ae-0002",
-                goal="test",
-                workdir=str(repo),
-                steps=[step],
-                policy=PolicySpec(),
-            )
-            ctx = StepContext(
-                job=job,
-                step=step,
-                job_dir=job_dir,
-                step_dir=job_dir / "steps" / step.step_id,
-                enable_real_cli=True,
-                policy=_policy(),
-                env_allowlist=set(),
-                sensitive_env_vars=set(),
-                sandbox_clear_env=False,
-                max_input_artifacts_files=10,
-                max_input_artifact_chars=12000,
-                max_input_artifacts_chars=40000,
-            )
-
-            result = await CodexWorker().run(ctx)
-            self.assertEqual(result.status, "failed")
-            self.assertIsNotNone(result.error)
-            assert result.error is not None
-            self.assertEqual(result.error.code, "missing_patch")
+        from workers.codex_worker import CodexWorker
+
+        root = scratch_dir(self)
+        repo = root / "repo"
+        fake_git_init(repo)
+
+        step = StepSpec(
+            step_id="step01",
+            agent="codex",
+            role="implementer",
+            prompt="implement",
+            apply_patches_from=["steps/01_plan/patch.diff"],
+        )
+        job_dir = root / "job"
+        job = JobSpec(
+            job_id="job-test-ae-0002",
+            goal="test",
+            workdir=str(repo),
+            steps=[step],
+            policy=_JOB_POLICY,
+        )
+        ctx = step_context(job, step, job_dir, policy=_POLICY)
+
+        result = await CodexWorker().run(ctx)
+        self.assertEqual(result.status, "failed")
+        self.assertIsNotNone(result.error)
+        assert result.error is not None
+        self.assertEqual(result.error.code, "missing_patch")
 
     async def test_real_cli_marks_change_status_as_changed(self) -> None:
         class DummyWorker(AgentExecutor):
@@ -162,22 +119,17 @@ class AgentExecutorTests(unittest.IsolatedAsyncioTestCase):
             def build_cmd(self, ctx: StepContext, full_prompt: str) -> list[str]:
                 return ["dummy", "run", full_prompt]
 
-        with tempfile.TemporaryDirectory() as td:
-            root = Path(td)
-            repo = root / "repo"
-            self._init_git_repo_with_commit(repo)
-            ctx = self._dummy_ctx(root=root, repo=repo)
+        root = scratch_dir(self)
+        repo = root / "repo"
+        self._init_git_repo_with_commit(repo)
+        ctx = self._dummy_ctx(root=root, repo=repo)
 
-            async def _fake_run_command(*args, **kwargs) -> CommandResult:
-                (repo / "tracked.txt").write_text("after\n", encoding="utf-8")
-                return CommandResult(exit_code=0, stdout="ok", stderr="", duration_ms=10)
+        self.on_run_command = lambda: (repo / "tracked.txt").write_text("after\n", encoding="utf-8")
+        result = await DummyWorker().run(ctx)
 
-            with patch("workers.agent_executor.run_command", new=_fake_run_command):
-                result = await DummyWorker().run(ctx)
-
-            self.assertEqual(result.status, "success")
-            self.assertEqual(result.change_status, "changed")
-            self.assertIn("(changed)", result.summary)
+        self.assertEqual(result.status, "success")
+        self.assertEqual(result.change_status, "changed")
+        self.assertIn("(changed)", result.summary)
 
     async def test_real_cli_marks_change_status_as_no_changes(self) -> None:
         class DummyWorker(AgentExecutor):
@@ -186,21 +138,16 @@ class AgentExecutorTests(unittest.IsolatedAsyncioTestCase):
             def build_cmd(self, ctx: StepContext, full_prompt: str) -> list[str]:
                 return ["dummy", "run", full_prompt]
 
-        with tempfile.TemporaryDirectory() as td:
-            root = Path(td)
-            repo = root / "repo"
-            self._init_git_repo_with_commit(repo)
-            ctx = self._dummy_ctx(root=root, repo=repo)
-
-            async def _fake_run_command(*args, **kwargs) -> CommandResult:
-                return CommandResult(exit_code=0, stdout="ok", stderr="", duration_ms=10)
+        root = scratch_dir(self)
+        repo = root / "repo"
+        self._init_git_repo_with_commit(repo)
+        ctx = self._dummy_ctx(root=root, repo=repo)
 
-            with patch("workers.agent_executor.run_command", new=_fake_run_command):
-                result = await DummyWorker().run(ctx)
+        result = await DummyWorker().run(ctx)
 
-            self.assertEqual(result.status, "success")
-            self.assertEqual(result.change_status, "no_changes")
-            self.assertIn("(no_changes)", result.summary)
+        self.assertEqual(result.status, "success")
+        self.assertEqual(result.change_status, "no_changes")
+        self.assertIn("(no_changes)", result.summary)
 
 
 if __name__ == "__main__":
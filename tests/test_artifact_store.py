@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+import unittest
+from unittest.mock import patch
+
+from orchestrator import artifact_store
+from orchestrator.artifact_store import ArtifactStore
+from tests._support import scratch_dir
+
+
+class ArtifactStoreIovecTests(unittest.TestCase):
+    def test_iovec_artifacts_match_joined_parts(self) -> None:
+        store = ArtifactStore(scratch_dir(self).resolve())
+        store.ensure_job_layout("job-iovec-1")
+        store.write_job_artifacts_iovec(
+            "job-iovec-1",
+            report_parts=[b"# Job\n", b"\n", "привет".encode(), b"\n"],
+            patch_parts=[b"\n"],
+            logs_parts=[],
+            result_obj={"ok": True},
+        )
+        jd = store.job_dir("job-iovec-1")
+        self.assertEqual((jd / "report.md").read_text(encoding="utf-8"), "# Job\n\nпривет\n")
+        self.assertEqual((jd / "patch.diff").read_bytes(), b"\n")
+        self.assertEqual((jd / "logs.txt").read_bytes(), b"")
+        self.assertEqual(sorted(p.name for p in jd.iterdir()), ["logs.txt", "patch.diff", "report.md", "result.json", "steps"])
+
+    def test_short_vectored_writes_are_resumed(self) -> None:
+        real_writev = os.writev
+
+        def _short_writev(fd: int, buffers) -> int:  # noqa: ANN001
+            # Never write more than 3 bytes per call.
+            first = bytes(buffers[0])[:3]
+            return real_writev(fd, [first])
+
+        tmp = scratch_dir(self)
+        path = tmp / "out.txt"
+        with patch.object(artifact_store.os, "writev", side_effect=_short_writev), patch.object(
+            artifact_store, "_IOV_MAX", 2
+        ):
+            ArtifactStore(tmp)._atomic_writev(path, [b"hello ", b"", b"vectored", b" world"])
+        self.assertEqual(path.read_bytes(), b"hello vectored world")
+
+
+class PersistStepArtifactsTests(unittest.TestCase):
+    def test_worker_files_are_kept_and_missing_ones_created(self) -> None:
+        store = ArtifactStore(scratch_dir(self).resolve())
+        store.ensure_step_layout("job-persist-1", "01")
+        sd = store.step_dir("job-persist-1", "01")
+        (sd / "report.md").write_bytes(b"# report\n")
+        inode = (sd / "report.md").stat().st_ino
+
+        store.persist_step_artifacts_in_place("job-persist-1", "01", logs_txt="log\n", result_obj={"s": 1})
+
+        self.assertEqual((sd / "report.md").stat().st_ino, inode)
+        self.assertEqual((sd / "patch.diff").read_bytes(), b"")
+        self.assertEqual((sd / "logs.txt").read_text(encoding="utf-8"), "log\n")
+        self.assertTrue((sd / "result.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,43 +1,76 @@
 from __future__ import annotations
 
-import tempfile
 import unittest
 from pathlib import Path
 
-from orchestrator.budget import BudgetLimitExceeded, BudgetTracker
+from orchestrator.budget import (
+    BudgetBackend,
+    BudgetLimitExceeded,
+    BudgetTracker,
+    SqliteBudgetBackend,
+)
+from tests._support import InMemoryBudgetBackend, scratch_dir
 
 
 class BudgetTrackerTests(unittest.TestCase):
+    def _tracker(
+        self, *, max_daily_api_calls: int, max_daily_cost_usd: float, backend: BudgetBackend | None = None
+    ) -> BudgetTracker:
+        # Behaviour tests don't need persistence: plain dict counters, no SQLite at all.
+        tracker = BudgetTracker(
+            max_daily_api_calls=max_daily_api_calls,
+            max_daily_cost_usd=max_daily_cost_usd,
+            backend=backend or InMemoryBudgetBackend(),
+        )
+        self.addCleanup(tracker.close)
+        return tracker
+
     def test_budget_tracker_blocks_when_call_limit_reached(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            tracker = BudgetTracker(
-                db_path=Path(td) / "state.db",
-                max_daily_api_calls=2,
-                max_daily_cost_usd=0,
-            )
+        tracker = self._tracker(max_daily_api_calls=2, max_daily_cost_usd=0)
 
-            tracker.check_budget()
-            tracker.log_budget("codex", api_calls=1, cost_usd=0.0)
-            tracker.check_budget()
-            tracker.log_budget("codex", api_calls=1, cost_usd=0.0)
+        tracker.check_budget()
+        tracker.log_budget("codex", api_calls=1, cost_usd=0.0)
+        tracker.check_budget()
+        tracker.log_budget("codex", api_calls=1, cost_usd=0.0)
 
-            with self.assertRaises(BudgetLimitExceeded):
-                tracker.check_budget()
+        with self.assertRaises(BudgetLimitExceeded):
+            tracker.check_budget()
 
     def test_budget_tracker_accumulates_cost(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            tracker = BudgetTracker(
-                db_path=Path(td) / "state.db",
-                max_daily_api_calls=0,
-                max_daily_cost_usd=0.5,
-            )
-
-            tracker.log_budget("opencode", api_calls=1, cost_usd=0.2)
+        tracker = self._tracker(max_daily_api_calls=0, max_daily_cost_usd=0.5)
+
+        tracker.log_budget("opencode", api_calls=1, cost_usd=0.2)
+        tracker.check_budget()
+        tracker.log_budget("claude", api_calls=1, cost_usd=0.3)
+
+        with self.assertRaises(BudgetLimitExceeded):
             tracker.check_budget()
-            tracker.log_budget("claude", api_calls=1, cost_usd=0.3)
 
-            with self.assertRaises(BudgetLimitExceeded):
-                tracker.check_budget()
+    def test_log_budget_many_matches_individual_calls(self) -> None:
+        for backend in (InMemoryBudgetBackend(), SqliteBudgetBackend(Path(":memory:"))):
+            with self.subTest(backend=type(backend).__name__):
+                tracker = self._tracker(max_daily_api_calls=4, max_daily_cost_usd=1.0, backend=backend)
+
+                tracker.log_budget_many([("codex", 1, 0.25), ("codex", 1, 0.25), (" ", 1, 0.0), ("claude", -3, -1.0)])
+                tracker.log_budget_many([])
+
+                snapshot = tracker.check_budget()
+                self.assertEqual(snapshot.api_calls, 3)
+                self.assertAlmostEqual(snapshot.cost_usd, 0.5)
+                tracker.log_budget("claude", api_calls=1, cost_usd=0.0)
+                with self.assertRaises(BudgetLimitExceeded):
+                    tracker.check_budget()
+
+    def test_budget_log_is_persisted_to_state_db(self) -> None:
+        db_path = scratch_dir(self) / "state.db"
+        writer = BudgetTracker(db_path=db_path, max_daily_api_calls=1, max_daily_cost_usd=0)
+        writer.log_budget("codex", api_calls=1, cost_usd=0.0)
+        writer.close()
+
+        reader = BudgetTracker(db_path=db_path, max_daily_api_calls=1, max_daily_cost_usd=0)
+        self.addCleanup(reader.close)
+        with self.assertRaises(BudgetLimitExceeded):
+            reader.check_budget()
 
 
 if __name__ == "__main__":
@@ -1,29 +1,23 @@
 from __future__ import annotations
 
-import tempfile
+import json
 import unittest
 from pathlib import Path
 
 from orchestrator.models import ArtifactPaths, JobResult, JobSpec, PolicySpec, StepResult, StepSpec, utc_now_iso
 from orchestrator.policy import ExecutionPolicy
+from tests._support import scratch_dir
 from workers.base import BaseWorker, StepContext
 
 try:
-    from orchestrator.validator import validate_json
+    from orchestrator.validator import get_validator
 except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
-    validate_json = None  # type: ignore[assignment]
+    get_validator = None  # type: ignore[assignment]
 
 
-def _repo_root() -> Path:
-    return Path(__file__).resolve().parents[1]
-
-
-def _job_schema() -> Path:
-    return _repo_root() / "contracts" / "job.schema.json"
-
-
-def _result_schema() -> Path:
-    return _repo_root() / "contracts" / "result.schema.json"
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+_JOB_SCHEMA = _REPO_ROOT / "contracts" / "job.schema.json"
+_RESULT_SCHEMA = _REPO_ROOT / "contracts" / "result.schema.json"
 
 
 def _test_policy() -> ExecutionPolicy:
@@ -36,8 +30,14 @@ def _test_policy() -> ExecutionPolicy:
     )
 
 
-@unittest.skipIf(validate_json is None, "jsonschema is not installed")
+@unittest.skipIf(get_validator is None, "jsonschema is not installed")
 class ContractTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Compiled once for the class; the tests only differ in the instances they validate.
+        cls.job_validator = get_validator(_JOB_SCHEMA)
+        cls.result_validator = get_validator(_RESULT_SCHEMA)
+
     def test_job_schema_validation_for_model_dump(self) -> None:
         step = StepSpec(step_id="step01", agent="opencode", role="planner", prompt="plan", on_failure="ask_human")
         job = JobSpec(
@@ -49,59 +49,58 @@ class ContractTests(unittest.TestCase):
             context_window=[{"role": "user", "content": "hello"}],
             context_strategy="sliding",
         )
-        validate_json(job.model_dump(), _job_schema())
+        self.job_validator.validate(json.loads(job.model_dump_json()))
 
     def test_step_result_schema_and_fixed_artifact_paths(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            job_dir = Path(td) / "job"
-            step_dir = job_dir / "steps" / "step01"
-            step_dir.mkdir(parents=True, exist_ok=True)
-
-            step = StepSpec(step_id="step01", agent="codex", role="implementer", prompt="implement")
-            job = JobSpec(
-                job_id="job-test-0002",
-                goal="validate step result schema",
-                workdir=str(job_dir),
-                steps=[step],
-                policy=PolicySpec(),
-            )
-            ctx = StepContext(
-                job=job,
-                step=step,
-                job_dir=job_dir,
-                step_dir=step_dir,
-                enable_real_cli=False,
-                policy=_test_policy(),
-                env_allowlist=set(),
-                sensitive_env_vars=set(),
-                sandbox_clear_env=False,
-                max_input_artifacts_files=10,
-                max_input_artifact_chars=12000,
-                max_input_artifacts_chars=40000,
-            )
-
-            paths = BaseWorker().artifact_paths(ctx)
-            self.assertEqual(paths.report_md, "steps/step01/report.md")
-            self.assertEqual(paths.patch_diff, "steps/step01/patch.diff")
-            self.assertEqual(paths.logs_txt, "steps/step01/logs.txt")
-            self.assertEqual(paths.result_json, "steps/step01/result.json")
-
-            now = utc_now_iso()
-            step_result = StepResult(
-                job_id=job.job_id,
-                step_id=step.step_id,
-                agent=step.agent,
-                role=step.role,
-                status="success",
-                attempts=1,
-                started_at=now,
-                finished_at=now,
-                summary="ok",
-                change_status="changed",
-                artifacts=paths,
-                secrets_check="passed",
-            )
-            validate_json(step_result.model_dump(), _result_schema())
+        job_dir = scratch_dir(self) / "job"
+        step_dir = job_dir / "steps" / "step01"
+        step_dir.mkdir(parents=True, exist_ok=True)
+
+        step = StepSpec(step_id="step01", agent="codex", role="implementer", prompt="implement")
+        job = JobSpec(
+            job_id="job-test-0002",
+            goal="validate step result schema",
+            workdir=str(job_dir),
+            steps=[step],
+            policy=PolicySpec(),
+        )
+        ctx = StepContext(
+            job=job,
+            step=step,
+            job_dir=job_dir,
+            step_dir=step_dir,
+            enable_real_cli=False,
+            policy=_test_policy(),
+            env_allowlist=set(),
+            sensitive_env_vars=set(),
+            sandbox_clear_env=False,
+            max_input_artifacts_files=10,
+            max_input_artifact_chars=12000,
+            max_input_artifacts_chars=40000,
+        )
+
+        paths = BaseWorker().artifact_paths(ctx)
+        self.assertEqual(paths.report_md, "steps/step01/report.md")
+        self.assertEqual(paths.patch_diff, "steps/step01/patch.diff")
+        self.assertEqual(paths.logs_txt, "steps/step01/logs.txt")
+        self.assertEqual(paths.result_json, "steps/step01/result.json")
+
+        now = utc_now_iso()
+        step_result = StepResult(
+            job_id=job.job_id,
+            step_id=step.step_id,
+            agent=step.agent,
+            role=step.role,
+            status="success",
+            attempts=1,
+            started_at=now,
+            finished_at=now,
+            summary="ok",
+            change_status="changed",
+            artifacts=paths,
+            secrets_check="passed",
+        )
+        self.result_validator.validate(json.loads(step_result.model_dump_json()))
 
     def test_job_result_schema_and_fixed_artifact_paths(self) -> None:
         now = utc_now_iso()
@@ -147,7 +146,7 @@ class ContractTests(unittest.TestCase):
             secrets_check="passed",
             steps=[step_result],
         )
-        validate_json(job_result.model_dump(), _result_schema())
+        self.result_validator.validate(json.loads(job_result.model_dump_json()))
 
 
 if __name__ == "__main__":
@@ -2,104 +2,142 @@ from __future__ import annotations
 
 import json
 import os
-import tempfile
 import time
 import unittest
-from pathlib import Path
+from functools import lru_cache
 
 from fsqueue.file_queue import DuplicateJobError, FileQueue
 from fsqueue.file_queue import ClaimedJob
+from tests._support import scratch_dir, write_small
+
+
+@lru_cache(maxsize=None)
+def _job_blob(job_id: str, goal: str = "x") -> bytes:
+    return json.dumps({"job_id": job_id, "goal": goal}).encode()
 
 
 class FileQueueTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root = scratch_dir(self)
+        self.q = FileQueue(self.root)
+
+    def test_reopening_creates_only_missing_state_dirs(self) -> None:
+        self.q.done.rmdir()
+        write_small(os.path.join(self.q.pending_str, "keep.json"), b"{}")
+
+        q = FileQueue(self.root)
+
+        self.assertTrue(q.done.is_dir())
+        self.assertTrue(os.path.exists(os.path.join(q.pending_str, "keep.json")))
+        self.assertTrue(FileQueue(self.root / "fresh" / "nested").pending.is_dir())
+
     def test_enqueue_rejects_duplicate_job_id(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            q = FileQueue(Path(td))
-            q.enqueue({"job_id": "job-1", "goal": "a"})
-            with self.assertRaises(DuplicateJobError):
-                q.enqueue({"job_id": "job-1", "goal": "b"})
+        self.q.enqueue({"job_id": "job-1", "goal": "a"})
+        with self.assertRaises(DuplicateJobError):
+            self.q.enqueue({"job_id": "job-1", "goal": "b"})
 
     def test_claim_reads_job_id_from_file_content(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            q = FileQueue(Path(td))
-            custom_file = q.pending / "job-1.recovered.json"
-            custom_file.write_text(json.dumps({"job_id": "job-1", "goal": "x"}), encoding="utf-8")
-            claimed = q.claim()
-            self.assertEqual(claimed.job_id, "job-1")
+        write_small(os.path.join(self.q.pending_str, "job-1.recovered.json"), _job_blob("job-1"))
+        claimed = self.q.claim()
+        self.assertEqual(claimed.job_id, "job-1")
+
+    def test_claim_many_claims_oldest_first_up_to_limit(self) -> None:
+        now = time.time()
+        for idx, job_id in enumerate(["job-c", "job-a", "job-b"]):
+            self.q.enqueue({"job_id": job_id, "goal": "x"})
+            os.utime(os.path.join(self.q.pending_str, f"{job_id}.json"), (now - 100 + idx, now - 100 + idx))
+
+        claimed = self.q.claim_many(2)
+        self.assertEqual([c.job_id for c in claimed], ["job-c", "job-a"])
+        self.assertTrue(all(c.path.parent == self.q.running for c in claimed))
+        self.assertEqual([c.job_id for c in self.q.claim_many(5)], ["job-b"])
+        self.assertEqual(self.q.claim_many(5), [])
 
     def test_reclaim_stale_running_moves_back_to_pending(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            q = FileQueue(Path(td))
-            running_file = q.running / "job-2.json"
-            running_file.write_text(json.dumps({"job_id": "job-2", "goal": "x"}), encoding="utf-8")
-            old_ts = time.time() - 3600
-            # Simulate stale "running" entry.
-            os.utime(running_file, (old_ts, old_ts))
-
-            reclaimed = q.reclaim_stale_running(60)
-            self.assertEqual(reclaimed, 1)
-            self.assertFalse(running_file.exists())
-            self.assertTrue((q.pending / "job-2.json").exists())
-
-    def test_enqueue_allows_non_colliding_prefix_job_ids(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            q = FileQueue(Path(td))
-            q.enqueue({"job_id": "job-1", "goal": "a"})
-            q.enqueue({"job_id": "job-12", "goal": "b"})
-            self.assertEqual(q.queue_state("job-1"), "pending")
-            self.assertEqual(q.queue_state("job-12"), "pending")
+        # Simulate a stale "running" entry by running the queue's clock an hour ahead.
+        q = FileQueue(self.root, clock=lambda: time.time() + 3600)
+        running_file = os.path.join(q.running_str, "job-2.json")
+        write_small(running_file, _job_blob("job-2"))
+
+        reclaimed = q.reclaim_stale_running(60)
+        self.assertEqual(reclaimed, 1)
+        self.assertFalse(os.path.exists(running_file))
+        self.assertTrue(os.path.exists(os.path.join(q.pending_str, "job-2.json")))
+
+    def test_job_lookup_uses_exact_job_id_not_prefix(self) -> None:
+        # (initial state of job-1/job-12, operation on job-1, expected states of job-1/job-12)
+        cases = [
+            ("pending", None, ("pending", "pending")),
+            ("awaiting_approval", "approve", ("pending", "awaiting_approval")),
+            ("running", "unlock", ("failed", "running")),
+        ]
+        for initial, operation, expected in cases:
+            with self.subTest(initial=initial, operation=operation):
+                q = FileQueue(scratch_dir(self))
+                for job_id in ("job-1", "job-12"):
+                    if initial == "running":
+                        write_small(os.path.join(q.running_str, f"{job_id}.json"), _job_blob(job_id))
+                    else:
+                        q.enqueue({"job_id": job_id, "goal": "x"}, state=initial)
+
+                if operation is not None:
+                    self.assertTrue(getattr(q, operation)("job-1"))
+                self.assertEqual((q.queue_state("job-1"), q.queue_state("job-12")), expected)
+
+    def test_find_job_file_includes_collision_suffixed_copies(self) -> None:
+        write_small(self.q.failed / "job-1.123.json", _job_blob("job-1"))
+        write_small(self.q.failed / "job-12.json", _job_blob("job-12"))
+
+        self.assertEqual(self.q.queue_state("job-1"), "failed")
+        self.assertEqual(self.q._find_job_files(self.q.failed, "job-1"), [self.q.failed / "job-1.123.json"])
+
+    def test_enqueue_many_writes_every_job(self) -> None:
+        jobs = [{"job_id": f"job-batch-{i}", "goal": "x"} for i in range(1000)]
+
+        self.assertEqual(self.q.enqueue_many(jobs), [job["job_id"] for job in jobs])
+        self.assertEqual(len(os.listdir(self.q.pending_str)), 1000)
+        self.assertEqual(self.q.queue_state("job-batch-0"), "pending")
+        self.assertEqual(self.q.queue_state("job-batch-999"), "pending")
+
+        self.q.enqueue_many([{"job_id": "job-gated", "goal": "x"}], state="awaiting_approval")
+        self.assertEqual(self.q.queue_state("job-gated"), "awaiting_approval")
+
+    def test_enqueue_many_rejects_duplicates_before_writing(self) -> None:
+        write_small(self.q.done / "job-1.123.json", _job_blob("job-1"))
+        cases = [
+            [{"job_id": "job-new", "goal": "x"}, {"job_id": "job-new", "goal": "y"}],
+            [{"job_id": "job-new", "goal": "x"}, {"job_id": "job-1", "goal": "y"}],
+        ]
+        for jobs in cases:
+            with self.subTest(jobs=[job["job_id"] for job in jobs]):
+                with self.assertRaises(DuplicateJobError):
+                    self.q.enqueue_many(jobs)
+                self.assertEqual(os.listdir(self.q.pending_str), [])
+
+        self.assertEqual(self.q.enqueue_many([{"job_id": "job-12", "goal": "x"}]), ["job-12"])
 
     def test_approve_moves_job_from_awaiting_to_pending(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            q = FileQueue(Path(td))
-            q.enqueue({"job_id": "job-approve-1", "goal": "x"}, state="awaiting_approval")
-
-            self.assertEqual(q.queue_state("job-approve-1"), "awaiting_approval")
-            approved = q.approve("job-approve-1")
-            self.assertTrue(approved)
-            self.assertEqual(q.queue_state("job-approve-1"), "pending")
-
-    def test_approve_uses_exact_job_id_not_prefix(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            q = FileQueue(Path(td))
-            q.enqueue({"job_id": "job-1", "goal": "x"}, state="awaiting_approval")
-            q.enqueue({"job_id": "job-12", "goal": "y"}, state="awaiting_approval")
-
-            approved = q.approve("job-1")
-            self.assertTrue(approved)
-            self.assertEqual(q.queue_state("job-1"), "pending")
-            self.assertEqual(q.queue_state("job-12"), "awaiting_approval")
+        self.q.enqueue({"job_id": "job-approve-1", "goal": "x"}, state="awaiting_approval")
+
+        self.assertEqual(self.q.queue_state("job-approve-1"), "awaiting_approval")
+        approved = self.q.approve("job-approve-1")
+        self.assertTrue(approved)
+        self.assertEqual(self.q.queue_state("job-approve-1"), "pending")
 
     def test_unlock_moves_running_job_to_failed(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            q = FileQueue(Path(td))
-            running_file = q.running / "job-unlock-1.json"
-            running_file.write_text(json.dumps({"job_id": "job-unlock-1", "goal": "x"}), encoding="utf-8")
-
-            unlocked = q.unlock("job-unlock-1")
-            self.assertTrue(unlocked)
-            self.assertEqual(q.queue_state("job-unlock-1"), "failed")
-
-    def test_unlock_uses_exact_job_id_not_prefix(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            q = FileQueue(Path(td))
-            (q.running / "job-1.json").write_text(json.dumps({"job_id": "job-1", "goal": "x"}), encoding="utf-8")
-            (q.running / "job-12.json").write_text(json.dumps({"job_id": "job-12", "goal": "y"}), encoding="utf-8")
-
-            unlocked = q.unlock("job-1")
-            self.assertTrue(unlocked)
-            self.assertEqual(q.queue_state("job-1"), "failed")
-            self.assertEqual(q.queue_state("job-12"), "running")
+        write_small(os.path.join(self.q.running_str, "job-unlock-1.json"), _job_blob("job-unlock-1"))
+
+        unlocked = self.q.unlock("job-unlock-1")
+        self.assertTrue(unlocked)
+        self.assertEqual(self.q.queue_state("job-unlock-1"), "failed")
 
     def test_await_approval_moves_claimed_job_to_awaiting(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            q = FileQueue(Path(td))
-            running_file = q.running / "job-await-1.json"
-            running_file.write_text(json.dumps({"job_id": "job-await-1", "goal": "x"}), encoding="utf-8")
-            claimed = ClaimedJob(job_id="job-await-1", path=running_file)
-
-            q.await_approval(claimed)
-            self.assertEqual(q.queue_state("job-await-1"), "awaiting_approval")
+        running_file = self.q.running / "job-await-1.json"
+        write_small(running_file, _job_blob("job-await-1"))
+        claimed = ClaimedJob(job_id="job-await-1", path=running_file)
+
+        self.q.await_approval(claimed)
+        self.assertEqual(self.q.queue_state("job-await-1"), "awaiting_approval")
 
 
 if __name__ == "__main__":
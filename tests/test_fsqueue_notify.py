@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import unittest
+
+from fsqueue.file_queue import FileQueue
+from fsqueue.notify import DirWatcher
+from tests._support import scratch_dir
+
+
+class DirWatcherTests(unittest.TestCase):
+    def test_wakes_on_file_moved_into_directory(self) -> None:
+        root = scratch_dir(self)
+        watched = root / "pending"
+        watched.mkdir()
+        watcher = DirWatcher.create(watched)
+        if watcher is None:
+            self.skipTest("inotify is not available on this platform")
+
+        async def scenario() -> tuple[bool, bool]:
+            idle = await watcher.wait(timeout=0.05)
+            tmp = root / "job.tmp"
+            tmp.write_text("{}", encoding="utf-8")
+            asyncio.get_running_loop().call_later(0.01, os.replace, tmp, watched / "job.json")
+            woke = await watcher.wait(timeout=5)
+            return idle, woke
+
+        try:
+            idle, woke = asyncio.run(scenario())
+        finally:
+            watcher.close()
+        self.assertFalse(idle)
+        self.assertTrue(woke)
+
+    def test_queue_wait_for_job_wakes_on_enqueue(self) -> None:
+        q = FileQueue(scratch_dir(self))
+        if not q.watch_pending():
+            self.skipTest("no filesystem watcher available on this platform")
+
+        async def scenario() -> tuple[bool, bool]:
+            idle = await q.wait_for_job(timeout=0.05)
+            asyncio.get_running_loop().call_later(0.01, q.enqueue, {"job_id": "job-wake-1", "goal": "x"})
+            woke = await q.wait_for_job(timeout=5)
+            return idle, woke
+
+        try:
+            idle, woke = asyncio.run(scenario())
+        finally:
+            q.close()
+        self.assertFalse(idle)
+        self.assertTrue(woke)
+        self.assertEqual(q.claim().job_id, "job-wake-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
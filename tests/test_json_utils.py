@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import json
+import unittest
+from unittest.mock import patch
+
+from orchestrator import json_utils
+from orchestrator.json_utils import dumps_bytes, loads
+
+
+class JsonUtilsTests(unittest.TestCase):
+    def test_indented_output_matches_stdlib_layout(self) -> None:
+        obj = {"job_id": "job-1", "goal": "привет", "steps": {"01": {"attempt": 1, "cost": 0.0}}, "tags": []}
+        expected = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+        self.assertEqual(dumps_bytes(obj, indent=True), expected)
+        with patch.object(json_utils, "orjson", None):
+            self.assertEqual(dumps_bytes(obj, indent=True), expected)
+
+    def test_round_trip_without_orjson(self) -> None:
+        obj = {"a": [1, 2, {"b": None}], "c": "ü"}
+        with patch.object(json_utils, "orjson", None):
+            self.assertEqual(loads(dumps_bytes(obj)), obj)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 import unittest
 
-from orchestrator.log_sanitizer import redact
+from orchestrator.log_sanitizer import _redaction_re, redact
 
 
 class LogSanitizerTests(unittest.TestCase):
@@ -28,6 +28,43 @@ class LogSanitizerTests(unittest.TestCase):
         finally:
             os.environ.pop("TEST_SECRET_TOKEN", None)
 
+    def test_env_value_pattern_is_compiled_once_per_secret_set(self) -> None:
+        os.environ["TEST_SECRET_TOKEN"] = "secret-value"
+        os.environ["TEST_SECRET_TOKEN_LONG"] = "secret-value-extended"
+        try:
+            _redaction_re.cache_clear()
+            for _ in range(50):
+                redacted = redact(
+                    "a=secret-value-extended b=secret-value",
+                    sensitive_env_vars=["TEST_SECRET_TOKEN", "TEST_SECRET_TOKEN_LONG"],
+                )
+            self.assertEqual(
+                redacted, "a=[REDACTED:env:TEST_SECRET_TOKEN_LONG] b=[REDACTED:env:TEST_SECRET_TOKEN]"
+            )
+            self.assertEqual(_redaction_re.cache_info().misses, 1)
+        finally:
+            os.environ.pop("TEST_SECRET_TOKEN", None)
+            os.environ.pop("TEST_SECRET_TOKEN_LONG", None)
+
+    def test_redact_large_log_in_one_pass(self) -> None:
+        os.environ["TEST_SECRET_TOKEN"] = "my-very-secret-value"
+        try:
+            line = (
+                "step ok token=sk-ant-REDACTED "
+                "alt=sk-abcdefghijklmnopqrstuvwxyz123456 env=my-very-secret-value\n"
+            )
+            text = line * (1024 * 1024 // len(line) + 1)
+
+            redacted = redact(text, sensitive_env_vars=["TEST_SECRET_TOKEN"])
+
+            expected_line = (
+                "step ok token=[REDACTED:anthropic_key] "
+                "alt=[REDACTED:openai_key] env=[REDACTED:env:TEST_SECRET_TOKEN]\n"
+            )
+            self.assertEqual(redacted, expected_line * (len(text) // len(line)))
+        finally:
+            os.environ.pop("TEST_SECRET_TOKEN", None)
+
 
 if __name__ == "__main__":
     unittest.main()
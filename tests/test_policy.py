@@ -1,41 +1,39 @@
 from __future__ import annotations
 
+import dataclasses
 import unittest
 
 from orchestrator.policy import ExecutionPolicy, PolicyError, build_policy_from_env
 
 
+# Built once; tests derive variants with dataclasses.replace where a field differs.
+_SANDBOXED_DENY = ExecutionPolicy(
+    allowed_binaries=frozenset({"claude", "git", "bwrap"}),
+    sandbox=True,
+    sandbox_wrapper="bwrap",
+    sandbox_wrapper_args=["--unshare-net"],
+    network_policy="deny",
+)
+_SANDBOXED_ALLOW = dataclasses.replace(_SANDBOXED_DENY, sandbox_wrapper_args=[], network_policy="allow")
+_UNSANDBOXED_DENY = dataclasses.replace(
+    _SANDBOXED_DENY,
+    allowed_binaries=frozenset({"claude", "git"}),
+    sandbox=False,
+    sandbox_wrapper=None,
+    sandbox_wrapper_args=[],
+)
+
+
 class PolicyTests(unittest.TestCase):
     def test_real_cli_rejects_network_deny_without_enforced_sandbox(self) -> None:
-        policy = ExecutionPolicy(
-            allowed_binaries={"claude", "git"},
-            sandbox=False,
-            sandbox_wrapper=None,
-            sandbox_wrapper_args=[],
-            network_policy="deny",
-        )
         with self.assertRaises(PolicyError):
-            policy.assert_real_cli_safe()
+            _UNSANDBOXED_DENY.assert_real_cli_safe()
 
     def test_real_cli_allows_network_deny_with_sandbox_wrapper(self) -> None:
-        policy = ExecutionPolicy(
-            allowed_binaries={"claude", "git", "bwrap"},
-            sandbox=True,
-            sandbox_wrapper="bwrap",
-            sandbox_wrapper_args=["--unshare-net"],
-            network_policy="deny",
-        )
-        policy.assert_real_cli_safe()
+        _SANDBOXED_DENY.assert_real_cli_safe()
 
     def test_for_job_merges_network_policy_with_deny_precedence(self) -> None:
-        base = ExecutionPolicy(
-            allowed_binaries={"claude", "git", "bwrap"},
-            sandbox=True,
-            sandbox_wrapper="bwrap",
-            sandbox_wrapper_args=[],
-            network_policy="allow",
-        )
-        merged = base.for_job(
+        merged = _SANDBOXED_ALLOW.for_job(
             job_sandbox=True,
             job_network_policy="deny",
             job_allowed_binaries=None,
@@ -43,14 +41,7 @@ class PolicyTests(unittest.TestCase):
         self.assertEqual(merged.network_policy, "deny")
 
     def test_for_job_intersects_allowed_binaries_when_override_present(self) -> None:
-        base = ExecutionPolicy(
-            allowed_binaries={"claude", "git", "bwrap"},
-            sandbox=True,
-            sandbox_wrapper="bwrap",
-            sandbox_wrapper_args=[],
-            network_policy="allow",
-        )
-        merged = base.for_job(
+        merged = _SANDBOXED_ALLOW.for_job(
             job_sandbox=True,
             job_network_policy="allow",
             job_allowed_binaries=["claude"],
@@ -59,14 +50,7 @@ class PolicyTests(unittest.TestCase):
         self.assertEqual(merged.allowed_binaries, {"claude", "bwrap"})
 
     def test_for_job_preserves_sandbox_wrapper_in_allowed_binaries(self) -> None:
-        base = ExecutionPolicy(
-            allowed_binaries={"claude", "git", "bwrap"},
-            sandbox=True,
-            sandbox_wrapper="bwrap",
-            sandbox_wrapper_args=["--unshare-net"],
-            network_policy="deny",
-        )
-        merged = base.for_job(
+        merged = _SANDBOXED_DENY.for_job(
             job_sandbox=True,
             job_network_policy="deny",
             job_allowed_binaries=["claude"],
@@ -76,6 +60,15 @@ class PolicyTests(unittest.TestCase):
         self.assertIn("claude", merged.allowed_binaries)
         self.assertNotIn("git", merged.allowed_binaries)
 
+    def test_for_job_ignores_blank_job_binaries_and_keeps_base_untouched(self) -> None:
+        merged = _SANDBOXED_ALLOW.for_job(
+            job_sandbox=False,
+            job_network_policy=None,
+            job_allowed_binaries=[" git ", "", "unknown"],
+        )
+        self.assertEqual(merged.allowed_binaries, {"git"})
+        self.assertEqual(_SANDBOXED_ALLOW.allowed_binaries, frozenset({"claude", "git", "bwrap"}))
+
     def test_build_policy_from_env_rejects_invalid_network_value(self) -> None:
         with self.assertRaises(PolicyError):
             build_policy_from_env(
@@ -1,22 +1,23 @@
 from __future__ import annotations
 
-import tempfile
 import unittest
 from pathlib import Path
 
 from orchestrator.models import JobSpec, PolicySpec, StepSpec
 from orchestrator.policy import ExecutionPolicy
+from tests._support import scratch_dir, step_context
 from workers.base import BaseWorker, StepContext
 
 
-def _test_policy() -> ExecutionPolicy:
-    return ExecutionPolicy(
-        allowed_binaries={"echo"},
-        sandbox=False,
-        sandbox_wrapper=None,
-        sandbox_wrapper_args=[],
-        network_policy="deny",
-    )
+_POLICY = ExecutionPolicy(
+    allowed_binaries=frozenset({"echo"}),
+    sandbox=False,
+    sandbox_wrapper=None,
+    sandbox_wrapper_args=[],
+    network_policy="deny",
+)
+_JOB_POLICY = PolicySpec()
+_CONTEXT_WINDOW = ({"role": "user", "content": "history message"},)
 
 
 def _make_ctx(
@@ -32,106 +33,96 @@ def _make_ctx(
         goal="prompt-builder test",
         workdir=str(job_dir),
         steps=[step],
-        policy=PolicySpec(),
+        policy=_JOB_POLICY,
     )
-    step_dir = job_dir / "steps" / step.step_id
-    return StepContext(
-        job=job,
-        step=step,
-        job_dir=job_dir,
-        step_dir=step_dir,
+    return step_context(
+        job,
+        step,
+        job_dir,
         enable_real_cli=False,
-        policy=_test_policy(),
-        env_allowlist=set(),
-        sensitive_env_vars=set(),
-        sandbox_clear_env=False,
+        policy=_POLICY,
         max_input_artifacts_files=max_files,
         max_input_artifact_chars=max_file_chars,
         max_input_artifacts_chars=max_total_chars,
-        context_window=[{"role": "user", "content": "history message"}],
+        context_window=list(_CONTEXT_WINDOW),
         context_strategy="sliding",
     )
 
-
 class PromptBuilderTests(unittest.TestCase):
     def test_prompt_builder_uses_standard_markers(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            job_dir = Path(td)
-            (job_dir / "steps" / "01_plan").mkdir(parents=True, exist_ok=True)
-            (job_dir / "steps" / "01_plan" / "report.md").write_text("plan ok", encoding="utf-8")
-
-            step = StepSpec(
-                step_id="02_impl",
-                agent="codex",
-                role="implementer",
-                prompt="implement",
-                input_artifacts=["steps/01_plan/report.md"],
-            )
-            ctx = _make_ctx(job_dir=job_dir, step=step)
-
-            built = BaseWorker().build_full_prompt(ctx)
-            self.assertIn("## Input artifacts", built)
-            self.assertIn("=== BEGIN ARTIFACT: steps/01_plan/report.md ===", built)
-            self.assertIn("plan ok", built)
-            self.assertIn("=== END ARTIFACT ===", built)
+        job_dir = scratch_dir(self)
+        (job_dir / "steps" / "01_plan").mkdir(parents=True, exist_ok=True)
+        (job_dir / "steps" / "01_plan" / "report.md").write_text("plan ok", encoding="utf-8")
+
+        step = StepSpec(
+            step_id="02_impl",
+            agent="codex",
+            role="implementer",
+            prompt="implement",
+            input_artifacts=["steps/01_plan/report.md"],
+        )
+        ctx = _make_ctx(job_dir=job_dir, step=step)
+
+        built = BaseWorker().build_full_prompt(ctx)
+        self.assertIn("## Input artifacts", built)
+        self.assertIn("=== BEGIN ARTIFACT: steps/01_plan/report.md ===", built)
+        self.assertIn("plan ok", built)
+        self.assertIn("=== END ARTIFACT ===", built)
 
     def test_prompt_builder_enforces_limits_and_path_safety(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            job_dir = Path(td)
-            (job_dir / "a.txt").write_text("abcdefghij", encoding="utf-8")
-            (job_dir / "b.txt").write_text("1234567890", encoding="utf-8")
-
-            step = StepSpec(
-                step_id="03_review",
-                agent="claude",
-                role="reviewer",
-                prompt="review",
-                input_artifacts=["a.txt", "b.txt", "../escape.txt", "missing.txt"],
-            )
-            ctx = _make_ctx(
-                job_dir=job_dir,
-                step=step,
-                max_files=2,
-                max_file_chars=8,
-                max_total_chars=12,
-            )
-
-            built = BaseWorker().build_full_prompt(ctx)
-            self.assertIn("=== BEGIN ARTIFACT: a.txt ===", built)
-            self.assertIn("=== BEGIN ARTIFACT: b.txt ===", built)
-            self.assertIn("[truncated:file_limit]", built)
-            self.assertIn("[truncated:total_limit]", built)
-            self.assertIn("[artifacts_truncated_or_limited]", built)
-            self.assertNotIn("escape.txt", built)
-            self.assertNotIn("missing.txt", built)
+        job_dir = scratch_dir(self)
+        (job_dir / "a.txt").write_text("abcdefghij", encoding="utf-8")
+        (job_dir / "b.txt").write_text("1234567890", encoding="utf-8")
+
+        step = StepSpec(
+            step_id="03_review",
+            agent="claude",
+            role="reviewer",
+            prompt="review",
+            input_artifacts=["a.txt", "b.txt", "../escape.txt", "missing.txt"],
+        )
+        ctx = _make_ctx(
+            job_dir=job_dir,
+            step=step,
+            max_files=2,
+            max_file_chars=8,
+            max_total_chars=12,
+        )
+
+        built = BaseWorker().build_full_prompt(ctx)
+        self.assertIn("=== BEGIN ARTIFACT: a.txt ===", built)
+        self.assertIn("=== BEGIN ARTIFACT: b.txt ===", built)
+        self.assertIn("[truncated:file_limit]", built)
+        self.assertIn("[truncated:total_limit]", built)
+        self.assertIn("[artifacts_truncated_or_limited]", built)
+        self.assertNotIn("escape.txt", built)
+        self.assertNotIn("missing.txt", built)
 
     def test_prompt_builder_marks_invalid_path(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            job_dir = Path(td)
-            step = StepSpec(
-                step_id="04_review",
-                agent="claude",
-                role="reviewer",
-                prompt="review",
-                input_artifacts=["../outside.txt"],
-            )
-            ctx = _make_ctx(job_dir=job_dir, step=step)
-            built = BaseWorker().build_full_prompt(ctx)
-            self.assertIn("[invalid_path]", built)
+        job_dir = scratch_dir(self)
+        step = StepSpec(
+            step_id="04_review",
+            agent="claude",
+            role="reviewer",
+            prompt="review",
+            input_artifacts=["../outside.txt"],
+        )
+        ctx = _make_ctx(job_dir=job_dir, step=step)
+        built = BaseWorker().build_full_prompt(ctx)
+        self.assertIn("[invalid_path]", built)
 
     def test_prompt_builder_includes_context_window(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            job_dir = Path(td)
-            step = StepSpec(
-                step_id="05_impl",
-                agent="codex",
-                role="implementer",
-                prompt="do work",
-            )
-            ctx = _make_ctx(job_dir=job_dir, step=step)
-            built = BaseWorker().build_full_prompt(ctx)
-            self.assertIn("## Conversation context (sliding)", built)
-            self.assertIn("history message", built)
+        job_dir = scratch_dir(self)
+        step = StepSpec(
+            step_id="05_impl",
+            agent="codex",
+            role="implementer",
+            prompt="do work",
+        )
+        ctx = _make_ctx(job_dir=job_dir, step=step)
+        built = BaseWorker().build_full_prompt(ctx)
+        self.assertIn("## Conversation context (sliding)", built)
+        self.assertIn("history message", built)
 
 
 if __name__ == "__main__":
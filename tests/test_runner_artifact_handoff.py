@@ -3,44 +3,44 @@ from __future__ import annotations
 import unittest
 
 from orchestrator.models import ArtifactPaths, StepResult, StepSpec, utc_now_iso
+from tests._runner_imports import _latest_successful_step_id, _resolve_effective_step
 
-try:
-    from orchestrator.runner import _latest_successful_step_id, _resolve_effective_step
-except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
-    _latest_successful_step_id = None  # type: ignore[assignment]
-    _resolve_effective_step = None  # type: ignore[assignment]
+
+_NOW = utc_now_iso()
+
+
+def _step_result(step_id: str, status: str) -> StepResult:
+    return StepResult(
+        job_id="job-test-handoff-01",
+        step_id=step_id,
+        agent="codex",
+        role="implementer",
+        status=status,
+        attempts=1,
+        started_at=_NOW,
+        finished_at=_NOW,
+        summary=status,
+        artifacts=ArtifactPaths(
+            report_md=f"steps/{step_id}/report.md",
+            patch_diff=f"steps/{step_id}/patch.diff",
+            logs_txt=f"steps/{step_id}/logs.txt",
+            result_json=f"steps/{step_id}/result.json",
+        ),
+    )
+
+
+# Built once and only ever read by the tests.
+_STEP_RESULTS = (
+    _step_result("01_plan", "failed"),
+    _step_result("02_impl", "success"),
+    _step_result("03_review", "failed"),
+)
 
 
 @unittest.skipIf(_latest_successful_step_id is None or _resolve_effective_step is None, "runner dependencies are not installed")
 class RunnerArtifactHandoffTests(unittest.TestCase):
-    @staticmethod
-    def _step_result(step_id: str, status: str) -> StepResult:
-        now = utc_now_iso()
-        return StepResult(
-            job_id="job-test-handoff-01",
-            step_id=step_id,
-            agent="codex",
-            role="implementer",
-            status=status,
-            attempts=1,
-            started_at=now,
-            finished_at=now,
-            summary=status,
-            artifacts=ArtifactPaths(
-                report_md=f"steps/{step_id}/report.md",
-                patch_diff=f"steps/{step_id}/patch.diff",
-                logs_txt=f"steps/{step_id}/logs.txt",
-                result_json=f"steps/{step_id}/result.json",
-            ),
-        )
-
     def test_latest_successful_step_id(self) -> None:
-        step_results = [
-            self._step_result("01_plan", "failed"),
-            self._step_result("02_impl", "success"),
-            self._step_result("03_review", "failed"),
-        ]
-        self.assertEqual(_latest_successful_step_id(step_results), "02_impl")
+        self.assertEqual(_latest_successful_step_id(list(_STEP_RESULTS)), "02_impl")
 
     def test_patch_first_sets_previous_patch_only(self) -> None:
         step = StepSpec(
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from orchestrator.models import JobSpec, StepSpec
+from tests._support import scratch_dir, step_context
+from workers.base import BaseWorker
+
+try:
+    from orchestrator import runner
+except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
+    runner = None  # type: ignore[assignment]
+
+
+class _ThreadNameWorker(BaseWorker):
+    AGENT_NAME = "thread-name"
+
+    async def run(self, ctx):  # type: ignore[override]
+        return threading.current_thread().name
+
+
+class _CpuWorker(_ThreadNameWorker):
+    EXECUTION_KIND = "cpu"
+
+
+class _SpinWorker(BaseWorker):
+    AGENT_NAME = "spin"
+
+    async def run(self, ctx):  # type: ignore[override]
+        while True:
+            time.sleep(0.01)
+
+
+@unittest.skipIf(runner is None, "runner dependencies are not installed")
+class RunnerCpuWorkerTests(unittest.TestCase):
+    def test_io_workers_run_on_event_loop(self) -> None:
+        ctx = SimpleNamespace(step=SimpleNamespace(agent="thread-name"))
+        result = asyncio.run(runner._run_worker(_ThreadNameWorker(), ctx))
+        self.assertEqual(result, threading.current_thread().name)
+
+    def test_cpu_workers_are_dispatched_to_pool(self) -> None:
+        ctx = SimpleNamespace(step=SimpleNamespace(agent="thread-name", timeout_sec=5))
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpu-pool") as pool:
+            with patch.object(runner, "_get_cpu_pool", return_value=pool), patch.object(
+                runner, "get_worker", return_value=_CpuWorker()
+            ):
+                result = asyncio.run(runner._run_worker(_CpuWorker(), ctx))
+        self.assertTrue(result.startswith("cpu-pool"))
+
+    def test_worker_process_enforces_step_timeout(self) -> None:
+        with patch.object(runner, "get_worker", return_value=_SpinWorker()):
+            with self.assertRaises(TimeoutError):
+                runner._run_worker_in_process("spin", SimpleNamespace(), 0.05)
+
+    def test_cpu_worker_round_trips_through_real_process_pool(self) -> None:
+        # Spawned child: ctx is pickled and "codex" is resolved from the child's own registry.
+        self.addCleanup(runner._shutdown_cpu_pool)
+        step = StepSpec(step_id="01_impl", agent="codex", role="implementer", prompt="hi")
+        job_dir = scratch_dir(self)
+        ctx = step_context(
+            JobSpec(job_id="job-cpu-pool", goal="g", workdir=".", steps=[step]),
+            step,
+            job_dir,
+            enable_real_cli=False,
+        )
+        ctx.step_dir.mkdir(parents=True)
+        result = asyncio.run(runner._run_worker(_CpuWorker(), ctx))
+        self.assertEqual((result.job_id, result.step_id, result.status), ("job-cpu-pool", "01_impl", "success"))
+        self.assertTrue((ctx.step_dir / "report.md").is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,10 +3,7 @@ from __future__ import annotations
 import unittest
 
 from orchestrator.models import StepSpec
-try:
-    from orchestrator.runner import _resolve_on_failure
-except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
-    _resolve_on_failure = None  # type: ignore[assignment]
+from tests._runner_imports import _resolve_on_failure, _step_index_by_id
 
 
 @unittest.skipIf(_resolve_on_failure is None, "runner dependencies are not installed")
@@ -25,6 +22,17 @@ class RunnerOnFailureTests(unittest.TestCase):
         ]
         self.assertEqual(_resolve_on_failure("goto:02_impl", steps, 0), 1)
 
+    def test_resolve_on_failure_goto_uses_precomputed_index(self) -> None:
+        steps = [
+            StepSpec(step_id="01_plan", agent="opencode", role="planner", prompt="plan"),
+            StepSpec(step_id="02_impl", agent="codex", role="implementer", prompt="impl"),
+            StepSpec(step_id="01_plan", agent="claude", role="reviewer", prompt="review"),
+        ]
+        index = _step_index_by_id(steps)
+        self.assertEqual(index, {"01_plan": 0, "02_impl": 1})
+        self.assertEqual(_resolve_on_failure("goto:01_plan", steps, 2, index), 0)
+        self.assertIsNone(_resolve_on_failure("goto:99_missing", steps, 2, index))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fsqueue.file_queue import ClaimedJob, FileQueue
+from tests._support import SharedLoopAsyncTestCase, scratch_dir, write_small
+
+try:
+    from orchestrator import runner
+except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
+    runner = None  # type: ignore[assignment]
+
+
+def _settings(**changes: object) -> SimpleNamespace:
+    values = {
+        "runner_reclaim_after_sec": 60,
+        "retention_interval_sec": 0,
+        "runner_max_parallel_jobs": 2,
+        "runner_claim_batch_size": 2,
+        "runner_poll_interval_sec": 0.01,
+        "runner_poll_max_sec": 0.01,
+        "runner_use_inotify": False,
+    }
+    values.update(changes)
+    return SimpleNamespace(**values)
+
+
+@unittest.skipIf(runner is None, "runner dependencies are not installed")
+class RunnerParallelJobsTests(SharedLoopAsyncTestCase):
+    async def test_reclaims_foreign_stale_jobs_while_all_slots_are_busy(self) -> None:
+        q = FileQueue(scratch_dir(self) / "queue")
+        for job_id in ("job-a", "job-b", "job-c"):
+            write_small(os.path.join(q.pending_str, f"{job_id}.json"), b"{}")
+        stale_file = os.path.join(q.running_str, "job-peer.json")
+        processed: list[str] = []
+        active = peak = 0
+        peer_reclaimed_under_load: list[bool] = []
+
+        async def fake_process_job(rt: object, claimed: ClaimedJob) -> None:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            # Every file looks an hour old: only the in-flight skip keeps ours in running/.
+            os.utime(claimed.path, (0, 0))
+            if claimed.job_id == "job-a":
+                # A peer runner crashed mid-job while both of our slots are taken.
+                write_small(stale_file, b"{}")
+                os.utime(stale_file, (0, 0))
+            await asyncio.sleep(0.1)
+            if claimed.job_id == "job-a":
+                peer_reclaimed_under_load.append(not os.path.exists(stale_file))
+            processed.append(claimed.job_id)
+            active -= 1
+            q.ack(claimed)
+
+        rt = SimpleNamespace(settings=_settings(), queue=q)
+        with patch.object(runner, "_process_job", fake_process_job), patch.object(q, "close", wraps=q.close) as close:
+            serve = asyncio.create_task(runner._serve(rt))
+            try:
+                for _ in range(200):
+                    if len(os.listdir(q.done)) == 4:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                serve.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await serve
+
+        self.assertEqual(sorted(processed), ["job-a", "job-b", "job-c", "job-peer"])
+        self.assertEqual(peak, 2)
+        self.assertEqual(peer_reclaimed_under_load, [True])
+        self.assertEqual(os.listdir(q.running), [])
+        # Shutting the loop down releases the queue's pending/ watcher.
+        close.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from tests._runner_imports import _idle_poll_delay
+
+
+@unittest.skipIf(_idle_poll_delay is None, "runner dependencies are not installed")
+class RunnerIdlePollTests(unittest.TestCase):
+    def test_idle_delay_grows_and_caps(self) -> None:
+        with patch("orchestrator.runner.random.uniform", return_value=1.0):
+            delays = [_idle_poll_delay(1, streak, 5) for streak in range(1, 7)]
+        self.assertEqual(delays, [1, 2, 4, 5, 5, 5])
+
+    def test_idle_delay_is_jittered_within_25_percent(self) -> None:
+        for _ in range(50):
+            delay = _idle_poll_delay(2, 1, 5)
+            self.assertGreaterEqual(delay, 1.5)
+            self.assertLessEqual(delay, 2.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
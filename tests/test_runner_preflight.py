@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 import unittest
+from unittest.mock import patch
 
 from orchestrator.models import JobSpec, PolicySpec, StepSpec
 from orchestrator.step_requirements import required_binaries_for_job
-from workers import ensure_workers_registered
+from workers import ensure_workers_registered, get_worker, registry
+from workers.codex_worker import CodexWorker
+
+
+class _RipgrepCodexWorker(CodexWorker):
+    def required_binaries(self, step: StepSpec) -> set[str]:
+        extra = {"rg"} if step.allowed_tools else set()
+        return super().required_binaries(step) | extra
 
 
 class RunnerDynamicPreflightTests(unittest.TestCase):
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
         ensure_workers_registered()
 
     def test_collects_only_required_cli_binaries_for_job(self) -> None:
@@ -25,6 +35,27 @@ class RunnerDynamicPreflightTests(unittest.TestCase):
         required = required_binaries_for_job(job)
         self.assertEqual(required, {"opencode", "codex", "git"})
 
+    def test_steps_sharing_an_agent_are_resolved_once(self) -> None:
+        steps = [
+            StepSpec(step_id=f"{i:02d}_impl", agent="codex", role="implementer", prompt="impl")
+            for i in range(5)
+        ]
+        job = JobSpec(job_id="job-test-dynamic-preflight-3", goal="test", steps=steps, policy=PolicySpec())
+        with patch("orchestrator.step_requirements.get_worker", wraps=get_worker) as lookup:
+            required = required_binaries_for_job(job)
+        self.assertEqual(required, {"codex", "git"})
+        self.assertEqual(lookup.call_count, 1)
+
+    def test_required_binaries_override_is_consulted_for_every_step(self) -> None:
+        steps = [
+            StepSpec(step_id="01_impl", agent="codex", role="implementer", prompt="impl"),
+            StepSpec(step_id="02_impl", agent="codex", role="implementer", prompt="impl", allowed_tools=["grep"]),
+        ]
+        job = JobSpec(job_id="job-test-dynamic-preflight-4", goal="test", steps=steps, policy=PolicySpec())
+        with patch.dict(registry._WORKERS, {"codex": _RipgrepCodexWorker()}):
+            required = required_binaries_for_job(job)
+        self.assertEqual(required, {"codex", "git", "rg"})
+
     def test_api_only_job_requires_no_cli_binary(self) -> None:
         steps = [
             StepSpec(step_id="01_kimi", agent="kimi", role="analyst", prompt="analyze"),
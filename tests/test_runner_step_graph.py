@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from fsqueue.file_queue import FileQueue
+from orchestrator.artifact_store import ArtifactStore
+from orchestrator.budget import BudgetTracker
+from orchestrator.config import Settings
+from orchestrator.models import JobSpec, StepResult, StepSpec, utc_now_iso
+from orchestrator.policy import ExecutionPolicy
+from orchestrator.workspace import WorkspaceManager
+from tests._runner_imports import _step_dependencies
+from tests._support import InMemoryBudgetBackend, SharedLoopAsyncTestCase, scratch_dir
+from workers import registry
+from workers.base import BaseWorker
+
+try:
+    from orchestrator import runner
+except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
+    runner = None  # type: ignore[assignment]
+
+
+def _step(step_id: str, depends_on: list[str] | None = None, **fields: Any) -> StepSpec:
+    return StepSpec(step_id=step_id, agent="opencode", role="r", prompt="p", depends_on=depends_on, **fields)
+
+
+@unittest.skipIf(_step_dependencies is None, "runner dependencies are not installed")
+class RunnerStepGraphTests(unittest.TestCase):
+    def test_unset_depends_on_means_previous_step(self) -> None:
+        deps = _step_dependencies([_step("a", []), _step("b", []), _step("c"), _step("d", ["a", "c"])])
+        self.assertEqual(deps, {"a": [], "b": [], "c": ["b"], "d": ["a", "c"]})
+
+    def test_unknown_dependency_is_rejected(self) -> None:
+        with self.assertRaisesRegex(ValueError, "unknown step 'zz'"):
+            _step_dependencies([_step("a", ["zz"])])
+
+    def test_cycle_is_rejected(self) -> None:
+        with self.assertRaisesRegex(ValueError, "cycle among steps: a, b"):
+            _step_dependencies([_step("a", ["b"]), _step("b", ["a"]), _step("c", [])])
+
+    def test_duplicate_step_id_is_rejected(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Duplicate step_id 'a'"):
+            _step_dependencies([_step("a", []), _step("a", [])])
+
+    def test_goto_on_failure_is_rejected(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Step 'b': on_failure=goto:a is not supported with depends_on"):
+            _step_dependencies([_step("a", []), _step("b", ["a"], on_failure="goto:a")])
+
+
+class _GraphWorker(BaseWorker):
+    """Sleeps for step.timeout_sec / 100 s, then reports the status named by step.prompt.
+
+    after[step_id] names a step whose result.json must exist before step_id finishes.
+    """
+
+    AGENT_NAME = "opencode"
+
+    def __init__(self, after: dict[str, str]) -> None:
+        self.after = after
+        self.events: list[tuple[str, str]] = []
+        self.active = 0
+        self.peak = 0
+
+    async def run(self, ctx):  # type: ignore[override]
+        step = ctx.step
+        started_at = utc_now_iso()
+        self.events.append(("start", step.step_id))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(step.timeout_sec / 100)
+        if step.step_id in self.after:
+            awaited = ctx.job_dir / "steps" / self.after[step.step_id] / "result.json"
+            while not awaited.exists():
+                await asyncio.sleep(0.005)
+        self.active -= 1
+        self.events.append(("end", step.step_id))
+        self.write_artifacts(ctx, report_md=f"# {step.step_id}\n", patch_diff="", logs_txt=f"{step.step_id}\n")
+        return StepResult(
+            job_id=ctx.job.job_id,
+            step_id=step.step_id,
+            agent=step.agent,
+            role=step.role,
+            status=step.prompt,
+            attempts=1,
+            started_at=started_at,
+            finished_at=utc_now_iso(),
+            summary=step.step_id,
+            artifacts=self.artifact_paths(ctx),
+        )
+
+
+def _graph_step(
+    step_id: str, depends_on: list[str], *, ticks: int = 1, status: str = "success", **fields: Any
+) -> StepSpec:
+    return StepSpec(
+        step_id=step_id,
+        agent="opencode",
+        role="r",
+        prompt=status,
+        depends_on=depends_on,
+        timeout_sec=ticks,
+        max_retries=0,
+        **fields,
+    )
+
+
+@unittest.skipIf(runner is None, "runner dependencies are not installed")
+class RunnerStepGraphRunTests(SharedLoopAsyncTestCase):
+    """Whole jobs through _process_job with a recording worker in place of opencode."""
+
+    async def _run_job(
+        self, steps: list[StepSpec], *, max_parallel_steps: int = 2, after: dict[str, str] | None = None
+    ) -> tuple[dict, _GraphWorker]:
+        root = scratch_dir(self)
+        src = root / "src"
+        src.mkdir()
+        settings = dataclasses.replace(
+            Settings.load(),
+            queue_root=root / "queue",
+            artifacts_root=root / "artifacts",
+            workspaces_root=root / "workspaces",
+            enable_real_cli=False,
+            runner_max_parallel_steps=max_parallel_steps,
+        )
+        q = FileQueue(settings.queue_root)
+        budget = BudgetTracker(backend=InMemoryBudgetBackend())
+        rt = runner._Runtime(
+            settings=settings,
+            queue=q,
+            store=ArtifactStore(settings.artifacts_root),
+            workspace_manager=WorkspaceManager(settings.workspaces_root, {}),
+            budget=budget,
+            policy=ExecutionPolicy(
+                allowed_binaries=set(),
+                sandbox=False,
+                sandbox_wrapper=None,
+                sandbox_wrapper_args=[],
+                network_policy="allow",
+            ),
+            job_schema=runner._contracts_dir() / "job.schema.json",
+            result_schema=runner._contracts_dir() / "result.schema.json",
+        )
+        job = JobSpec(job_id="job-graph", goal="graph", workdir=str(src), steps=steps)
+        q.enqueue(job.model_dump())
+        worker = _GraphWorker(after or {})
+        with patch.dict(registry._WORKERS, {"opencode": worker}):
+            await runner._process_job(rt, q.claim())
+        result = json.loads(Path(settings.artifacts_root / job.job_id / "result.json").read_text(encoding="utf-8"))
+        return result, worker
+
+    async def test_independent_steps_overlap_and_results_keep_declaration_order(self) -> None:
+        result, worker = await self._run_job(
+            [
+                _graph_step("a", [], ticks=3),
+                _graph_step("b", [], ticks=1),
+                _graph_step("c", [], ticks=1),
+                _graph_step("d", ["a", "b", "c"]),
+            ]
+        )
+        self.assertEqual(result["status"], "success")
+        self.assertEqual([s["step_id"] for s in result["steps"]], ["a", "b", "c", "d"])
+        # RUNNER_MAX_PARALLEL_STEPS=2 caps the three ready roots.
+        self.assertEqual(worker.peak, 2)
+        self.assertEqual(worker.events[:2], [("start", "a"), ("start", "b")])
+        self.assertEqual(worker.events[-2:], [("start", "d"), ("end", "d")])
+
+    async def test_first_failure_halts_steps_not_yet_started(self) -> None:
+        result, worker = await self._run_job(
+            [
+                _graph_step("a", [], status="failed"),
+                _graph_step("b", []),
+                _graph_step("c", ["b"]),
+            ],
+            # b is still running when a's failure is recorded.
+            after={"b": "a"},
+        )
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(result["error"]["code"], "step_failed")
+        self.assertIn("Step a failed", result["error"]["message"])
+        # b was already running and finishes; c never starts.
+        self.assertEqual([s["step_id"] for s in result["steps"]], ["a", "b"])
+        self.assertNotIn(("start", "c"), worker.events)
+
+    async def test_continue_on_failure_lets_dependents_run(self) -> None:
+        result, worker = await self._run_job(
+            [
+                _graph_step("a", [], status="failed", on_failure="continue"),
+                _graph_step("b", ["a"]),
+            ]
+        )
+        self.assertEqual(result["status"], "success")
+        self.assertEqual([(s["step_id"], s["status"]) for s in result["steps"]], [("a", "failed"), ("b", "success")])
+        self.assertEqual(worker.events, [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")])
+
+    async def test_goto_with_depends_on_fails_before_any_step_runs(self) -> None:
+        result, worker = await self._run_job(
+            [
+                _graph_step("a", []),
+                _graph_step("b", ["a"], on_failure="goto:a"),
+            ]
+        )
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(result["error"]["code"], "invalid_dependencies")
+        self.assertEqual(worker.events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from fsqueue.file_queue import FileQueue
+from tests._support import scratch_dir
+
+try:
+    from orchestrator import scheduler
+except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
+    scheduler = None  # type: ignore[assignment]
+
+
+_T0 = datetime(2026, 1, 1, 0, 0, 30, tzinfo=timezone.utc)
+
+
+@unittest.skipIf(scheduler is None, "scheduler dependencies are not installed")
+class CronSchedulerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        root = scratch_dir(self)
+        self.queue = FileQueue(root / "queue")
+        self.sdir = root / "schedules"
+        self.sdir.mkdir()
+        self.sched = scheduler.CronScheduler(self.queue, self.sdir)
+        self.now = _T0
+
+    def _write(self, name: str, obj: dict) -> Path:
+        path = self.sdir / name
+        path.write_text(json.dumps(obj), encoding="utf-8")
+        return path
+
+    def _tick(self) -> None:
+        with patch.object(scheduler, "_now", return_value=self.now):
+            self.sched.tick()
+
+    def _pending(self) -> int:
+        return len(list((self.queue.root / "pending").glob("*.json")))
+
+    def test_fires_when_due_and_reschedules(self) -> None:
+        self._write("every-minute.json", {"id": "m", "schedule": "* * * * *", "payload": {"goal": "g"}})
+
+        self._tick()
+        self.assertEqual(self._pending(), 0)
+        self.assertEqual(self.sched.next_runs["m"], datetime(2026, 1, 1, 0, 1, tzinfo=timezone.utc))
+        self.assertAlmostEqual(self.sched.seconds_until_next(self.now), 30.0)
+
+        self.now = _T0 + timedelta(seconds=40)
+        self._tick()
+        self.assertEqual(self._pending(), 1)
+        self.assertEqual(self.sched.next_runs["m"], datetime(2026, 1, 1, 0, 2, tzinfo=timezone.utc))
+
+    def test_unchanged_file_is_not_reparsed(self) -> None:
+        self._write("s.json", {"id": "s", "schedule": "0 * * * *"})
+        with patch.object(scheduler, "_load_json", wraps=scheduler._load_json) as load:
+            self._tick()
+            self._tick()
+        self.assertEqual(load.call_count, 1)
+
+    def test_disabled_schedule_is_dropped_before_firing(self) -> None:
+        path = self._write("s.json", {"id": "s", "schedule": "* * * * *"})
+        self._tick()
+
+        self._write("s.json", {"id": "s", "schedule": "* * * * *", "enabled": False})
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.now = _T0 + timedelta(minutes=5)
+        self._tick()
+
+        self.assertEqual(self._pending(), 0)
+        self.assertNotIn("s", self.sched.next_runs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+from pathlib import Path
+
+from orchestrator.artifact_store import ArtifactStore, StateWriter
+from tests._support import scratch_dir
+
+
+class _CountingStore(ArtifactStore):
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.writes: list[tuple[dict, bool]] = []
+
+    def write_state_bytes(self, job_id: str, data: bytes, *, fsync: bool = False) -> None:
+        self.writes.append((json.loads(data), fsync))
+        super().write_state_bytes(job_id, data, fsync=fsync)
+
+
+class StateWriterTests(unittest.TestCase):
+    def test_coalesces_bursts_and_writes_latest_state(self) -> None:
+        store = _CountingStore(scratch_dir(self))
+        store.ensure_job_layout("job-state-1")
+
+        async def scenario() -> None:
+            writer = StateWriter(store, "job-state-1", min_interval_sec=0.05)
+            state = {"status": "running", "attempt": 0}
+            writer.mark_dirty(state)
+            writer.maybe_flush()
+            for attempt in range(1, 6):
+                state["attempt"] = attempt
+                writer.mark_dirty(state)
+                writer.maybe_flush()
+            self.assertEqual(len(store.writes), 1)
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(store.writes), 2)
+            self.assertEqual(store.writes[-1][0]["attempt"], 5)
+
+            state["status"] = "success"
+            writer.mark_dirty(state)
+            writer.maybe_flush(force=True)
+
+        asyncio.run(scenario())
+
+        self.assertEqual(store.writes[-1], ({"status": "success", "attempt": 5}, True))
+        on_disk = json.loads((store.job_dir("job-state-1") / "state.json").read_text(encoding="utf-8"))
+        self.assertEqual(on_disk["status"], "success")
+
+    def test_flush_cancels_pending_trailing_write(self) -> None:
+        store = _CountingStore(scratch_dir(self))
+        store.ensure_job_layout("job-state-2")
+
+        async def scenario() -> None:
+            writer = StateWriter(store, "job-state-2", min_interval_sec=0.05)
+            state = {"status": "running"}
+            writer.mark_dirty(state)
+            writer.maybe_flush()
+            state["status"] = "retrying"
+            writer.mark_dirty(state)
+            writer.maybe_flush()
+            state["status"] = "failed"
+            writer.mark_dirty(state)
+            writer.flush()
+            await asyncio.sleep(0.1)
+
+        asyncio.run(scenario())
+        self.assertEqual([w[0]["status"] for w in store.writes], ["running", "failed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,115 +7,129 @@ import unittest
 from pathlib import Path
 from unittest.mock import patch
 
-from orchestrator.subprocess_utils import run_command
+from orchestrator.subprocess_utils import _base_env, _read_stream, build_child_env, refresh_env_cache, run_command
+from tests._subprocess_fakes import FakeProc
+from tests._support import SharedLoopAsyncTestCase, scratch_dir
 
 
 def _repo_root() -> Path:
     return Path(__file__).resolve().parents[1]
 
 
+# Dump the child's environment with the interpreter already in the page cache instead of /usr/bin/env.
+_ENV_DUMP = [sys.executable, "-c", "import os, sys; sys.stdout.writelines(f'{k}={v}\\n' for k, v in os.environ.items())"]
+_STDOUT_BLOB = b"A" * 120
+_STDERR_BLOB = b"B" * 120
+_STDOUT_KEPT = "A" * 50
+_STDERR_KEPT = "B" * 50
+
+
 def _env_map(stdout: str) -> dict[str, str]:
-    pairs: dict[str, str] = {}
-    for line in stdout.splitlines():
-        if "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        pairs[key] = value
-    return pairs
+    return {key: value for line in stdout.splitlines() for key, sep, value in (line.partition("="),) if sep}
 
 
-class SubprocessEnvTests(unittest.IsolatedAsyncioTestCase):
-    async def test_allowlisted_variable_is_passed(self) -> None:
+class ChildEnvTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # One os.environ snapshot/restore for the class instead of a patch.dict per test.
+        cls.enterClassContext(
+            patch.dict(os.environ, {"MY_ALLOWED": "present", "MY_CACHED": "old", "HOME": "/home/x", "TMPDIR": "/tmp/x"})
+        )
+
+    def setUp(self) -> None:
+        refresh_env_cache()
+        self.addCleanup(refresh_env_cache)
+
+    def test_allowlisted_variable_is_passed(self) -> None:
+        child_env = build_child_env({}, ["MY_ALLOWED"])
+        self.assertEqual(child_env.get("MY_ALLOWED"), "present")
+        self.assertIn("PATH", child_env)
+
+    def test_non_allowlisted_override_is_ignored(self) -> None:
+        child_env = build_child_env({"NOT_ALLOWED": "1", "MY_ALLOWED": "override"}, ["MY_ALLOWED"])
+        self.assertNotIn("NOT_ALLOWED", child_env)
+        self.assertEqual(child_env["MY_ALLOWED"], "override")
+
+    def test_env_snapshot_is_reused_until_refreshed(self) -> None:
+        first = build_child_env({}, ["MY_CACHED"])
+        self.addCleanup(os.environ.__setitem__, "MY_CACHED", "old")
+        os.environ["MY_CACHED"] = "new"
+        cached = build_child_env({}, ["MY_CACHED"])
+        refresh_env_cache()
+        refreshed = build_child_env({}, ["MY_CACHED"])
+        self.assertEqual(first["MY_CACHED"], "old")
+        self.assertEqual(cached["MY_CACHED"], "old")
+        self.assertEqual(refreshed["MY_CACHED"], "new")
+
+    def test_base_env_is_merged_once_and_overrides_do_not_leak(self) -> None:
+        first = build_child_env({"MY_ALLOWED": "override"}, ["MY_ALLOWED"])
+        second = build_child_env({}, ["MY_ALLOWED"])
+        self.assertEqual(first["MY_ALLOWED"], "override")
+        self.assertEqual(second["MY_ALLOWED"], "present")
+        self.assertEqual(_base_env.cache_info().hits, 1)
+
+    def test_clear_env_mode_reduces_base_environment(self) -> None:
+        child_env = build_child_env({}, [], clear_env=True)
+        self.assertIn("PATH", child_env)
+        self.assertNotIn("HOME", child_env)
+        self.assertNotIn("TMPDIR", child_env)
+
+
+class SubprocessEnvTests(SharedLoopAsyncTestCase):
+    def setUp(self) -> None:
+        refresh_env_cache()
+        self.addCleanup(refresh_env_cache)
+
+    async def test_child_receives_built_env(self) -> None:
+        # The one spawn that checks run_command really hands build_child_env's result to the child.
         with patch.dict(os.environ, {"MY_ALLOWED": "present"}, clear=False):
+            refresh_env_cache()
             result = await run_command(
-                ["/usr/bin/env"],
+                _ENV_DUMP,
                 cwd=_repo_root(),
-                env={},
+                env={"NOT_ALLOWED": "1"},
                 env_allowlist=["MY_ALLOWED"],
                 clear_env=False,
                 timeout_sec=5,
             )
+            expected = build_child_env({}, ["MY_ALLOWED"])
         self.assertEqual(result.exit_code, 0)
         env_out = _env_map(result.stdout)
-        self.assertEqual(env_out.get("MY_ALLOWED"), "present")
-        self.assertIn("PATH", env_out)
-
-    async def test_non_allowlisted_override_is_ignored(self) -> None:
-        result = await run_command(
-            ["/usr/bin/env"],
-            cwd=_repo_root(),
-            env={"NOT_ALLOWED": "1"},
-            env_allowlist=[],
-            clear_env=False,
-            timeout_sec=5,
-        )
-        self.assertEqual(result.exit_code, 0)
-        env_out = _env_map(result.stdout)
+        # The interpreter may add locale-coercion vars (LC_CTYPE) of its own; everything we sent must arrive.
+        self.assertLessEqual(expected.items(), env_out.items())
         self.assertNotIn("NOT_ALLOWED", env_out)
 
-    async def test_clear_env_mode_reduces_base_environment(self) -> None:
-        result = await run_command(
-            ["/usr/bin/env"],
-            cwd=_repo_root(),
-            env={},
-            env_allowlist=[],
-            clear_env=True,
-            timeout_sec=5,
-        )
-        self.assertEqual(result.exit_code, 0)
-        env_out = _env_map(result.stdout)
-        self.assertIn("PATH", env_out)
-        self.assertNotIn("HOME", env_out)
-        self.assertNotIn("TMPDIR", env_out)
-
     async def test_output_is_truncated_when_limit_is_reached(self) -> None:
-        result = await run_command(
-            [sys.executable, "-c", "import sys; sys.stdout.write('A'*120); sys.stderr.write('B'*120)"],
-            cwd=_repo_root(),
-            env={},
-            env_allowlist=[],
-            clear_env=False,
-            timeout_sec=5,
-            max_output_chars=50,
-        )
+        async def _fake_create_subprocess_exec(*_args, **_kwargs) -> FakeProc:
+            return FakeProc(stdout_data=_STDOUT_BLOB, stderr_data=_STDERR_BLOB)
+
+        with patch("orchestrator.subprocess_utils.asyncio.create_subprocess_exec", side_effect=_fake_create_subprocess_exec):
+            result = await run_command(
+                _ENV_DUMP,
+                cwd=_repo_root(),
+                env={},
+                env_allowlist=[],
+                clear_env=False,
+                timeout_sec=5,
+                max_output_chars=50,
+            )
 
         self.assertEqual(result.exit_code, 0)
         self.assertTrue(result.stdout_truncated)
         self.assertTrue(result.stderr_truncated)
-        self.assertIn("A" * 50, result.stdout)
-        self.assertIn("B" * 50, result.stderr)
+        self.assertIn(_STDOUT_KEPT, result.stdout)
+        self.assertIn(_STDERR_KEPT, result.stderr)
         self.assertIn("[truncated: output exceeded 50 chars]", result.stdout)
         self.assertIn("[truncated: output exceeded 50 chars]", result.stderr)
 
     async def test_returncode_none_maps_to_negative_one(self) -> None:
-        def _stream(data: bytes) -> asyncio.StreamReader:
-            stream = asyncio.StreamReader()
-            stream.feed_data(data)
-            stream.feed_eof()
-            return stream
-
-        class _FakeProc:
-            def __init__(self) -> None:
-                self.returncode = None
-                self.pid = os.getpid()
-                self.stdout = _stream(b"hello\n")
-                self.stderr = _stream(b"")
-
-            async def wait(self) -> int:
-                return 0
-
-            def send_signal(self, _sig: int) -> None:
-                return None
-
-            def kill(self) -> None:
-                return None
-
-        async def _fake_create_subprocess_exec(*_args, **_kwargs) -> _FakeProc:
-            return _FakeProc()
+        async def _fake_create_subprocess_exec(*_args, **_kwargs) -> FakeProc:
+            return FakeProc(stdout_data=b"hello\n", returncode=None)
 
         with patch("orchestrator.subprocess_utils.asyncio.create_subprocess_exec", side_effect=_fake_create_subprocess_exec):
             result = await run_command(
-                ["/usr/bin/env"],
+                _ENV_DUMP,
                 cwd=_repo_root(),
                 env={},
                 env_allowlist=[],
@@ -125,6 +139,66 @@ class SubprocessEnvTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.exit_code, -1)
         self.assertEqual(result.stdout, "hello\n")
 
+    async def test_multibyte_char_split_across_chunks_is_decoded(self) -> None:
+        data = "привет\n".encode("utf-8")
+        stream = asyncio.StreamReader()
+        stream.feed_data(data[:3])
+        stream.feed_data(data[3:])
+        stream.feed_eof()
+        sink: list[str] = []
+        with patch("orchestrator.subprocess_utils._READ_CHUNK_BYTES", 3):
+            truncated = await _read_stream(stream, sink)
+        self.assertFalse(truncated)
+        self.assertEqual("".join(sink), "привет\n")
+
+    async def test_truncated_stream_is_drained_without_decoding(self) -> None:
+        stream = asyncio.StreamReader()
+        for part in (b"A" * 8, b"B" * 8, b"C" * 8):
+            stream.feed_data(part)
+        stream.feed_eof()
+        sink: list[str] = []
+        seen: list[bytes] = []
+        with patch("orchestrator.subprocess_utils._READ_CHUNK_BYTES", 8):
+            truncated = await _read_stream(stream, sink, on_chunk=seen.append, max_chars=10)
+        self.assertTrue(truncated)
+        self.assertEqual("".join(sink), "A" * 8 + "BB" + "\n[truncated: output exceeded 10 chars]\n")
+        self.assertEqual(b"".join(seen), b"A" * 8 + b"B" * 8 + b"C" * 8)
+
+    async def test_log_file_receives_raw_output(self) -> None:
+        log_file = scratch_dir(self) / "logs" / "cmd.log"
+        result = await run_command(
+            [sys.executable, "-c", "print('one'); print('two')"],
+            cwd=_repo_root(),
+            env={},
+            env_allowlist=[],
+            clear_env=False,
+            timeout_sec=5,
+            log_file=log_file,
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(log_file.read_text(encoding="utf-8"), "one\ntwo\n")
+
+    async def test_log_file_keeps_stdout_and_stderr_lines_whole(self) -> None:
+        log_file = scratch_dir(self) / "run.log"
+        script = (
+            "import sys, time\n"
+            "sys.stdout.write('par'); sys.stdout.flush(); time.sleep(0.05)\n"
+            "sys.stderr.write('err\\n'); sys.stderr.flush(); time.sleep(0.05)\n"
+            "sys.stdout.write('tial\\nno-newline'); sys.stdout.flush()\n"
+        )
+        result = await run_command(
+            [sys.executable, "-c", script],
+            cwd=_repo_root(),
+            env={},
+            env_allowlist=[],
+            clear_env=False,
+            timeout_sec=5,
+            log_file=log_file,
+        )
+        self.assertEqual(result.exit_code, 0)
+        # The stderr line lands between, never inside, the stdout line; the unterminated tail is kept.
+        self.assertEqual(log_file.read_text(encoding="utf-8"), "err\npartial\nno-newline")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from pathlib import Path
+
+from tests._support import scratch_dir
+
+try:
+    from orchestrator.validator import SchemaValidationError, get_validator, validate_json
+except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
+    get_validator = None  # type: ignore[assignment]
+
+
+def _write_schema(path: Path, required: list[str]) -> None:
+    path.write_text(json.dumps({"type": "object", "required": required}), encoding="utf-8")
+
+
+@unittest.skipIf(get_validator is None, "jsonschema is not installed")
+class ValidatorCacheTests(unittest.TestCase):
+    def test_validator_is_reused_until_schema_changes(self) -> None:
+        schema = scratch_dir(self) / "schema.json"
+        _write_schema(schema, ["a"])
+        first = get_validator(schema)
+        self.assertIs(get_validator(schema), first)
+        validate_json({"a": 1}, schema)
+        with self.assertRaises(SchemaValidationError):
+            validate_json({"b": 1}, schema)
+
+        _write_schema(schema, ["b"])
+        st = schema.stat()
+        os.utime(schema, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertIsNot(get_validator(schema), first)
+        validate_json({"b": 1}, schema)
+        with self.assertRaises(SchemaValidationError):
+            validate_json({"a": 1}, schema)
+
+    def test_invalid_schema_is_rejected_at_compile_time(self) -> None:
+        from jsonschema.exceptions import SchemaError
+
+        schema = scratch_dir(self) / "broken.json"
+        schema.write_text(json.dumps({"type": "not-a-type"}), encoding="utf-8")
+        with self.assertRaises(SchemaError):
+            get_validator(schema)
+
+    def test_error_report_lists_first_ten_paths_in_order(self) -> None:
+        schema = scratch_dir(self) / "schema.json"
+        schema.write_text(
+            json.dumps({"type": "object", "additionalProperties": {"type": "integer"}}),
+            encoding="utf-8",
+        )
+        instance = {f"k{i:02d}": "x" for i in range(15, -1, -1)}
+        with self.assertRaises(SchemaValidationError) as cm:
+            validate_json(instance, schema)
+        lines = str(cm.exception).splitlines()[1:]
+        self.assertEqual([line.split(":")[0] for line in lines], [f"- k{i:02d}" for i in range(10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import dataclasses
 import json
 import os
-import tempfile
 import unittest
 from pathlib import Path
+from typing import Any
 from unittest.mock import patch
 
+from tests._support import SharedLoopAsyncTestCase, scratch_dir
+
 try:
-    from fastapi.testclient import TestClient
+    import httpx
+    from fastapi import HTTPException
 except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
-    TestClient = None  # type: ignore[assignment]
+    httpx = None  # type: ignore[assignment]
 
 try:
     from gateway import webhook_server
@@ -18,361 +22,273 @@ except ModuleNotFoundError:  # pragma: no cover - optional in bare test env
     webhook_server = None  # type: ignore[assignment]
 
 
-@unittest.skipIf(TestClient is None or webhook_server is None, "web dependencies are not installed")
-class WebhookServerTests(unittest.TestCase):
-    def test_webhook_rejects_large_payload(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-                "MAX_WEBHOOK_BODY_BYTES": "64",
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    payload = {"goal": "x" * 300}
-                    resp = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json=payload,
-                    )
-                    self.assertEqual(resp.status_code, 413)
-
-    def test_jobs_endpoint_returns_structured_json(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-                "MAX_WEBHOOK_BODY_BYTES": "262144",
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    create = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json={"goal": "run tests"},
-                    )
-                    self.assertEqual(create.status_code, 200)
-                    job_id = create.json()["job_id"]
-
-                    job_dir = artifacts_root / job_id
-                    job_dir.mkdir(parents=True, exist_ok=True)
-                    (job_dir / "state.json").write_text(
-                        json.dumps({"job_id": job_id, "status": "running"}),
-                        encoding="utf-8",
-                    )
-                    (job_dir / "result.json").write_text(
-                        json.dumps({"job_id": job_id, "status": "success"}),
-                        encoding="utf-8",
-                    )
-
-                    status = client.get(f"/jobs/{job_id}")
-                    self.assertEqual(status.status_code, 200)
-                    payload = status.json()
-                    self.assertEqual(payload["status"], "running")
-                    self.assertIsInstance(payload["state"], dict)
-                    self.assertIsInstance(payload["result"], dict)
-
-    def test_webhook_ignores_payload_workdir_and_keeps_project_alias(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            repo_root = Path(td) / "repo"
-            repo_root.mkdir(parents=True, exist_ok=True)
-
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-                "PROJECT_ALIASES": f"demo={repo_root}",
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    resp = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json={"goal": "run tests", "project_id": "demo", "workdir": "/etc"},
-                    )
-                    self.assertEqual(resp.status_code, 200)
-                    pending_files = list((queue_root / "pending").glob("*.json"))
-                    self.assertEqual(len(pending_files), 1)
-                    obj = json.loads(pending_files[0].read_text(encoding="utf-8"))
-                    self.assertEqual(obj["workdir"], ".")
-                    self.assertEqual(obj["project_id"], "demo")
-                    self.assertEqual(obj["metadata"]["ignored_workdir"], "/etc")
-
-    def test_webhook_rejects_unknown_project_alias(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-                "PROJECT_ALIASES": "",
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    resp = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json={"goal": "run tests", "project_id": "missing"},
-                    )
-                    self.assertEqual(resp.status_code, 400)
-
-    def test_webhook_routes_requires_approval_to_awaiting_queue(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    resp = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json={"goal": "run tests", "policy": {"requires_approval": True}},
-                    )
-                    self.assertEqual(resp.status_code, 200)
-                    self.assertEqual(resp.json()["status"], "awaiting_approval")
-                    awaiting = list((queue_root / "awaiting_approval").glob("*.json"))
-                    pending = list((queue_root / "pending").glob("*.json"))
-                    self.assertEqual(len(awaiting), 1)
-                    self.assertEqual(len(pending), 0)
-
-    def test_webhook_accepts_context_fields(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    resp = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json={
-                            "goal": "run tests",
-                            "context_strategy": "sliding",
-                            "context_window": [{"role": "user", "content": "hello"}],
-                        },
-                    )
-                    self.assertEqual(resp.status_code, 200)
-                    pending = list((queue_root / "pending").glob("*.json"))
-                    self.assertEqual(len(pending), 1)
-                    obj = json.loads(pending[0].read_text(encoding="utf-8"))
-                    self.assertEqual(obj["context_strategy"], "sliding")
-                    self.assertEqual(obj["context_window"][0]["content"], "hello")
-
-    def test_webhook_scoped_tokens_enforce_project_access(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            demo_repo = Path(td) / "demo"
-            tools_repo = Path(td) / "tools"
-            demo_repo.mkdir(parents=True, exist_ok=True)
-            tools_repo.mkdir(parents=True, exist_ok=True)
-
-            env = {
-                "WEBHOOK_TOKENS": "token-demo=demo,token-all=*",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-                "PROJECT_ALIASES": f"demo={demo_repo},tools={tools_repo}",
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    ok = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer token-demo"},
-                        json={"goal": "run tests", "project_id": "demo"},
-                    )
-                    self.assertEqual(ok.status_code, 200)
-
-                    denied = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer token-demo"},
-                        json={"goal": "run tests", "project_id": "tools"},
-                    )
-                    self.assertEqual(denied.status_code, 403)
-
-                    missing_project = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer token-demo"},
-                        json={"goal": "run tests"},
-                    )
-                    self.assertEqual(missing_project.status_code, 403)
-
-                    wildcard = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer token-all"},
-                        json={"goal": "run tests", "project_id": "tools"},
-                    )
-                    self.assertEqual(wildcard.status_code, 200)
-
-    def test_webhook_rate_limit_returns_429(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-                "WEBHOOK_RATE_LIMIT_WINDOW_SEC": "60",
-                "WEBHOOK_RATE_LIMIT_MAX_REQUESTS": "1",
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    first = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json={"goal": "run tests"},
-                    )
-                    self.assertEqual(first.status_code, 200)
-
-                    second = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json={"goal": "run tests again"},
-                    )
-                    self.assertEqual(second.status_code, 429)
-                    self.assertIn("Retry-After", second.headers)
-
-    def test_webhook_uses_default_artifact_handoff_from_env(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-                "DEFAULT_ARTIFACT_HANDOFF": "patch_first",
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    resp = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json={"goal": "run tests"},
-                    )
-                    self.assertEqual(resp.status_code, 200)
-                    pending_files = list((queue_root / "pending").glob("*.json"))
-                    self.assertEqual(len(pending_files), 1)
-                    job_obj = json.loads(pending_files[0].read_text(encoding="utf-8"))
-                    self.assertEqual(job_obj["artifact_handoff"], "patch_first")
-
-    def test_webhook_payload_can_override_artifact_handoff(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-                "DEFAULT_ARTIFACT_HANDOFF": "manual",
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    resp = client.post(
-                        "/webhook",
-                        headers={"Authorization": "Bearer test-token"},
-                        json={"goal": "run tests", "artifact_handoff": "workspace_first"},
-                    )
-                    self.assertEqual(resp.status_code, 200)
-                    pending_files = list((queue_root / "pending").glob("*.json"))
-                    self.assertEqual(len(pending_files), 1)
-                    job_obj = json.loads(pending_files[0].read_text(encoding="utf-8"))
-                    self.assertEqual(job_obj["artifact_handoff"], "workspace_first")
-
-    def test_metrics_endpoint_returns_prometheus_text(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            queue_root = Path(td) / "queue"
-            artifacts_root = Path(td) / "artifacts"
-            workspaces_root = Path(td) / "workspaces"
-            env = {
-                "WEBHOOK_TOKEN": "test-token",
-                "WEBHOOK_TOKENS": "",
-                "QUEUE_ROOT": str(queue_root),
-                "ARTIFACTS_ROOT": str(artifacts_root),
-                "WORKSPACES_ROOT": str(workspaces_root),
-            }
-            with patch.dict(os.environ, env, clear=False):
-                webhook_server.settings = None
-                webhook_server.queue = None
-                webhook_server.rate_limiter = None
-                with TestClient(webhook_server.app) as client:
-                    resp = client.get("/metrics")
-                    self.assertEqual(resp.status_code, 200)
-                    self.assertIn("orchestrator_queue_jobs", resp.text)
+_OVERSIZE_GOAL = "x" * 300
+
+
+def _roots_env(root: Path) -> dict[str, str]:
+    return {
+        "WEBHOOK_TOKEN": "test-token",
+        "WEBHOOK_TOKENS": "",
+        "QUEUE_ROOT": str(root / "queue"),
+        "ARTIFACTS_ROOT": str(root / "artifacts"),
+        "WORKSPACES_ROOT": str(root / "workspaces"),
+    }
+
+
+@unittest.skipIf(httpx is None or webhook_server is None, "web dependencies are not installed")
+class WebhookServerTests(SharedLoopAsyncTestCase):
+    client: httpx.AsyncClient
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # One app startup (and one Settings.load) for the class; tests derive from these settings.
+        cls.enterClassContext(patch.dict(os.environ, _roots_env(scratch_dir(cls)), clear=False))
+        webhook_server._startup()
+        cls.base_settings = webhook_server.settings
+        # Plain ASGI calls on the class loop: no TestClient portal thread per request.
+        transport = httpx.ASGITransport(app=webhook_server.app)
+        cls.client = httpx.AsyncClient(transport=transport, base_url="http://testserver")
+        cls.addClassCleanup(lambda: cls._runner.run(cls.client.aclose()))
+
+    def _configure(self, root: Path, **changes: Any) -> None:
+        """Base settings with fresh queue/artifacts/workspaces roots under root, plus changes."""
+        webhook_server.configure(
+            dataclasses.replace(
+                self.base_settings,
+                queue_root=root / "queue",
+                artifacts_root=root / "artifacts",
+                workspaces_root=root / "workspaces",
+                **changes,
+            )
+        )
+
+    async def test_webhook_rejects_large_payload(self) -> None:
+        self._configure(scratch_dir(self), max_webhook_body_bytes=64)
+        resp = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={"goal": _OVERSIZE_GOAL},
+        )
+        self.assertEqual(resp.status_code, 413)
+
+    async def test_jobs_endpoint_returns_structured_json(self) -> None:
+        tmp = scratch_dir(self)
+        self._configure(tmp, max_webhook_body_bytes=262144)
+        create = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={"goal": "run tests"},
+        )
+        self.assertEqual(create.status_code, 200)
+        job_id = create.json()["job_id"]
+
+        # Serve state/result straight from memory; only the handler's shaping is under test.
+        docs = {
+            "state.json": {"job_id": job_id, "status": "running"},
+            "result.json": {"job_id": job_id, "status": "success"},
+        }
+        with patch.object(webhook_server, "_read_json_if_exists", side_effect=lambda path: docs[path.name]) as read:
+            status = await self.client.get(f"/jobs/{job_id}")
+        self.assertEqual(
+            [call.args[0] for call in read.call_args_list],
+            [tmp / "artifacts" / job_id / "state.json", tmp / "artifacts" / job_id / "result.json"],
+        )
+        self.assertEqual(status.status_code, 200)
+        payload = status.json()
+        self.assertEqual(payload["status"], "running")
+        self.assertIsInstance(payload["state"], dict)
+        self.assertIsInstance(payload["result"], dict)
+
+    async def test_webhook_ignores_payload_workdir_and_keeps_project_alias(self) -> None:
+        tmp = scratch_dir(self)
+        repo_root = tmp / "repo"
+        repo_root.mkdir(parents=True, exist_ok=True)
+        self._configure(tmp, project_aliases={"demo": repo_root})
+
+        resp = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={"goal": "run tests", "project_id": "demo", "workdir": "/etc"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        pending_files = list((tmp / "queue" / "pending").glob("*.json"))
+        self.assertEqual(len(pending_files), 1)
+        obj = json.loads(pending_files[0].read_text(encoding="utf-8"))
+        self.assertEqual(obj["workdir"], ".")
+        self.assertEqual(obj["project_id"], "demo")
+        self.assertEqual(obj["metadata"]["ignored_workdir"], "/etc")
+
+    async def test_webhook_rejects_unknown_project_alias(self) -> None:
+        self._configure(scratch_dir(self), project_aliases={})
+        resp = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={"goal": "run tests", "project_id": "missing"},
+        )
+        self.assertEqual(resp.status_code, 400)
+
+    async def test_webhook_routes_requires_approval_to_awaiting_queue(self) -> None:
+        tmp = scratch_dir(self)
+        self._configure(tmp)
+        resp = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={"goal": "run tests", "policy": {"requires_approval": True}},
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["status"], "awaiting_approval")
+        awaiting = list((tmp / "queue" / "awaiting_approval").glob("*.json"))
+        pending = list((tmp / "queue" / "pending").glob("*.json"))
+        self.assertEqual(len(awaiting), 1)
+        self.assertEqual(len(pending), 0)
+
+    async def test_webhook_accepts_context_fields(self) -> None:
+        tmp = scratch_dir(self)
+        self._configure(tmp)
+        resp = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={
+                "goal": "run tests",
+                "context_strategy": "sliding",
+                "context_window": [{"role": "user", "content": "hello"}],
+            },
+        )
+        self.assertEqual(resp.status_code, 200)
+        pending = list((tmp / "queue" / "pending").glob("*.json"))
+        self.assertEqual(len(pending), 1)
+        obj = json.loads(pending[0].read_text(encoding="utf-8"))
+        self.assertEqual(obj["context_strategy"], "sliding")
+        self.assertEqual(obj["context_window"][0]["content"], "hello")
+
+    async def test_webhook_scoped_tokens_enforce_project_access(self) -> None:
+        tmp = scratch_dir(self)
+        demo_repo = tmp / "demo"
+        tools_repo = tmp / "tools"
+        demo_repo.mkdir(parents=True, exist_ok=True)
+        tools_repo.mkdir(parents=True, exist_ok=True)
+        self._configure(
+            tmp,
+            webhook_tokens={"token-demo": {"demo"}, "token-all": {"*"}},
+            project_aliases={"demo": demo_repo, "tools": tools_repo},
+        )
+
+        ok = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer token-demo"},
+            json={"goal": "run tests", "project_id": "demo"},
+        )
+        self.assertEqual(ok.status_code, 200)
+
+        denied = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer token-demo"},
+            json={"goal": "run tests", "project_id": "tools"},
+        )
+        self.assertEqual(denied.status_code, 403)
+
+        missing_project = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer token-demo"},
+            json={"goal": "run tests"},
+        )
+        self.assertEqual(missing_project.status_code, 403)
+
+        wildcard = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer token-all"},
+            json={"goal": "run tests", "project_id": "tools"},
+        )
+        self.assertEqual(wildcard.status_code, 200)
+
+    async def test_webhook_rate_limit_returns_429(self) -> None:
+        self._configure(
+            scratch_dir(self),
+            webhook_rate_limit_window_sec=60,
+            webhook_rate_limit_max_requests=1,
+        )
+        first = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={"goal": "run tests"},
+        )
+        self.assertEqual(first.status_code, 200)
+
+        second = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={"goal": "run tests again"},
+        )
+        self.assertEqual(second.status_code, 429)
+        self.assertIn("Retry-After", second.headers)
+
+    async def test_webhook_uses_configured_default_artifact_handoff(self) -> None:
+        tmp = scratch_dir(self)
+        self._configure(tmp, default_artifact_handoff="patch_first")
+        resp = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={"goal": "run tests"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        pending_files = list((tmp / "queue" / "pending").glob("*.json"))
+        self.assertEqual(len(pending_files), 1)
+        job_obj = json.loads(pending_files[0].read_text(encoding="utf-8"))
+        self.assertEqual(job_obj["artifact_handoff"], "patch_first")
+
+    async def test_webhook_payload_can_override_artifact_handoff(self) -> None:
+        tmp = scratch_dir(self)
+        self._configure(tmp, default_artifact_handoff="manual")
+        resp = await self.client.post(
+            "/webhook",
+            headers={"Authorization": "Bearer test-token"},
+            json={"goal": "run tests", "artifact_handoff": "workspace_first"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        pending_files = list((tmp / "queue" / "pending").glob("*.json"))
+        self.assertEqual(len(pending_files), 1)
+        job_obj = json.loads(pending_files[0].read_text(encoding="utf-8"))
+        self.assertEqual(job_obj["artifact_handoff"], "workspace_first")
+
+    async def test_metrics_endpoint_returns_prometheus_text(self) -> None:
+        self._configure(scratch_dir(self))
+        resp = await self.client.get("/metrics")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("orchestrator_queue_jobs", resp.text)
+
+
+class _StubRequest:
+    def __init__(self, chunks: list[bytes], content_length: str | None = None) -> None:
+        self.headers = {} if content_length is None else {"content-length": content_length}
+        self._chunks = chunks
+        self.consumed = 0
+
+    async def stream(self):  # noqa: ANN201
+        for chunk in self._chunks:
+            self.consumed += 1
+            yield chunk
+
+
+@unittest.skipIf(httpx is None or webhook_server is None, "web dependencies are not installed")
+class WebhookBodyLimitTests(SharedLoopAsyncTestCase):
+    async def test_declared_oversize_body_is_rejected_unread(self) -> None:
+        request = _StubRequest([b"x" * 300], content_length="300")
+        with self.assertRaises(HTTPException) as ctx:
+            await webhook_server._read_body_limited(request, 64)
+        self.assertEqual(ctx.exception.status_code, 413)
+        self.assertEqual(request.consumed, 0)
+
+    async def test_streamed_body_stops_at_limit(self) -> None:
+        request = _StubRequest([b"x" * 40, b"x" * 40, b"x" * 40])
+        with self.assertRaises(HTTPException) as ctx:
+            await webhook_server._read_body_limited(request, 64)
+        self.assertEqual(ctx.exception.status_code, 413)
+        self.assertEqual(request.consumed, 2)
+
+    async def test_body_within_limit_is_returned_whole(self) -> None:
+        request = _StubRequest([b'{"goal":', b' "x"}'], content_length="13")
+        self.assertEqual(await webhook_server._read_body_limited(request, 64), b'{"goal": "x"}')
 
 
 if __name__ == "__main__":
@@ -68,10 +68,11 @@ class WorkerRegistryTests(unittest.TestCase):
                 self.assertIsNone(registry.get_worker("dummy_external"))
 
     def test_ensure_workers_registered_bootstraps_once(self) -> None:
+        workers.ensure_workers_registered.cache_clear()
+        self.addCleanup(workers.ensure_workers_registered.cache_clear)
         with mock.patch("workers.load_worker_plugins") as load_plugins:
-            with mock.patch("workers._BOOTSTRAPPED", False):
-                workers.ensure_workers_registered()
-                workers.ensure_workers_registered()
+            workers.ensure_workers_registered()
+            workers.ensure_workers_registered()
 
         self.assertEqual(load_plugins.call_count, 1)
 
@@ -1,63 +1,122 @@
 from __future__ import annotations
 
-import tempfile
+import errno
+import os
 import unittest
-from pathlib import Path
+from unittest.mock import patch
 
+from orchestrator import workspace
 from orchestrator.workspace import WorkspaceManager, WorkspaceError
+from tests._support import scratch_dir
 
 
 class WorkspaceManagerTests(unittest.TestCase):
     def test_prepare_workspace_without_source(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            root = Path(td) / "workspaces"
-            mgr = WorkspaceManager(root, {})
-            layout = mgr.prepare_workspace(job_id="job12345678", source_hint=None)
-            self.assertTrue(layout.workdir.exists())
-            self.assertTrue(str(layout.workdir).startswith(str(root.resolve())))
+        root = scratch_dir(self) / "workspaces"
+        mgr = WorkspaceManager(root, {})
+        layout = mgr.prepare_workspace(job_id="job12345678", source_hint=None)
+        self.assertTrue(layout.workdir.exists())
+        self.assertTrue(str(layout.workdir).startswith(str(root.resolve())))
 
     def test_prepare_workspace_copies_source_dir(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            root = Path(td) / "workspaces"
-            src = Path(td) / "src"
-            src.mkdir(parents=True, exist_ok=True)
-            (src / "a.txt").write_text("hello", encoding="utf-8")
+        tmp = scratch_dir(self)
+        root = tmp / "workspaces"
+        src = tmp / "src"
+        src.mkdir(parents=True, exist_ok=True)
+        (src / "a.txt").write_text("hello", encoding="utf-8")
 
-            mgr = WorkspaceManager(root, {"demo": src})
-            source = mgr.resolve_project_alias("demo")
-            layout = mgr.prepare_workspace(job_id="job12345679", source_hint=source)
-            self.assertEqual((layout.workdir / "a.txt").read_text(encoding="utf-8"), "hello")
+        mgr = WorkspaceManager(root, {"demo": src})
+        source = mgr.resolve_project_alias("demo")
+        layout = mgr.prepare_workspace(job_id="job12345679", source_hint=source)
+        self.assertEqual((layout.workdir / "a.txt").read_text(encoding="utf-8"), "hello")
 
     def test_resolve_unknown_alias_raises(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            mgr = WorkspaceManager(Path(td) / "workspaces", {})
-            with self.assertRaises(WorkspaceError):
-                mgr.resolve_project_alias("unknown")
+        mgr = WorkspaceManager(scratch_dir(self) / "workspaces", {})
+        with self.assertRaises(WorkspaceError):
+            mgr.resolve_project_alias("unknown")
 
     def test_prepare_workspace_rejects_symlink_job_dir(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            root = Path(td) / "workspaces"
-            outside = Path(td) / "outside"
-            outside.mkdir(parents=True, exist_ok=True)
-            root.mkdir(parents=True, exist_ok=True)
-            (root / "job_symlink").symlink_to(outside, target_is_directory=True)
+        tmp = scratch_dir(self)
+        root = tmp / "workspaces"
+        outside = tmp / "outside"
+        outside.mkdir(parents=True, exist_ok=True)
+        root.mkdir(parents=True, exist_ok=True)
+        (root / "job_symlink").symlink_to(outside, target_is_directory=True)
 
-            mgr = WorkspaceManager(root, {})
-            with self.assertRaises(WorkspaceError):
-                mgr.prepare_workspace(job_id="job_symlink", source_hint=None)
+        mgr = WorkspaceManager(root, {})
+        with self.assertRaises(WorkspaceError):
+            mgr.prepare_workspace(job_id="job_symlink", source_hint=None)
 
     def test_prepare_workspace_rejects_source_with_symlink_entry(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            root = Path(td) / "workspaces"
-            src = Path(td) / "src"
-            src.mkdir(parents=True, exist_ok=True)
-            outside_file = Path(td) / "outside.txt"
-            outside_file.write_text("outside", encoding="utf-8")
-            (src / "linked.txt").symlink_to(outside_file)
-
-            mgr = WorkspaceManager(root, {})
-            with self.assertRaises(WorkspaceError):
-                mgr.prepare_workspace(job_id="job12345680", source_hint=src)
+        tmp = scratch_dir(self)
+        root = tmp / "workspaces"
+        src = tmp / "src"
+        src.mkdir(parents=True, exist_ok=True)
+        outside_file = tmp / "outside.txt"
+        outside_file.write_text("outside", encoding="utf-8")
+        (src / "linked.txt").symlink_to(outside_file)
+
+        (src / "z_regular.txt").write_text("copied first", encoding="utf-8")
+
+        mgr = WorkspaceManager(root, {})
+        with self.assertRaises(WorkspaceError):
+            mgr.prepare_workspace(job_id="job12345680", source_hint=src)
+        # Partial copy is removed so a retry does not hit "already exists and is not empty".
+        self.assertFalse((root / "job12345680" / "work").exists())
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "FIFOs need POSIX")
+    def test_prepare_workspace_rejects_source_with_fifo(self) -> None:
+        tmp = scratch_dir(self)
+        root = tmp / "workspaces"
+        src = tmp / "src"
+        src.mkdir(parents=True, exist_ok=True)
+        (src / "a.txt").write_text("hello", encoding="utf-8")
+        os.mkfifo(src / "pipe")
+
+        mgr = WorkspaceManager(root, {})
+        with self.assertRaisesRegex(WorkspaceError, "special file"):
+            mgr.prepare_workspace(job_id="job12345681", source_hint=src)
+        self.assertFalse((root / "job12345681" / "work").exists())
+
+    def test_fast_copytree_copies_nested_tree_with_modes(self) -> None:
+        tmp = scratch_dir(self)
+        src = tmp / "src"
+        (src / "pkg" / "sub").mkdir(parents=True)
+        (src / "pkg" / "sub" / "data.bin").write_bytes(os.urandom(200_000))
+        script = src / "run.sh"
+        script.write_text("#!/bin/sh\n", encoding="utf-8")
+        script.chmod(0o755)
+        (src / "empty").mkdir()
+
+        dst = tmp / "dst"
+        workspace._fast_copytree(src, dst)
+
+        self.assertEqual((dst / "pkg" / "sub" / "data.bin").read_bytes(), (src / "pkg" / "sub" / "data.bin").read_bytes())
+        self.assertEqual(os.stat(dst / "run.sh").st_mode & 0o777, 0o755)
+        self.assertTrue((dst / "empty").is_dir())
+
+    def test_copy_falls_back_when_kernel_copy_is_unsupported(self) -> None:
+        tmp = scratch_dir(self)
+        src = tmp / "a.txt"
+        src.write_text("payload", encoding="utf-8")
+        dst = tmp / "b.txt"
+        copier = workspace._FileCopier()
+        copier.reflink = False
+        with patch.object(workspace.os, "copy_file_range", side_effect=OSError(errno.EXDEV, "cross-device"), create=True):
+            copier.copy(str(src), str(dst))
+        self.assertEqual(dst.read_text(encoding="utf-8"), "payload")
+        self.assertFalse(copier.copy_range)
+
+    def test_symlink_check_rejects_dangling_links_and_dotdot_escapes(self) -> None:
+        tmp = scratch_dir(self)
+        base = tmp.resolve() / "workspaces"
+        base.mkdir()
+        (base / "dangling").symlink_to(tmp / "missing")
+        with self.assertRaises(WorkspaceError):
+            workspace._check_no_symlink_escape(base, base / "dangling" / "work")
+        with self.assertRaises(WorkspaceError):
+            workspace._check_no_symlink_escape(base, base / "job" / ".." / ".." / "work")
+        workspace._check_no_symlink_escape(base, base / "job" / "work")
 
 
 if __name__ == "__main__":
@@ -1,17 +1,14 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 
 from workers.registry import DEFAULT_WORKER_ENTRYPOINT_GROUP, get_worker, list_workers, load_worker_plugins
 
 
-_BOOTSTRAPPED = False
-
+@lru_cache(maxsize=1)
 def ensure_workers_registered() -> None:
-    global _BOOTSTRAPPED
-    if _BOOTSTRAPPED:
-        return
-    # Side-effect imports register workers in the global registry.
+    # Runs once per process (cache_clear() re-arms it); side-effect imports register workers in the global registry.
     from workers import claude_worker as _claude  # noqa: F401
     from workers import codex_worker as _codex  # noqa: F401
     from workers import kimi_worker as _kimi  # noqa: F401
@@ -19,7 +16,6 @@ def ensure_workers_registered() -> None:
     entrypoint_group = os.getenv("WORKER_ENTRYPOINT_GROUP", DEFAULT_WORKER_ENTRYPOINT_GROUP).strip()
     if entrypoint_group:
         load_worker_plugins(entrypoint_group=entrypoint_group)
-    _BOOTSTRAPPED = True
 
 
 __all__ = ["ensure_workers_registered", "get_worker", "list_workers"]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Sequence
 
 from orchestrator.models import ErrorInfo, Metrics, StepResult, StepSpec
 from orchestrator.subprocess_utils import CommandResult, run_command
@@ -24,6 +25,14 @@ class AgentExecutor(BaseWorker):
     def required_binaries(self, step: StepSpec) -> set[str]:
         return {step.agent, "git"}
 
+    def required_binaries_for_steps(self, steps: Sequence[StepSpec]) -> set[str]:
+        if type(self).required_binaries is not AgentExecutor.required_binaries:
+            # An override may look at more than step.agent: ask it about every step.
+            return super().required_binaries_for_steps(steps)
+        # The answer depends only on step.agent: one required_binaries call per distinct agent.
+        one_per_agent = {step.agent: step for step in steps}
+        return super().required_binaries_for_steps(list(one_per_agent.values()))
+
     def build_cmd(self, ctx: StepContext, full_prompt: str) -> list[str]:
         raise NotImplementedError
 
@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal, Sequence
 
 from orchestrator.git_utils import current_head_commit, diff_since_commit, is_git_repo
 from orchestrator.log_sanitizer import redact
@@ -51,11 +51,23 @@ class WorkerError(RuntimeError):
 
 class BaseWorker:
     AGENT_NAME: str = "base"
+    # "cpu" workers are dispatched to the runner's process pool instead of the event loop.
+    EXECUTION_KIND: Literal["io", "cpu"] = "io"
 
     def required_binaries(self, step: StepSpec) -> set[str]:
         """Return binaries required for this step in real CLI mode."""
         return set()
 
+    def required_binaries_for_steps(self, steps: Sequence[StepSpec]) -> set[str]:
+        """Union of required_binaries over steps handled by this worker.
+
+        Override when the answer does not depend on the step.
+        """
+        required: set[str] = set()
+        for step in steps:
+            required.update(self.required_binaries(step))
+        return required
+
     async def run(self, ctx: StepContext) -> StepResult:
         """Execute a step and return a StepResult.
 
@@ -158,11 +170,12 @@ class BaseWorker:
         return "\n".join(parts).rstrip() + "\n"
 
     def artifact_paths(self, ctx: StepContext) -> ArtifactPaths:
+        step_id = ctx.step.step_id
         return ArtifactPaths(
-            report_md=str(Path("steps") / ctx.step.step_id / "report.md"),
-            patch_diff=str(Path("steps") / ctx.step.step_id / "patch.diff"),
-            logs_txt=str(Path("steps") / ctx.step.step_id / "logs.txt"),
-            result_json=str(Path("steps") / ctx.step.step_id / "result.json"),
+            report_md=f"steps/{step_id}/report.md",
+            patch_diff=f"steps/{step_id}/patch.diff",
+            logs_txt=f"steps/{step_id}/logs.txt",
+            result_json=f"steps/{step_id}/result.json",
         )
 
     def redact_text(self, text: str, ctx: StepContext) -> str: